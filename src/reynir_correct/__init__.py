@@ -28,36 +28,103 @@
 
 """
 
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import importlib
 import importlib.metadata
 
-# Expose the reynir-correct API
-from reynir import Greynir, Paragraph, Sentence, correct_spaces, mark_paragraphs
-from tokenizer import detokenize
-
-# Annotations
-from .annotation import Annotation
-
-# Grammar checking
-from .checker import (
-    AnnotatedSentence,
-    GreynirCorrect,
-    check,
-    check_single,
-    check_with_stats,
-    check_tokens,
-)
+if TYPE_CHECKING:
+    # Expose the reynir-correct API
+    from reynir import Greynir, Paragraph, Sentence, correct_spaces, mark_paragraphs
+    from tokenizer import detokenize
+
+    # Annotations
+    from .annotation import Annotation
+
+    # Grammar checking
+    from .checker import (
+        AnnotatedSentence,
+        CheckSession,
+        GreynirCorrect,
+        SessionSentence,
+        SessionUpdate,
+        check,
+        check_single,
+        check_with_stats,
+        check_tokens,
+    )
+
+    # Token-level correction
+    from .errtokenizer import Correct_TOK, CorrectionPipeline, CorrectToken, tokenize
+    from .preload import WarmupReport, is_ready, warmup
+    from .readability import FleschKincaidFeedback, FleschKincaidScorer, RareWordsFinder
+    from .settings import Settings
+    from .wrappers import (
+        BatchResult,
+        BatchStats,
+        CorrectedSentence,
+        CorrectionResult,
+        GreynirCorrectAPI,
+        ParseResultStats,
+        check_errors,
+    )
+
+# The module that defines each name of the API. The modules are imported
+# on first access to one of their names (PEP 562), so that importing the
+# package does not load the parser, the n-gram model and BÍN, for instance
+# for the command line help or if only the readability scorer is used.
+_LAZY_NAMES: Dict[str, str] = {
+    "Greynir": "reynir",
+    "Paragraph": "reynir",
+    "Sentence": "reynir",
+    "correct_spaces": "reynir",
+    "mark_paragraphs": "reynir",
+    "detokenize": "tokenizer",
+    "Annotation": ".annotation",
+    "AnnotatedSentence": ".checker",
+    "CheckSession": ".checker",
+    "GreynirCorrect": ".checker",
+    "SessionSentence": ".checker",
+    "SessionUpdate": ".checker",
+    "check": ".checker",
+    "check_single": ".checker",
+    "check_with_stats": ".checker",
+    "check_tokens": ".checker",
+    "Correct_TOK": ".errtokenizer",
+    "CorrectionPipeline": ".errtokenizer",
+    "CorrectToken": ".errtokenizer",
+    "tokenize": ".errtokenizer",
+    "WarmupReport": ".preload",
+    "is_ready": ".preload",
+    "warmup": ".preload",
+    "FleschKincaidFeedback": ".readability",
+    "FleschKincaidScorer": ".readability",
+    "RareWordsFinder": ".readability",
+    "Settings": ".settings",
+    "BatchResult": ".wrappers",
+    "BatchStats": ".wrappers",
+    "CorrectedSentence": ".wrappers",
+    "CorrectionResult": ".wrappers",
+    "GreynirCorrectAPI": ".wrappers",
+    "ParseResultStats": ".wrappers",
+    "check_errors": ".wrappers",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the module that defines a name of the API on first access"""
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Later accesses find the name in the module namespace
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_NAMES))
 
-# Token-level correction
-from .errtokenizer import Correct_TOK, CorrectionPipeline, CorrectToken, tokenize
-from .readability import FleschKincaidFeedback, FleschKincaidScorer, RareWordsFinder
-from .settings import Settings
-from .wrappers import (
-    CorrectedSentence,
-    CorrectionResult,
-    GreynirCorrectAPI,
-    ParseResultStats,
-    check_errors,
-)
 
 __author__ = "Miðeind ehf"
 __copyright__ = "© 2025 Miðeind ehf."
@@ -81,13 +148,21 @@ __all__ = (
     "CorrectToken",
     "GreynirCorrect",
     "GreynirCorrectAPI",
+    "CheckSession",
+    "SessionSentence",
+    "SessionUpdate",
     "CorrectionResult",
     "CorrectedSentence",
+    "BatchResult",
+    "BatchStats",
     "check",
     "check_single",
     "check_with_stats",
     "check_tokens",
     "check_errors",
+    "warmup",
+    "is_ready",
+    "WarmupReport",
     "AnnotatedSentence",
     "Annotation",
     "__version__",
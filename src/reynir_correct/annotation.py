@@ -34,7 +34,7 @@
 
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class Annotation:
@@ -153,3 +153,22 @@ class Annotation:
     def references(self) -> List[str]:
         """A list of references to the Icelandic Standards"""
         return self._references
+
+    def dump(self) -> Dict[str, Any]:
+        """Returns a JSON-dumpable object corresponding to an Annotation"""
+        return dict(
+            start=self._start,
+            end=self._end,
+            code=self._code,
+            text=self._text,
+            detail=self._detail,
+            references=self._references,
+            original=self._original,
+            suggest=self._suggest,
+            suggestlist=self._suggestlist,
+        )
+
+    @classmethod
+    def load(cls, d: Dict[str, Any]) -> "Annotation":
+        """Loads an Annotation instance from a JSON dump"""
+        return cls(**d)
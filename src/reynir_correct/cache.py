@@ -0,0 +1,203 @@
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    Sentence result cache module
+
+    Copyright © 2025 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module contains a content-addressed cache of the results of
+    parsing and annotating sentences, so that sentences that recur, such
+    as boilerplate disclaimers and signatures, are only parsed once.
+
+    The cache has an in-memory LRU tier, and optionally an SQLite tier
+    on disk, which is shared by all processes that use the same file,
+    such as the workers of a process pool on a host.
+
+    A sentence is keyed by the output of the correction pipeline for it,
+    i.e. the text, normalized original text and token-level errors of
+    its tokens, along with the options that affect parsing and annotation
+    and the version of the results (see GreynirCorrect.cache_version()),
+    which covers the settings, the grammar and the versions of
+    GreynirCorrect and reynir. When the version changes, the entries of
+    other versions are removed.
+
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
+from threading import Lock
+
+from reynir import TokenList
+
+from .annotation import Annotation
+from .checker import SentenceResult
+from .errtokenizer import CorrectToken
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts of a SentenceCache"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        """The number of lookups that were found in either tier"""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        """The ratio of lookups that were found in either tier"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SentenceCache:
+    """A cache of sentence results (see SentenceResult), with an in-memory
+    LRU tier and an optional SQLite tier on disk"""
+
+    # Default maximum number of entries in the memory tier
+    MAX_SIZE = 10000
+
+    def __init__(self, max_size: Optional[int] = None, path: Optional[str] = None) -> None:
+        self._max_size = self.MAX_SIZE if max_size is None else max_size
+        self._memory: "OrderedDict[str, SentenceResult]" = OrderedDict()
+        self._path = path
+        # The connection to the disk tier, which is opened on first use
+        # within each process, as connections cannot be shared across a fork
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._version: Optional[str] = None
+        self._lock = Lock()
+        self.stats = CacheStats()
+
+    @staticmethod
+    def key(tokens: TokenList, fingerprint: Sequence[Any]) -> str:
+        """Return the cache key of a sentence, given its tokens from the
+        correction pipeline and the options that affect its results"""
+        material = [(t.kind, t.txt, (t.original or "").strip(), CorrectToken.dump(t)[3:]) for t in tokens]
+        data = json.dumps([list(fingerprint), material], ensure_ascii=False, default=str)
+        return blake2b(data.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Return the connection to the disk tier, if any, for this process"""
+        if self._path is None:
+            return None
+        if self._db is None or self._pid != os.getpid():
+            self._db = db = sqlite3.connect(self._path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            # Allow concurrent readers and a writer from several processes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS sentences (key TEXT PRIMARY KEY, version TEXT, result TEXT)")
+            self._pid = os.getpid()
+        return self._db
+
+    @staticmethod
+    def _dumps(result: SentenceResult) -> str:
+        """Return a JSON string for a result, for the disk tier"""
+        d: Dict[str, Any] = result._asdict()
+        d["annotations"] = [a.dump() for a in result.annotations]
+        return json.dumps(d, ensure_ascii=False)
+
+    @staticmethod
+    def _loads(s: str) -> SentenceResult:
+        """Load a result from a JSON string from the disk tier"""
+        d: Dict[str, Any] = json.loads(s)
+        d["annotations"] = [Annotation.load(a) for a in d["annotations"]]
+        return SentenceResult(**d)
+
+    def invalidate(self, version: str) -> None:
+        """Set the version of the settings, removing the entries
+        of other versions if it has changed"""
+        if version == self._version:
+            return
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM sentences WHERE version IS NOT ?", (version,))
+            self._version = version
+
+    def get(self, key: str) -> Optional[SentenceResult]:
+        """Return the cached result for a key, or None if not found"""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return result
+            db = self._connection()
+            if db is not None:
+                row = db.execute("SELECT result FROM sentences WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    result = self._loads(row[0])
+                    self._remember(key, result)
+                    self.stats.disk_hits += 1
+                    return result
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, result: SentenceResult) -> None:
+        """Store the result for a key"""
+        with self._lock:
+            self._remember(key, result)
+            db = self._connection()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO sentences (key, version, result) VALUES (?, ?, ?)",
+                    (key, self._version, self._dumps(result)),
+                )
+            self.stats.stores += 1
+
+    def _remember(self, key: str, result: SentenceResult) -> None:
+        """Add a result to the memory tier, evicting the least
+        recently used entry if the tier is full"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_size:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries from the cache"""
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM sentences")
+
+    def __len__(self) -> int:
+        """Return the number of entries in the memory tier"""
+        return len(self._memory)
@@ -47,35 +47,64 @@
     E005: The sentence is probably too long.
     E006: Abbreviations that should be written in full in formal texts.
     E007: Sentence contains exclamation marks, inappropriate in formal texts.
+    E008: The sentence was not parsed because its time budget was exceeded.
+
+    If the parse_prefilter option is set, sentences that the heuristic
+    prefilter (see prefilter.py) judges free of grammatical errors are
+    not parsed, and receive only token-level annotations.
 
 """
 
-from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 from typing_extensions import TypedDict
 
-import os
-import importlib.util
-from importlib.abc import Loader
-from importlib.machinery import ModuleSpec
+import hashlib
+import importlib.metadata
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.context import BaseContext
 from threading import Lock
-from types import ModuleType
 
 from islenska.basics import Ksnid
-from reynir import TOK, Greynir, Paragraph, Sentence, TokenList, _Job, correct_spaces
+from reynir import TOK, Greynir, Paragraph, Sentence, TokenList, _Job, correct_spaces, mark_paragraphs
 from reynir.binparser import BIN_Grammar, BIN_Parser, VariantHandler
 from reynir.bintokenizer import StringIterable
 from reynir.fastparser import ffi  # type: ignore
-from reynir.fastparser import Fast_Parser
+from reynir.fastparser import Fast_Parser, Node, ParseError
 from reynir.incparser import ICELANDIC_RATIO
 from reynir.reducer import Reducer
 from reynir.reynir import Job, ProgressFunc, DEFAULT_MAX_SENT_TOKENS
-from tokenizer import Abbreviations, Tok
+from reynir.simpletree import SimpleTree, SimpleTreeNode
+from tokenizer import Abbreviations, Tok, calculate_indexes
+from tokenizer import tokenize as tokenize_without_correction
 
 from .settings import Settings
 from .annotation import Annotation
-from .errfinder import ErrorDetectionToken, ErrorFinder
+from .errfinder import ErrorDetectionToken, ErrorFinder, ErrorRules
 from .errtokenizer import CorrectionPipeline, CorrectToken, settings_or_default
-from .pattern import PatternMatcher
+from .pattern import PatternMatcher, PatternSet
+
+if TYPE_CHECKING:
+    from .cache import SentenceCache
+    from .prefilter import HeuristicPrefilter
 
 # Style mark from BÍN:
 # NID = Niðrandi / disparaging
@@ -93,6 +122,23 @@ STYLE_WARNINGS: Mapping[str, str] = {
     "GAM": "gamalt",
 }
 
+# Number of sentences in each chunk of work when parsing in a process pool
+SENTENCES_PER_CHUNK = 8
+
+# The versions of GreynirCorrect and reynir, which are part of the
+# version of the results in the sentence cache
+PACKAGE_VERSIONS = (importlib.metadata.version("reynir-correct"), importlib.metadata.version("reynir"))
+
+# Policies for sentences that are longer than GreynirCorrect.long_sentence_words:
+# do not parse the sentence, only annotate it with E005
+LONG_SENTENCE_SKIP = "skip"
+# split the sentence at clause boundaries and parse the pieces separately
+LONG_SENTENCE_SPLIT = "split"
+LONG_SENTENCE_POLICIES = frozenset((LONG_SENTENCE_SKIP, LONG_SENTENCE_SPLIT))
+
+# Punctuation at which long sentences may be split into pieces
+CLAUSE_BOUNDARIES = frozenset((";", ":"))
+
 
 def style_warning(k: Ksnid) -> str:
     """Return a style warning for the given Ksnid tuple, if any"""
@@ -115,14 +161,255 @@ class ErrorDetectingGrammar(BIN_Grammar):
         self.set_conditions({"include_errors"})
 
 
+def bin_word_counts(tokens: Iterable[Tok]) -> Tuple[int, int]:
+    """Return the number of words in the tokens that are found in BÍN,
+    and the number of words that are not"""
+    words_in_bin = 0
+    words_not_in_bin = 0
+    for t in tokens:
+        if t.kind == TOK.WORD:
+            if t.has_meanings:
+                # The word has at least one meaning
+                words_in_bin += 1
+            else:
+                # The word has no recognized meaning
+                words_not_in_bin += 1
+        elif t.kind == TOK.PERSON:
+            # Person names count as recognized words
+            words_in_bin += 1
+        elif t.kind == TOK.ENTITY:
+            # Entity names do not count as recognized words;
+            # we count each enclosed word in the entity name
+            words_not_in_bin += t.txt.count(" ") + 1
+    return words_in_bin, words_not_in_bin
+
+
+def is_foreign(words_in_bin: int, words_not_in_bin: int) -> bool:
+    """Return True if a sentence with the given word counts
+    (see bin_word_counts()) is probably not in Icelandic"""
+    num_words = words_in_bin + words_not_in_bin
+    return num_words > 2 and words_in_bin / num_words < ICELANDIC_RATIO
+
+
+def clause_pieces(tokens: TokenList) -> List[Tuple[int, TokenList]]:
+    """Split a sentence at clause boundaries, returning a list of
+    (offset, tokens) tuples. The boundary tokens themselves are
+    not included in the pieces, and neither are empty pieces."""
+    pieces: List[Tuple[int, TokenList]] = []
+    start = 0
+    for ix, t in enumerate(tokens):
+        if t.kind == TOK.PUNCTUATION and t.txt in CLAUSE_BOUNDARIES:
+            if ix > start:
+                pieces.append((start, tokens[start:ix]))
+            start = ix + 1
+    if start < len(tokens):
+        pieces.append((start, tokens[start:]))
+    return pieces
+
+
+def long_sentence_annotation(sent: Sentence, num_words: int) -> Annotation:
+    """Return an E005 annotation for a sentence that is too long"""
+    return Annotation(
+        start=0,
+        end=len(sent.tokens) - 1,
+        code="E005",
+        text="Málsgreinin er í lengra lagi",
+        detail="Setningin er {0} orð, betra væri að skipta henni í styttri, auðlæsilegri setningar".format(
+            num_words
+        ),
+    )
+
+
+def shift_annotation(a: Annotation, offset: int) -> Annotation:
+    """Return a copy of the annotation with its token span shifted by offset"""
+    return Annotation(
+        start=a.start + offset,
+        end=a.end + offset,
+        code=a.code,
+        text=a.text,
+        detail=a.detail,
+        references=a.references,
+        original=a.original,
+        suggest=a.suggest,
+        suggestlist=a.suggestlist,
+    )
+
+
+def sort_annotations(ann: List[Annotation]) -> None:
+    """Sort a list of annotations in place and remove duplicates"""
+    # Sort the annotations by their start token index,
+    # and then by decreasing span length
+    ann.sort(key=lambda a: (a.start, -a.end))
+    # Eliminate duplicates, i.e. identical annotation
+    # codes for identical spans
+    i = 1
+    while i < len(ann):
+        a, prev = ann[i], ann[i - 1]
+        if a.code == prev.code and a.start == prev.start and a.end == prev.end:
+            # Identical annotation: remove it from the list
+            del ann[i]
+        else:
+            # Check the next pair
+            i += 1
+
+
+class ParseSkipped(ParseError):
+    """Base class for the exceptions raised when a sentence is
+    deliberately not parsed (see CheckJob.parse())"""
+
+
+class ParseTimeout(ParseSkipped):
+    """Raised when a sentence is not parsed, or its parse is abandoned,
+    because a time budget was exceeded"""
+
+
+class ForeignSentence(ParseSkipped):
+    """Raised when a sentence is not parsed because it is
+    probably not in Icelandic, and will be annotated with E004"""
+
+
+class LongSentence(ParseSkipped):
+    """Raised when a sentence is not parsed as a whole because it has more
+    words than GreynirCorrect.long_sentence_words, and will be annotated
+    with E005"""
+
+
+class CleanSentence(ParseSkipped):
+    """Raised when a sentence is not parsed because the prefilter
+    judges it free of grammatical errors"""
+
+
+# Map the names of ParseSkipped subclasses to the classes,
+# for passing them between processes
+PARSE_SKIPPED_CLASSES: Mapping[str, Type[ParseSkipped]] = {
+    cls.__name__: cls for cls in (ParseTimeout, ForeignSentence, LongSentence, CleanSentence)
+}
+
+
+@dataclass
+class ParseBudget:
+    """Time budget, in seconds, for parsing the sentences of a single
+    document. Once the parse of a sentence exceeds its budget, the parse
+    forest is discarded instead of being reduced and annotated; once the
+    budget of the document is spent, further sentences are not parsed.
+    The document deadline is in terms of time.time(), so that the budget
+    can be shared with worker processes."""
+
+    sentence_time: Optional[float] = None
+    document_time: Optional[float] = None
+    # The deadline of the document, or None if unlimited
+    deadline: Optional[float] = None
+
+    def start(self) -> "ParseBudget":
+        """Return a fresh budget for a document that starts now"""
+        deadline = None if self.document_time is None else time.time() + self.document_time
+        return ParseBudget(self.sentence_time, self.document_time, deadline)
+
+    @property
+    def exhausted(self) -> bool:
+        """Return True if the budget of the document has been spent"""
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def sentence_deadline(self, start: float) -> Optional[float]:
+        """Return the deadline for a sentence whose parse starts at the
+        given time, or None if unlimited"""
+        if self.sentence_time is None:
+            return self.deadline
+        deadline = start + self.sentence_time
+        return deadline if self.deadline is None else min(deadline, self.deadline)
+
+
 class AnnotatedSentence(Sentence):
     """A subclass that adds a list of Annotation instances to a Sentence object"""
 
-    def __init__(self, job: Job, s: TokenList) -> None:
+    def __init__(self, job: Job, s: TokenList, result: Optional["SentenceResult"] = None) -> None:
+        # The result of parsing and annotating the sentence elsewhere,
+        # such as in a worker process or the sentence cache, if any
+        self._result = result
         super().__init__(job, s)
-        self.annotations: List[Annotation] = []
+        self.annotations: List[Annotation] = [] if result is None else list(result.annotations)
         # Convert the list of tokens to a list of CorrectToken instances, avoids many casts
         self.correct_tokens: List[CorrectToken] = cast(List[CorrectToken], self.tokens)
+        # True if the parse trees have been released (see release_trees())
+        self.released = False
+
+    def parse(self) -> bool:
+        """Parse the sentence, unless it has a result already, in which
+        case the simplified tree is restored from the result but the deep
+        parse tree is not, so deep_tree is None"""
+        result = self._result
+        if result is None:
+            return super().parse()
+        if self._num is None:
+            self._simplified_tree = None if result.tree is None else SimpleTree([[result.tree]])
+            self._num = result.num
+            self._score = result.score
+            self._err_index = result.err_index
+            if result.error is not None:
+                error_cls = ParseError if result.skipped is None else PARSE_SKIPPED_CLASSES[result.skipped]
+                self._error = error_cls(result.error, token_index=result.err_index)
+        return self._num > 0
+
+    def release_trees(self) -> None:
+        """Drop the deep and simplified parse trees and the terminals of an
+        annotated sentence, to save memory, after putting the terminal text
+        (which has em/en dashes and the like) into the tokens. Afterwards,
+        only the tokens, the annotations and the parse statistics remain."""
+        if self.released:
+            return
+        terminals = self.terminals
+        if terminals is not None:
+            token_map = {t.index: t.text for t in terminals}
+            for ix, tok in enumerate(self.correct_tokens):
+                tok.txt = token_map.get(ix, tok.txt)
+        self._tree = None
+        self._simplified_tree = None
+        self._terminals = None
+        self._result = None
+        self.released = True
+
+    @classmethod
+    def from_result(cls, job: Job, s: TokenList, result: "SentenceResult") -> "AnnotatedSentence":
+        """Create an annotated sentence from the result of parsing and
+        annotating it elsewhere, without parsing it again"""
+        sent = cls(job, s, result)
+        sent.parse()
+        return sent
+
+
+class SentenceResult(NamedTuple):
+    """The result of parsing and annotating a sentence, as passed from
+    a worker process or kept in the sentence cache"""
+
+    # The simplified parse tree, as dumped by _Sentence.dump()
+    tree: Optional[SimpleTreeNode]
+    # Number of parse tree combinations, score of the best one
+    num: int
+    score: Optional[int]
+    # Token index and message of a parse error, if any
+    err_index: Optional[int]
+    error: Optional[str]
+    # The class name of the error, if the parse was deliberately skipped
+    skipped: Optional[str]
+    parse_time: float
+    reduce_time: float
+    annotations: List[Annotation]
+
+    @classmethod
+    def from_sentence(cls, sent: AnnotatedSentence, parse_time: float, reduce_time: float) -> "SentenceResult":
+        """Return the result of a parsed and annotated sentence"""
+        error = sent.error
+        return cls(
+            tree=None if sent.tree is None else sent.tree._head,  # type: ignore[reportPrivateUsage]
+            num=sent.combinations or 0,
+            score=sent.score,
+            err_index=sent.err_index,
+            error=None if error is None else str(error),
+            skipped=type(error).__name__ if isinstance(error, ParseSkipped) else None,
+            parse_time=parse_time,
+            reduce_time=reduce_time,
+            annotations=sent.annotations,
+        )
 
 
 # The type of a grammar check result
@@ -133,6 +420,154 @@ class CheckResult(TypedDict):
     num_tokens: int
     ambiguity: float
     parse_time: float
+    # Time spent on reducing parse forests, included in parse_time
+    reduce_time: float
+    # The longest time spent on parsing a single sentence
+    max_sentence_time: float
+    # Number of sentences not parsed because of a time budget
+    num_timed_out: int
+    # Number of sentences not parsed because they are probably foreign
+    num_foreign: int
+    # Number of sentences not parsed as a whole because they are too long
+    num_long: int
+    # Number of sentences not parsed because the prefilter judged them clean
+    num_prefiltered: int
+
+
+class CheckJob(_Job):
+    """A parse job that skips sentences that are probably foreign, longer
+    than allowed, or judged clean by the prefilter. It also observes an
+    optional time budget (see ParseBudget) and collects timing statistics
+    for its sentences."""
+
+    def __init__(
+        self,
+        greynir: "GreynirCorrect",
+        tokens: Iterable[Tok],
+        *,
+        budget: Optional[ParseBudget] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(greynir, tokens, **kwargs)
+        self._budget = budget
+        self._long_sentence_words = greynir.long_sentence_words
+        self._prefilter = greynir.prefilter
+        self.max_sentence_time = 0.0
+        self.num_timed_out = 0
+        self.num_foreign = 0
+        self.num_long = 0
+        self.num_prefiltered = 0
+
+    @property
+    def budget(self) -> Optional[ParseBudget]:
+        """The time budget of the job, if any"""
+        return self._budget
+
+    def _add_sentence(self, s: TokenList, num: int, parse_time: float, reduce_time: float) -> None:
+        """Add a processed sentence to the statistics"""
+        super()._add_sentence(s, num, parse_time, reduce_time)
+        self.max_sentence_time = max(self.max_sentence_time, parse_time)
+
+    def count_skipped(self, error: ParseSkipped) -> None:
+        """Count a sentence that was deliberately not parsed"""
+        if isinstance(error, ParseTimeout):
+            self.num_timed_out += 1
+        elif isinstance(error, ForeignSentence):
+            self.num_foreign += 1
+        elif isinstance(error, LongSentence):
+            self.num_long += 1
+        elif isinstance(error, CleanSentence):
+            self.num_prefiltered += 1
+
+    def parse(self, tokens: TokenList) -> Tuple[Node, int, int]:
+        """Parse the token sequence as in Job.parse(), but skip it up front
+        if it is foreign (by the same criterion as the E004 annotation), too
+        long, or clean according to the prefilter. Give up when the time
+        budget is spent: before parsing if the budget of the document is
+        spent, or before reducing the parse forest if the budget of the
+        sentence is spent."""
+        budget = self._budget
+        num = 0
+        score = 0
+        t0 = t1 = time.time()
+        try:
+            if budget is not None and budget.exhausted:
+                raise ParseTimeout("The time budget of the document is exhausted", token_index=0)
+            words_in_bin, words_not_in_bin = bin_word_counts(tokens)
+            if not self.parse_foreign_sentences and is_foreign(words_in_bin, words_not_in_bin):
+                # Sentence is foreign: it will be annotated with E004
+                # in any case, so don't attempt to parse it
+                raise ForeignSentence("Sentence is probably not in Icelandic", token_index=0)
+            num_words = words_in_bin + words_not_in_bin
+            if self._long_sentence_words is not None and num_words > self._long_sentence_words:
+                # Sentence has too many words to be parsed as a whole
+                raise LongSentence(
+                    "Sentence has more than {0} words".format(self._long_sentence_words),
+                    token_index=0,
+                )
+            if self._prefilter is not None and not self._prefilter.needs_parse(tokens):
+                # No sign of a grammatical error that parsing would reveal
+                raise CleanSentence("Sentence was judged clean by the prefilter", token_index=0)
+            if self._max_sent_tokens and len(tokens) > self._max_sent_tokens:
+                # Sentence is above the maximum length: don't attempt to parse it
+                raise ParseError(
+                    "Sentence is longer than {0} tokens".format(self._max_sent_tokens),
+                    token_index=self._max_sent_tokens,
+                )
+            forest = self.parser.go(tokens, root=self._root)
+            t1 = time.time()
+            deadline = None if budget is None else budget.sentence_deadline(t0)
+            if deadline is not None and t1 > deadline:
+                # Discard the forest rather than spending even more
+                # time on reducing it and annotating the sentence
+                raise ParseTimeout("The time budget of the sentence was exceeded", token_index=0)
+            num = Fast_Parser.num_combinations(forest)
+            if num > 1:
+                # Reduce the parse forest to a single
+                # "best" (highest-scoring) parse tree
+                reduced, score = self.reducer.go_with_score(forest)
+                assert reduced is not None
+                forest = reduced
+            return forest, num, score
+        except ParseSkipped as e:
+            self.count_skipped(e)
+            raise
+        finally:
+            # Accumulate statistics in the job object
+            now = time.time()
+            self._add_sentence(tokens, num, parse_time=now - t0, reduce_time=now - t1)
+
+    def add_result(self, sent: AnnotatedSentence, result: SentenceResult) -> None:
+        """Add a sentence that was parsed elsewhere, or taken from the
+        sentence cache, to the statistics, with the times of its result"""
+        if result.skipped is not None:
+            self.count_skipped(cast(ParseSkipped, sent.error))
+        self._add_sentence(sent.tokens, result.num, parse_time=result.parse_time, reduce_time=result.reduce_time)
+
+    def add_times(self, other: "CheckJob") -> None:
+        """Add the parse times of another job, such as one parsing
+        the pieces of a long sentence, to the statistics"""
+        self._parse_time += other.parse_time
+        self._reduce_time += other.reduce_time
+        self.max_sentence_time = max(self.max_sentence_time, other.max_sentence_time)
+
+    def result(self, sentences: List[AnnotatedSentence]) -> CheckResult:
+        """Return a check result for the given sentences of the job,
+        along with the job's statistics"""
+        return CheckResult(
+            sentences=sentences,
+            num_sentences=self.num_sentences,
+            num_parsed=self.num_parsed,
+            num_tokens=self.num_tokens,
+            ambiguity=self.ambiguity,
+            parse_time=self.parse_time,
+            reduce_time=self.reduce_time,
+            max_sentence_time=self.max_sentence_time,
+            num_timed_out=self.num_timed_out,
+            num_foreign=self.num_foreign,
+            num_long=self.num_long,
+            num_prefiltered=self.num_prefiltered,
+        )
 
 
 class ErrorDetectingParser(Fast_Parser):
@@ -153,6 +588,22 @@ class ErrorDetectingParser(Fast_Parser):
     _c_grammar: Any = cast(Any, ffi).NULL
     _c_grammar_ts: Optional[float] = None
 
+    # The error rules of the error-tagged nonterminals of the grammar,
+    # built once when the grammar is loaded (see ErrorFinder.error_rules)
+    _error_rules: ErrorRules = {}
+
+    @classmethod
+    def _load_grammar(cls, verbose: bool, ts: Optional[float]) -> BIN_Grammar:
+        """Load the grammar and build its table of error rules"""
+        g = super()._load_grammar(verbose, ts)
+        cls._error_rules = ErrorFinder.error_rules(g)
+        return g
+
+    @property
+    def error_rules(self) -> ErrorRules:
+        """Return the error rules of the grammar, keyed by nonterminal index"""
+        return self._error_rules
+
     @staticmethod
     def wrap_token(t: Tok, ix: int) -> ErrorDetectionToken:
         """Create an instance of a wrapped token"""
@@ -176,9 +627,41 @@ class GreynirCorrect(Greynir):
         pipeline: CorrectionPipeline,
         **options: Any,
     ) -> None:
+        # The constructor options, before any are consumed below or by the
+        # parent class, for creating equivalent instances in worker processes
+        self._init_options: Dict[str, Any] = dict(options)
+        # Time budgets, in seconds, for parsing a single sentence
+        # and the whole document (see ParseBudget)
+        sentence_budget: Optional[float] = options.pop("parse_sentence_budget", None)
+        document_budget: Optional[float] = options.pop("parse_document_budget", None)
+        # Sentences with more words than this are not parsed as a whole,
+        # but handled according to the long sentence policy
+        self.long_sentence_words: Optional[int] = options.pop("long_sentence_words", None)
+        self.long_sentence_policy: str = options.pop("long_sentence_policy", LONG_SENTENCE_SKIP)
+        if self.long_sentence_policy not in LONG_SENTENCE_POLICIES:
+            raise ValueError(f"Unknown long sentence policy: {self.long_sentence_policy}")
+        # True to skip parsing sentences that the heuristic prefilter judges
+        # clean, or a prefilter instance, such as one with other thresholds
+        self._parse_prefilter: Union[bool, "HeuristicPrefilter"] = options.pop("parse_prefilter", False)
+        # Maximum number of sentence results in the memory tier of the
+        # sentence cache, and the path of its SQLite tier, if any
+        cache_size: Optional[int] = options.pop("sentence_cache_size", None)
+        cache_path: Optional[str] = options.pop("sentence_cache_path", None)
+        # True to release the parse trees of each sentence as soon as it
+        # has been annotated (see AnnotatedSentence.release_trees())
+        self.lean_results: bool = options.pop("lean_results", False)
         super().__init__(**options)
         self.settings = settings
         self.pipeline = pipeline
+        self.sentence_cache: Optional["SentenceCache"] = None
+        if cache_size or cache_path:
+            # Only import the cache module if we need it
+            from .cache import SentenceCache
+
+            self.sentence_cache = SentenceCache(cache_size, cache_path)
+        self.parse_budget: Optional[ParseBudget] = None
+        if sentence_budget is not None or document_budget is not None:
+            self.parse_budget = ParseBudget(sentence_budget, document_budget)
 
     def tokenize(self, text: StringIterable) -> Iterator[Tok]:
         """Use the correcting tokenizer instead of the normal one"""
@@ -221,6 +704,19 @@ class GreynirCorrect(Greynir):
         assert GreynirCorrect._reducer is not None
         return GreynirCorrect._reducer
 
+    @property
+    def prefilter(self) -> Optional["HeuristicPrefilter"]:
+        """Return the heuristic prefilter, if enabled, creating it on first use"""
+        if self._parse_prefilter is True:
+            # Only construct the prefilter, and load its
+            # n-gram model, if we need it
+            from .prefilter import HeuristicPrefilter
+
+            self._parse_prefilter = HeuristicPrefilter(
+                self.parser.grammar, patterns=PatternSet.for_settings(self.settings)
+            )
+        return None if self._parse_prefilter is False else self._parse_prefilter
+
     def annotate(self, sent: Sentence) -> List[Annotation]:
         """Returns a list of annotations for a sentence object, containing
         spelling and grammar annotations of that sentence"""
@@ -235,25 +731,29 @@ class GreynirCorrect(Greynir):
             token_to_terminal = {
                 tnode.index: ix for ix, tnode in enumerate(sent.terminal_nodes) if tnode.index is not None
             }
+        # First, count the words that occur in BÍN
+        words_in_bin, words_not_in_bin = bin_word_counts(sent.tokens)
+        num_words = words_in_bin + words_not_in_bin
+        if is_foreign(words_in_bin, words_not_in_bin):
+            # The sentence contains less than 50% Icelandic
+            # words: assume it's in a foreign language and discard the
+            # token level annotations. Unless parse_foreign_sentences
+            # is set, the sentence was not parsed either (see CheckJob).
+            return [
+                # E004: The sentence is probably not in Icelandic
+                Annotation(
+                    start=0,
+                    end=len(sent.tokens) - 1,
+                    code="E004",
+                    text="Málsgreinin er sennilega ekki á íslensku",
+                    detail="{0:.0f}% orða í henni finnast ekki í íslenskri orðabók".format(
+                        words_not_in_bin / num_words * 100.0
+                    ),
+                )
+            ]
         grammar = self.parser.grammar
-        # First, add token-level annotations and count words that occur in BÍN
-        words_in_bin = 0
-        words_not_in_bin = 0
+        # Then, add token-level annotations
         for ix, t in enumerate(sent.tokens):
-            if t.kind == TOK.WORD:
-                if t.has_meanings:
-                    # The word has at least one meaning
-                    words_in_bin += 1
-                else:
-                    # The word has no recognized meaning
-                    words_not_in_bin += 1
-            elif t.kind == TOK.PERSON:
-                # Person names count as recognized words
-                words_in_bin += 1
-            elif t.kind == TOK.ENTITY:
-                # Entity names do not count as recognized words;
-                # we count each enclosed word in the entity name
-                words_not_in_bin += t.txt.count(" ") + 1
             # Note: these tokens and indices are the original tokens from
             # the submitted text, including ones that are not understood
             # by the parser, such as quotation marks and exotic punctuation
@@ -346,38 +846,32 @@ class GreynirCorrect(Greynir):
                 )
                 ann.append(a)
 
-        # Then, look at the whole sentence
-        num_words = words_in_bin + words_not_in_bin
-        if num_words > 2 and words_in_bin / num_words < ICELANDIC_RATIO:
-            # The sentence contains less than 50% Icelandic
-            # words: assume it's in a foreign language and discard the
-            # token level annotations
-            ann = [
-                # E004: The sentence is probably not in Icelandic
+        # Finally, look at the whole sentence
+        if num_words >= 30 or isinstance(sent.error, LongSentence):
+            # The sentence contains 30 words or more (or more than
+            # long_sentence_words, in which case it was not parsed),
+            # and should be split into shorter sentences to make the
+            # text easier to read.
+            ann.append(long_sentence_annotation(sent, num_words))
+
+        elif isinstance(sent.error, CleanSentence):
+            # The prefilter found no sign of a grammatical error,
+            # so the sentence was not parsed: keep the token-level annotations
+            pass
+
+        elif isinstance(sent.error, ParseTimeout):
+            # The sentence was not parsed for lack of time, which says
+            # nothing about its grammar; keep the token-level annotations
+            ann.append(
+                # E008: The time budget was exceeded
                 Annotation(
                     start=0,
                     end=len(sent.tokens) - 1,
-                    code="E004",
-                    text="Málsgreinin er sennilega ekki á íslensku",
-                    detail="{0:.0f}% orða í henni finnast ekki í íslenskri orðabók".format(
-                        words_not_in_bin / num_words * 100.0
-                    ),
+                    code="E008",
+                    text="Málsgreinin var ekki þáttuð vegna tímamarka",
+                    detail="Þáttun málsgreinarinnar tók of langan tíma og var því sleppt",
                 )
-            ]
-        elif num_words >= 30:
-            # The sentence contains 30 words or more, and should be split into shorter
-            # sentences to make the text easier to read.
-            a = Annotation(
-                start=0,
-                end=len(sent.tokens) - 1,
-                code="E005",
-                text="Málsgreinin er í lengra lagi",
-                detail="Setningin er {0} orð, betra væri að skipta henni í styttri, auðlæsilegri setningar".format(
-                    num_words
-                ),
             )
-            ann.append(a)
-
         elif not parsed:
             # If the sentence couldn't be parsed,
             # put an annotation on it as a whole.
@@ -401,54 +895,298 @@ class GreynirCorrect(Greynir):
             # Successfully parsed:
             # Add annotations for error-marked nonterminals from the grammar
             # found in the parse tree
-            ErrorFinder(ann, sent).run()
-            pm = PatternMatcher(ann, sent)
-            # Check whether external tone of voice patterns are given
-            if self.settings.tone_of_voice_patterns.PATH:
-                file_path = self.settings.tone_of_voice_patterns.PATH
-                module_name = os.path.splitext(os.path.basename(file_path))[0]
-                # Import the module
-                spec: Optional[ModuleSpec] = importlib.util.spec_from_file_location(module_name, file_path)
-                if spec is None:
-                    raise FileNotFoundError(f"Could not find a spec for module '{module_name}' at '{file_path}'")
-                assert isinstance(spec.loader, Loader)
-                module: ModuleType = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                # Add the external patterns to the pattern matcher
-                module.add_extra_patterns(pm)  # type: ignore # Mypy doesn't know about add_extra_patterns()
+            ErrorFinder(ann, sent, cast(ErrorDetectingParser, self.parser).error_rules).run()
+            # Include external tone of voice patterns, if given;
+            # these are loaded once per settings object
+            pm = PatternMatcher(ann, sent, PatternSet.for_settings(self.settings))
             # Run the pattern matcher on the sentence,
             # annotating questionable patterns
             pm.run()
-        # Sort the annotations by their start token index,
-        # and then by decreasing span length
-        ann.sort(key=lambda a: (a.start, -a.end))
-        # Eliminate duplicates, i.e. identical annotation
-        # codes for identical spans
-        i = 1
-        while i < len(ann):
-            a, prev = ann[i], ann[i - 1]
-            if a.code == prev.code and a.start == prev.start and a.end == prev.end:
-                # Identical annotation: remove it from the list
-                del ann[i]
-            else:
-                # Check the next pair
-                i += 1
+        sort_annotations(ann)
+        return ann
+
+    def annotate_pieces(
+        self, job: CheckJob, sent: AnnotatedSentence, pieces: List[Tuple[int, TokenList]]
+    ) -> List[Annotation]:
+        """Returns a list of annotations for a long sentence that was not
+        parsed as a whole, by parsing and annotating each of its pieces
+        (see clause_pieces()) as a separate sentence"""
+        # The pieces are parsed within a job of their own,
+        # as they do not count as sentences of the document
+        piece_job = CheckJob(
+            self,
+            (),
+            budget=job.budget,
+            parse=True,
+            max_sent_tokens=job._max_sent_tokens,  # type: ignore[reportPrivateUsage]
+        )
+        ann: List[Annotation] = []
+        for offset, piece in pieces:
+            for a in self.create_sentence(piece_job, piece).annotations:
+                # The whole sentence gets its own E005 annotation
+                if a.code != "E005":
+                    ann.append(shift_annotation(a, offset))
+        job.add_times(piece_job)
+        ann.append(long_sentence_annotation(sent, sum(bin_word_counts(sent.tokens))))
+        sort_annotations(ann)
         return ann
 
+    def create_job(self, tokens: Iterable[Tok], **kwargs: Any) -> CheckJob:
+        """Create a parse job for a document, with a fresh time budget"""
+        if self.sentence_cache is not None:
+            # Drop cached results if the settings or the grammar have been
+            # changed or reloaded, or GreynirCorrect or reynir upgraded
+            self.sentence_cache.invalidate(self.cache_version())
+        budget = None if self.parse_budget is None else self.parse_budget.start()
+        return CheckJob(self, tokens, budget=budget, **kwargs)
+
+    def submit(
+        self,
+        text: StringIterable,
+        parse: bool = False,
+        *,
+        split_paragraphs: bool = False,
+        progress_func: ProgressFunc = None,
+        max_sent_tokens: int = DEFAULT_MAX_SENT_TOKENS,
+    ) -> CheckJob:
+        """Submit a text to the tokenizer and parser, yielding a job object,
+        as in Greynir.submit(), but observing the time budget, if any"""
+        if split_paragraphs:
+            # Original text consists of paragraphs separated by newlines:
+            # insert paragraph separators before tokenization
+            assert isinstance(text, str)
+            text = mark_paragraphs(text)
+        return self.create_job(
+            self.tokenize(text),
+            parse=parse,
+            progress_func=progress_func,
+            max_sent_tokens=max_sent_tokens,
+        )
+
+    def cache_version(self) -> str:
+        """Return the version of the results in the sentence cache, which
+        changes with the settings, the grammar, the external pattern module
+        and the versions of GreynirCorrect and reynir"""
+        # Load the grammar, or reload it if it has been modified
+        self.parser
+        return self._cache_version()
+
+    def _cache_version(self) -> str:
+        """Return the version of the sentence cache, as of the grammar
+        that was last loaded"""
+        patterns = PatternSet.for_settings(self.settings)
+        return "/".join(
+            (
+                self.settings.version,
+                *PACKAGE_VERSIONS,
+                str(ErrorDetectingParser._grammar_ts),
+                patterns.digest if patterns is not None else "",
+            )
+        )
+
+    def cache_fingerprint(self, job: CheckJob) -> Tuple[Any, ...]:
+        """Return the cache version and the options that affect the results
+        of the sentences of a job, for the keys of the sentence cache"""
+        return (
+            self._cache_version(),
+            job.parse_foreign_sentences,
+            job._max_sent_tokens,  # type: ignore[reportPrivateUsage]
+            self.long_sentence_words,
+            self.long_sentence_policy,
+            self._parse_prefilter is not False,
+        )
+
     def create_sentence(self, job: Job, s: TokenList) -> AnnotatedSentence:
-        """Create a fresh sentence object and annotate it
-        before returning it to the client"""
+        """Create a fresh sentence object and annotate it before returning
+        it to the client, or take its result from the sentence cache"""
+        sent = self._cached_sentence(job, s)
+        if self.lean_results:
+            sent.release_trees()
+        return sent
+
+    def _cached_sentence(self, job: Job, s: TokenList) -> AnnotatedSentence:
+        """Create an annotated sentence, using the sentence cache if enabled"""
+        cache = self.sentence_cache
+        if cache is None or not isinstance(job, CheckJob) or not job.parse_immediately:
+            return self._create_sentence(job, s)
+        key = cache.key(s, self.cache_fingerprint(job))
+        result = cache.get(key)
+        if result is not None:
+            # An identical sentence has been checked before
+            sent = AnnotatedSentence.from_result(job, s, result)
+            job.add_result(sent, result._replace(parse_time=0.0, reduce_time=0.0))
+            return sent
+        parse_time, reduce_time = job.parse_time, job.reduce_time
+        sent = self._create_sentence(job, s)
+        if not isinstance(sent.error, ParseTimeout):
+            # Results that depend on the time budget are not cached
+            cache.put(
+                key, SentenceResult.from_sentence(sent, job.parse_time - parse_time, job.reduce_time - reduce_time)
+            )
+        return sent
+
+    def _create_sentence(self, job: Job, s: TokenList) -> AnnotatedSentence:
+        """Create a fresh sentence object and annotate it"""
         sent = AnnotatedSentence(job, s)
+        if (
+            isinstance(sent.error, LongSentence)
+            and self.long_sentence_policy == LONG_SENTENCE_SPLIT
+            and isinstance(job, CheckJob)
+        ):
+            pieces = clause_pieces(s)
+            if len(pieces) > 1:
+                # Add annotations from the separately parsed pieces
+                sent.annotations = self.annotate_pieces(job, sent, pieces)
+                return sent
         # Add spelling and grammar annotations to the sentence
         sent.annotations = self.annotate(sent)
         return sent
 
+    def job_sentences(self, job: CheckJob, *, processes: int = 1) -> List[AnnotatedSentence]:
+        """Return a list of the parsed and annotated sentences of a job.
+        If processes is 1, the job must have been created with parse=True,
+        otherwise with parse=False, as the sentences are then parsed in
+        a pool of worker processes."""
+        return list(self.iter_job_sentences(job, processes=processes))
+
+    def iter_job_sentences(self, job: CheckJob, *, processes: int = 1) -> Iterator[AnnotatedSentence]:
+        """Generate the parsed and annotated sentences of a job, in order,
+        as they are completed (see job_sentences()). If the generator is
+        closed early, the sentences that have not been parsed are dropped."""
+        for _, sent in self._iter_sentences((job,), processes):
+            if sent is not None:
+                yield sent
+
+    def iter_jobs_sentences(
+        self, jobs: Iterable[CheckJob], *, processes: int = 1
+    ) -> Iterator[Tuple[CheckJob, List[AnnotatedSentence]]]:
+        """Generate each of a number of jobs, in order, along with its parsed
+        and annotated sentences, once they are completed. The jobs are taken
+        from the iterable as their sentences are needed, so that they can be
+        created lazily. If processes is larger than 1, the jobs must have been
+        created with parse=False, and the sentences of consecutive jobs share
+        chunks of work in a single pool of worker processes, so that many short
+        documents are parsed as efficiently as one long one."""
+        sentences: List[AnnotatedSentence] = []
+        for job, sent in self._iter_sentences(jobs, processes):
+            if sent is None:
+                # The job is complete
+                yield job, sentences
+                sentences = []
+            else:
+                sentences.append(sent)
+
+    def _iter_sentences(
+        self, jobs: Iterable[CheckJob], processes: int
+    ) -> Iterator[Tuple[CheckJob, Optional[AnnotatedSentence]]]:
+        """Generate (job, sentence) tuples for the parsed and annotated
+        sentences of the jobs, in order, each job being followed by a
+        (job, None) tuple that marks its end"""
+        if processes == 1:
+            for job in jobs:
+                # Iterating through the sentences in the job causes
+                # them to be parsed and their statistics collected
+                for sent in job:
+                    yield job, cast(AnnotatedSentence, sent)
+                yield job, None
+            return
+        if "fork" in multiprocessing.get_all_start_methods():
+            # The workers inherit this instance, along with the grammar
+            # and the pattern tables, which are already loaded
+            context: BaseContext = multiprocessing.get_context("fork")
+            initargs: Tuple[Any, ...] = (self, None, {})
+        else:
+            # The workers must create their own instances, with the same
+            # options, except for the cache, which is kept in this process
+            context = multiprocessing.get_context()
+            options = {
+                k: v
+                for k, v in self._init_options.items()
+                if k not in ("sentence_cache_size", "sentence_cache_path")
+            }
+            initargs = (None, self.settings, options)
+
+        # The sentence cache is looked up and filled in this process,
+        # and only the sentences that are not found in it are sent to
+        # the workers
+        cache = self.sentence_cache
+
+        def collect(
+            chunk: List[Tuple[CheckJob, Optional[TokenList]]],
+            lookups: List[Tuple[Optional[str], Optional[SentenceResult]]],
+            future: "Optional[Future[List[SentenceResult]]]",
+        ) -> Iterator[Tuple[CheckJob, Optional[AnnotatedSentence]]]:
+            """Generate the results for a chunk of sentences, adding them to their
+            jobs, given the cache key and the cached result, if any, of each sentence"""
+            results = iter(() if future is None else future.result())
+            cached = iter(lookups)
+            for job, s in chunk:
+                if s is None:
+                    yield job, None
+                    continue
+                key, result = next(cached)
+                if result is not None:
+                    # An identical sentence has been checked before
+                    sent = AnnotatedSentence.from_result(job, s, result)
+                    job.add_result(sent, result._replace(parse_time=0.0, reduce_time=0.0))
+                else:
+                    result = next(results)
+                    sent = AnnotatedSentence.from_result(job, s, result)
+                    # Accumulate the statistics of the sentence in the job
+                    job.add_result(sent, result)
+                    if cache is not None and key is not None and result.skipped != ParseTimeout.__name__:
+                        # Results that depend on the time budget are not cached
+                        cache.put(key, result)
+                if self.lean_results:
+                    sent.release_trees()
+                yield job, sent
+
+        executor = ProcessPoolExecutor(
+            max_workers=processes or None, mp_context=context, initializer=_init_worker, initargs=initargs
+        )
+        try:
+            # Keep a bounded number of chunks in flight, so that long
+            # documents are not tokenized much ahead of the parsing
+            max_pending = 4 * (processes or multiprocessing.cpu_count())
+            pending: Deque[
+                Tuple[
+                    List[Tuple[CheckJob, Optional[TokenList]]],
+                    List[Tuple[Optional[str], Optional[SentenceResult]]],
+                    "Optional[Future[List[SentenceResult]]]",
+                ]
+            ] = deque()
+            for chunk in _sentence_chunks(jobs, SENTENCES_PER_CHUNK):
+                lookups: List[Tuple[Optional[str], Optional[SentenceResult]]] = []
+                work: List[Tuple[List[Tuple[Any, ...]], int, Optional[ParseBudget]]] = []
+                for job, s in chunk:
+                    if s is None:
+                        continue
+                    key = None if cache is None else cache.key(s, self.cache_fingerprint(job))
+                    result = None if cache is None or key is None else cache.get(key)
+                    lookups.append((key, result))
+                    if result is None:
+                        work.append(
+                            (
+                                [self._dump_token(t) for t in s],
+                                job._max_sent_tokens,  # type: ignore[reportPrivateUsage]
+                                job.budget,
+                            )
+                        )
+                future = executor.submit(_parse_chunk, work) if work else None
+                pending.append((chunk, lookups, future))
+                if len(pending) >= max_pending:
+                    yield from collect(*pending.popleft())
+            while pending:
+                yield from collect(*pending.popleft())
+        finally:
+            # Drop the chunks that have not been parsed if we are closed early
+            executor.shutdown(cancel_futures=True)
+
     def parse_all_token_iter(
         self, tokens: Iterable[Tok], *, progress_func: ProgressFunc = None
     ) -> Iterable[AnnotatedSentence]:
         """Parse all tokens in the given iterable, returning iterable sentences."""
-        job = _Job(
-            self,
+        job = self.create_job(
             tokens,
             parse=True,
             progress_func=progress_func,
@@ -459,25 +1197,213 @@ class GreynirCorrect(Greynir):
             sent = cast(AnnotatedSentence, sent)
             yield sent
 
-    def parse_all_tokens(self, tokens: Iterable[Tok], *, progress_func: ProgressFunc = None) -> CheckResult:
-        """Parse all tokens in the given iterable."""
-        job = _Job(
-            self,
+    def parse_all_tokens(
+        self, tokens: Iterable[Tok], *, progress_func: ProgressFunc = None, processes: int = 1
+    ) -> CheckResult:
+        """Parse all tokens in the given iterable. If processes is larger
+        than 1, the sentences are parsed and annotated in a pool of that
+        many worker processes; 0 means one worker per CPU core."""
+        job = self.create_job(
             tokens,
-            parse=True,
+            parse=processes == 1,
             progress_func=progress_func,
         )
-        # Iterating through the sentences in the job causes
-        # them to be parsed and their statistics collected
-        sentences = [cast(AnnotatedSentence, sent) for sent in job]
-        return CheckResult(
-            sentences=sentences,
-            num_sentences=job.num_sentences,
-            num_parsed=job.num_parsed,
-            num_tokens=job.num_tokens,
-            ambiguity=job.ambiguity,
-            parse_time=job.parse_time,
+        return job.result(self.job_sentences(job, processes=processes))
+
+    def session(self) -> "CheckSession":
+        """Return a session for checking successive versions of a
+        document, re-checking only the sentences that have changed"""
+        return CheckSession(self)
+
+
+class SessionSentence(NamedTuple):
+    """A checked sentence within a version of a document (see CheckSession)"""
+
+    # Index of the paragraph within the document
+    paragraph: int
+    # Character offset of the sentence's original text within the document
+    offset: int
+    sentence: AnnotatedSentence
+
+    def annotation_spans(self) -> List[Tuple[int, int]]:
+        """Return the character spans of the sentence's annotations within
+        the document, as (start, end) tuples where end is inclusive"""
+        char_indexes, _ = calculate_indexes(self.sentence.tokens, last_is_end=True)
+        return [
+            (char_indexes[a.start] + self.offset, char_indexes[a.end + 1] - 1 + self.offset)
+            for a in self.sentence.annotations
+        ]
+
+
+class SessionUpdate(NamedTuple):
+    """The result of checking a version of a document (see CheckSession.update())"""
+
+    sentences: List[SessionSentence]
+    # Number of sentences that were checked, and that were reused
+    # from the previous version of the document
+    num_checked: int
+    num_reused: int
+
+
+class _SessionEntry(NamedTuple):
+    """The checked sentences for a sentence of the plain tokenizer"""
+
+    # The original text of the sentence, without leading whitespace
+    original: str
+    sentences: List[AnnotatedSentence]
+
+
+class CheckSession:
+    """Checks successive versions of a document, such as one that is being
+    edited, only re-checking the sentences that have changed since the
+    previous version. The results are kept by a hash of the normalized
+    token text of each sentence, and the text of each paragraph is kept
+    so that unchanged paragraphs need not be tokenized again. Paragraphs
+    are separated by newlines."""
+
+    def __init__(self, gc: GreynirCorrect) -> None:
+        self._gc = gc
+        # The checked sentences of the current version, by sentence key
+        self._sentences: Dict[str, _SessionEntry] = {}
+        # The (key, original text) tuples of the sentences of
+        # each paragraph of the current version, by paragraph text
+        self._paragraphs: Dict[str, List[Tuple[str, str]]] = {}
+
+    @staticmethod
+    def sentence_key(tokens: Iterable[Tok]) -> str:
+        """Return the key of a sentence: a hash of its normalized token text"""
+        normalized = " ".join(t.txt for t in tokens if t.txt)
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+    @classmethod
+    def split_paragraph(cls, text: str) -> List[Tuple[str, str]]:
+        """Split a paragraph into sentences with the plain tokenizer, which
+        is much faster than the correction pipeline, returning a list of
+        (key, original text) tuples"""
+        result: List[Tuple[str, str]] = []
+        sent: List[Tok] = []
+        for t in tokenize_without_correction(text):
+            if t.kind in (TOK.S_BEGIN, TOK.S_END):
+                if sent:
+                    result.append((cls.sentence_key(sent), "".join(t.original or "" for t in sent)))
+                sent = []
+            elif t.original:
+                sent.append(t)
+        if sent:
+            result.append((cls.sentence_key(sent), "".join(t.original or "" for t in sent)))
+        return result
+
+    def check_sentence(self, original: str) -> List[AnnotatedSentence]:
+        """Run the correction pipeline on the original text of a sentence,
+        and parse and annotate it. The pipeline may find more than one
+        sentence in the text."""
+        gc = self._gc
+        job = gc.create_job(gc.tokenize(original), parse=True)
+        return [cast(AnnotatedSentence, sent) for sent in job]
+
+    def update(self, text: str) -> SessionUpdate:
+        """Check a new version of the document, reusing the results of
+        the sentences that are unchanged from the previous version"""
+        paragraphs: Dict[str, List[Tuple[str, str]]] = {}
+        entries: Dict[str, _SessionEntry] = {}
+        sentences: List[SessionSentence] = []
+        num_checked = num_reused = 0
+        offset = 0
+        for pix, ptext in enumerate(text.split("\n")):
+            split = paragraphs.get(ptext) or self._paragraphs.get(ptext)
+            if split is None:
+                split = self.split_paragraph(ptext)
+            paragraphs[ptext] = split
+            soffset = offset
+            for key, original in split:
+                # The sentence is checked without its leading whitespace,
+                # so that its results do not depend on it
+                stripped = original.lstrip()
+                soffset += len(original) - len(stripped)
+                entry = entries.get(key) or self._sentences.get(key)
+                if entry is None or entry.original != stripped:
+                    # New or changed sentence, or one whose whitespace has
+                    # changed, which affects the offsets of its tokens
+                    entry = _SessionEntry(stripped, self.check_sentence(stripped))
+                    num_checked += 1
+                else:
+                    num_reused += 1
+                entries[key] = entry
+                for sent in entry.sentences:
+                    sentences.append(SessionSentence(pix, soffset, sent))
+                    soffset += sum(len(t.original or "") for t in sent.tokens)
+            # Account for the newline at the end of the paragraph
+            offset += len(ptext) + 1
+        # Only keep the results of the current version
+        self._paragraphs = paragraphs
+        self._sentences = entries
+        return SessionUpdate(sentences, num_checked, num_reused)
+
+
+# GreynirCorrect instance used within worker processes of job_sentences()
+_worker_gc: Optional[GreynirCorrect] = None
+
+
+def _init_worker(gc: Optional[GreynirCorrect], settings: Optional[Settings], options: Dict[str, Any]) -> None:
+    """Initialize a worker process for GreynirCorrect.job_sentences()"""
+    global _worker_gc
+    if gc is None:
+        assert settings is not None
+        gc = GreynirCorrect(settings, CorrectionPipeline("", settings, **options), **options)
+    # The parent process looks up the sentence cache and stores the results
+    gc.sentence_cache = None
+    _worker_gc = gc
+    # Load the grammar and the pattern tables before the first sentence arrives
+    from .preload import warmup
+
+    warmup(gc.settings, spelling=False)
+
+
+def _parse_chunk(chunk: List[Tuple[List[Tuple[Any, ...]], int, Optional[ParseBudget]]]) -> List[SentenceResult]:
+    """Parse and annotate a chunk of sentences, given as (dumped tokens,
+    max_sent_tokens, budget) tuples, within a worker process. The sentences
+    may belong to different documents, with different budgets."""
+    gc = _worker_gc
+    assert gc is not None
+    # The jobs of the documents in the chunk, by their max_sent_tokens and budget.
+    # The sentences of a document share a single unpickled budget object.
+    jobs: Dict[Tuple[int, int], CheckJob] = {}
+    results: List[SentenceResult] = []
+    for dumped, max_sent_tokens, budget in chunk:
+        job = jobs.get((max_sent_tokens, id(budget)))
+        if job is None:
+            job = jobs[(max_sent_tokens, id(budget))] = CheckJob(
+                gc, (), budget=budget, parse=True, max_sent_tokens=max_sent_tokens
+            )
+        parse_time, reduce_time = job.parse_time, job.reduce_time
+        # Creating the sentence parses and annotates it
+        sent = gc.create_sentence(job, [gc._load_token(*t) for t in dumped])
+        results.append(
+            SentenceResult.from_sentence(sent, job.parse_time - parse_time, job.reduce_time - reduce_time)
         )
+    return results
+
+
+def _sentence_chunks(
+    jobs: Iterable[CheckJob], sentences_per_chunk: int
+) -> Iterator[List[Tuple[CheckJob, Optional[TokenList]]]]:
+    """Split the sentences of a number of jobs into chunks of (job, token list)
+    tuples, where a (job, None) tuple marks the end of each job"""
+    chunk: List[Tuple[CheckJob, Optional[TokenList]]] = []
+    num_sentences = 0
+    for job in jobs:
+        for pg in job.paragraphs():
+            # Each paragraph yields (index, token list) tuples
+            for _, s in pg._p:  # type: ignore[reportPrivateUsage]
+                chunk.append((job, s))
+                num_sentences += 1
+                if num_sentences >= sentences_per_chunk:
+                    yield chunk
+                    chunk = []
+                    num_sentences = 0
+        chunk.append((job, None))
+    if chunk:
+        yield chunk
 
 
 def check_single(
@@ -534,11 +1460,14 @@ def check_with_stats(
     settings: Optional[Settings] = None,
     split_paragraphs: bool = False,
     progress_func: ProgressFunc = None,
+    processes: int = 1,
     **options: Any,
 ) -> CheckResult:
     """Return a dict containing parsed paragraphs as well as statistics,
     using the given correction/parser class. This is a low-level
-    function; normally check_with_stats() should be used."""
+    function; normally check_with_stats() should be used.
+    If processes is larger than 1, the sentences are parsed in a pool of
+    that many worker processes; 0 means one worker per CPU core."""
     settings = settings_or_default(settings)
     split_paragraphs = options.pop("split_paragraphs", False)
     max_sent_tokens = options.pop("max_sent_tokens", DEFAULT_MAX_SENT_TOKENS)
@@ -547,19 +1476,9 @@ def check_with_stats(
     # This is an asynchronous (on-demand) parse job
     job = rc.submit(
         text,
-        parse=True,
+        parse=processes == 1,
         split_paragraphs=split_paragraphs,
         progress_func=progress_func,
         max_sent_tokens=max_sent_tokens,
     )
-    # Enumerating through the job's paragraphs and sentences causes them
-    # to be parsed and their statistics collected
-    sentences = [cast(AnnotatedSentence, sent) for pg in job.paragraphs() for sent in pg]
-    return CheckResult(
-        sentences=sentences,
-        num_tokens=job.num_tokens,
-        num_sentences=job.num_sentences,
-        num_parsed=job.num_parsed,
-        ambiguity=job.ambiguity,
-        parse_time=job.parse_time,
-    )
+    return job.result(rc.job_sentences(job, processes=processes))
@@ -0,0 +1,241 @@
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    Correction daemon module
+
+    Copyright © 2025 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module contains a daemon that keeps warm GreynirCorrectAPI
+    instances in a long-lived process and serves correction requests on
+    a local Unix socket, along with a thin client for it. It is used by
+    the 'correct --serve' and 'correct --client' commands, so that
+    invocations from shell pipelines do not each pay for loading the
+    grammar, the spelling corrector and the configuration.
+
+    The protocol is a single JSON request per connection: the client
+    sends an object with the input lines and the options of
+    check_errors(), and shuts down its side of the connection. The
+    daemon replies with an object containing either the output or an
+    error message, and closes the connection.
+
+    The client only needs the standard library, so that it starts fast;
+    the checker is imported by the daemon alone.
+
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+from collections import OrderedDict
+from threading import Lock, current_thread, main_thread
+
+if TYPE_CHECKING:
+    from .wrappers import GreynirCorrectAPI
+
+log = logging.getLogger(__name__)
+
+# Seconds that the client waits for a connection to the daemon
+CONNECT_TIMEOUT = 1.0
+
+
+class DaemonError(Exception):
+    """An error reported by the daemon while handling a request"""
+
+
+def _private_dir(path: str) -> str:
+    """Create a directory that only the user may access, or check that an
+    existing one is owned by the user and not accessible to others"""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"{path} is not a private directory of the current user")
+    return path
+
+
+def default_socket_path() -> str:
+    """Return the default path of the daemon's socket, which is private to the user"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "greynircorrect.sock")
+    # Other users can create files in the temporary directory, so the
+    # socket is put in a directory that only the user may access
+    private_dir = _private_dir(os.path.join(tempfile.gettempdir(), f"greynircorrect-{os.getuid()}"))
+    return os.path.join(private_dir, "daemon.sock")
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    """Read from the socket until the peer shuts down its side"""
+    chunks: List[bytes] = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def request(input: List[str], options: Dict[str, Any], socket_path: Optional[str] = None) -> str:
+    """Send the input lines and the options of check_errors() to the daemon
+    and return its output. Raises OSError if the daemon is not reachable,
+    or its socket is not owned by the user, and DaemonError if it fails
+    to handle the request."""
+    socket_path = socket_path or default_socket_path()
+    if os.stat(socket_path).st_uid != os.getuid():
+        # Do not send the input to a daemon run by another user
+        raise OSError(f"The socket {socket_path} is not owned by the current user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        # Correcting the input may take a while
+        sock.settimeout(None)
+        sock.sendall(json.dumps({"input": input, "options": options}, ensure_ascii=False).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        reply: Dict[str, Any] = json.loads(_recv_all(sock).decode("utf-8"))
+    if reply.get("error") is not None:
+        raise DaemonError(reply["error"])
+    return reply["output"]
+
+
+class CorrectionDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A Unix socket server that handles correction requests with warm
+    GreynirCorrectAPI instances, one for each distinct set of options"""
+
+    daemon_threads = True
+
+    # Maximum number of GreynirCorrectAPI instances that are kept warm
+    MAX_INSTANCES = 8
+
+    def __init__(self, socket_path: str, **options: Any) -> None:
+        self.socket_path = socket_path
+        self._instances: "OrderedDict[str, GreynirCorrectAPI]" = OrderedDict()
+        # Requests are read concurrently, but checked one at a time,
+        # since the checker and its pipeline keep state while checking
+        self._check_lock = Lock()
+        self._remove_stale_socket()
+        super().__init__(socket_path, _RequestHandler)
+        # Only the user may connect to the socket
+        os.chmod(socket_path, 0o600)
+        # Create and warm up an instance for the options that the daemon
+        # was started with, which are the defaults of its clients
+        from .preload import warmup
+
+        try:
+            warmup(self.instance(options).gc.settings)
+        except BaseException:
+            self.server_close()
+            raise
+
+    def _remove_stale_socket(self) -> None:
+        """Remove a socket file left behind by a daemon that is no longer running"""
+        if not os.path.exists(self.socket_path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+                return
+        raise OSError(f"A daemon is already listening on {self.socket_path}")
+
+    def instance(self, options: Dict[str, Any]) -> "GreynirCorrectAPI":
+        """Return a warm GreynirCorrectAPI instance for the options,
+        creating it if needed"""
+        from .wrappers import GreynirCorrectAPI
+
+        key = json.dumps(options, sort_keys=True, default=str)
+        api = self._instances.get(key)
+        if api is None:
+            api = self._instances[key] = GreynirCorrectAPI.from_options(**options)
+            while len(self._instances) > self.MAX_INSTANCES:
+                self._instances.popitem(last=False)
+        self._instances.move_to_end(key)
+        return api
+
+    def check(self, input: List[str], options: Dict[str, Any]) -> str:
+        """Check the input lines with the options of check_errors()"""
+        from .wrappers import CHECK_OPTIONS, check_errors_with
+
+        if not input:
+            return ""
+        options = dict(options)
+        check_options = {name: options.pop(name) for name in CHECK_OPTIONS if name in options}
+        with self._check_lock:
+            return check_errors_with(self.instance(options), input, **check_options)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Handle a single request on a connection to the daemon"""
+
+    server: CorrectionDaemon
+    request: socket.socket
+
+    def handle(self) -> None:
+        reply: Dict[str, Any]
+        try:
+            req: Dict[str, Any] = json.loads(_recv_all(self.request).decode("utf-8"))
+            reply = {"output": self.server.check(req.get("input") or [], req.get("options") or {})}
+        except Exception as e:
+            log.exception("Error while handling a correction request")
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        self.request.sendall(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+
+
+def serve(socket_path: Optional[str] = None, **options: Any) -> None:
+    """Run the correction daemon on the socket until interrupted"""
+    socket_path = socket_path or default_socket_path()
+    if current_thread() is main_thread():
+        # Exit cleanly, removing the socket file, when terminated
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with CorrectionDaemon(socket_path, **options) as daemon:
+        log.info("Serving corrections on %s", socket_path)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def split_input(options: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
+    """Split the options of check_errors() into the input lines, read from
+    a file object or a string, and the remaining options"""
+    options = dict(options)
+    text = options.pop("input", "")
+    lines: List[str] = ([text] if text else []) if isinstance(text, str) else list(text)
+    return lines, options
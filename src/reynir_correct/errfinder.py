@@ -38,7 +38,7 @@
 
 """
 
-from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union, cast
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union, cast
 from typing_extensions import Protocol, TypedDict
 
 import re
@@ -46,6 +46,7 @@ import re
 from reynir import TOK, Sentence, Tok, correct_spaces
 from reynir.binparser import BIN_Terminal, BIN_Token
 from reynir.fastparser import Node, ParseForestNavigator
+from reynir.grammar import Grammar
 from reynir.settings import VerbSubjects
 from reynir.simpletree import SimpleTree
 from reynir.verbframe import VerbErrors, VerbFrame
@@ -72,6 +73,25 @@ AnnotationTuple4 = Tuple[str, int, int, str]
 AnnotationTuple6 = Tuple[str, str, int, int, str, str]
 AnnotationReturn = Union[None, str, AnnotationTuple2, AnnotationTuple4, AnnotationTuple6, AnnotationDict]
 AnnotationFunc = Callable[[str, str, Node], AnnotationReturn]
+# An annotation function of ErrorFinder, unbound, taking the instance as its first argument
+AnnotationHandler = Callable[["ErrorFinder", str, str, Node], AnnotationReturn]
+
+
+class ErrorRule(NamedTuple):
+    """How to annotate an error-tagged nonterminal of the grammar"""
+
+    # The full name of the nonterminal, including variants
+    name: str
+    # The annotation function, or None to use a default text
+    handler: Optional[AnnotationHandler]
+    # The error code, P_NT_ + the base name without 'Villa'/'Aðvörun'
+    code: str
+    is_warning: bool
+    variants: str
+
+
+# Error rules keyed by nonterminal index, see ErrorFinder.error_rules()
+ErrorRules = Dict[int, ErrorRule]
 
 
 class CastFunction(Protocol):
@@ -236,16 +256,53 @@ class ErrorFinder(ParseForestNavigator):
         ),
     }
 
-    def __init__(self, ann: List[Annotation], sent: Sentence) -> None:
+    def __init__(self, ann: List[Annotation], sent: Sentence, rules: ErrorRules) -> None:
         super().__init__(visit_all=True)
         # Annotation list
         self._ann = ann
+        # Error rules of the error-tagged nonterminals of the grammar
+        self._rules = rules
         # The original sentence object
         self._sent = sent
         # Token list
         self._tokens = sent.tokens
         # Terminal node list
         self._terminal_nodes = sent.terminal_nodes
+        # Simplified trees of deep tree nodes, built at most once per node
+        self._simple_trees: Dict[int, Optional[SimpleTree]] = {}
+
+    @classmethod
+    def error_rules(cls, grammar: Grammar) -> ErrorRules:
+        """Return the error rules of the nonterminals that are tagged
+        with $tag(error) in the grammar, keyed by nonterminal index.
+        This is done once per grammar, see ErrorDetectingParser."""
+        rules: ErrorRules = {}
+        for index, nt in grammar.nonterminals_by_ix.items():
+            if nt.is_optional or not nt.has_tag("error"):
+                continue
+            name = nt.name
+            variants = ""
+            if "_" in name:
+                # Separate the variants
+                ix = name.index("_")
+                variants = name[ix + 1 :]
+                name = name[:ix]
+            # The error code is P_NT_ + the name of the error-tagged
+            # nonterminal, however after cutting 'Villa'/'Aðvörun' from its front
+            is_warning = False
+            if name.startswith("Aðvörun"):
+                # Warning
+                code = "P_NT_" + name[7:]
+                is_warning = True
+            elif name.startswith("Villa"):
+                # Error
+                code = "P_NT_" + name[5:]
+            else:
+                code = "P_NT_" + name
+            # See if we have a custom text function for this nonterminal
+            handler: Optional[AnnotationHandler] = getattr(cls, name, None)
+            rules[index] = ErrorRule(nt.name, handler, code, is_warning, variants)
+        return rules
 
     def run(self) -> Any:
         """Start navigating the deep tree structure of the sentence"""
@@ -266,9 +323,13 @@ class ErrorFinder(ParseForestNavigator):
     def _simple_tree(self, node: Node) -> Optional[SimpleTree]:
         """Return a SimpleTree instance spanning the deep tree
         of which node is the root"""
-        first, last = self.node_span(node)
-        toklist = self._tokens[first : last + 1]
-        return SimpleTree.from_deep_tree(node, toklist, first_token_index=first)
+        # The nodes are kept alive by the deep tree, so their ids are stable keys
+        key = id(node)
+        if key not in self._simple_trees:
+            first, last = self.node_span(node)
+            toklist = self._tokens[first : last + 1]
+            self._simple_trees[key] = SimpleTree.from_deep_tree(node, toklist, first_token_index=first)
+        return self._simple_trees[key]
 
     def node_text(self, node: Node, original_case: bool = False) -> str:
         """Return the text within the span of the node"""
@@ -1133,45 +1194,22 @@ class ErrorFinder(ParseForestNavigator):
 
     def visit_nonterminal(self, level: int, node: Node) -> Any:
         """Entering a nonterminal node"""
-        if node.is_interior or node.nonterminal is None or node.nonterminal.is_optional:
+        if node.is_interior or node.nonterminal is None:
             # Not an interesting node
             return None
-        if not node.nonterminal.has_tag("error"):
+        rule = self._rules.get(node.nonterminal.index)
+        if rule is None:
+            # Not tagged with $tag(error) in the grammar file (Greynir.grammar)
             return None
-        # This node has a nonterminal that is tagged with $tag(error)
-        # in the grammar file (Greynir.grammar)
         suggestion = None
         original = None
         ann_text: str = ""
         ann_detail = None
         start, end = self.node_span(node)
         span_text = self.node_text(node)
-        # See if we have a custom text function for this
-        # error-tagged nonterminal
-        name = node.nonterminal.name
-        variants = ""
-        if "_" in name:
-            # Separate the variants
-            ix = name.index("_")
-            variants = name[ix + 1 :]
-            name = name[:ix]
-        # Find the text function by dynamic dispatch
-        text_func: Optional[AnnotationFunc] = getattr(self, name, None)
-        # The error code in this case is P_NT_ + the name of the error-tagged
-        # nonterminal, however after cutting 'Villa'/'Aðvörun' from its front
-        is_warning = False
-        if name.startswith("Aðvörun"):
-            # Warning
-            code = "P_NT_" + name[7:]
-            is_warning = True
-        elif name.startswith("Villa"):
-            # Error
-            code = "P_NT_" + name[5:]
-        else:
-            code = "P_NT_" + name
-        if text_func is not None:
-            # Yes: call it with the nonterminal's spanned text as argument
-            ann = text_func(span_text, variants, node)
+        if rule.handler is not None:
+            # Call the custom text function with the nonterminal's spanned text as argument
+            ann = rule.handler(self, span_text, rule.variants, node)
             if isinstance(ann, str):
                 ann_text = ann
             elif isinstance(ann, tuple):
@@ -1193,20 +1231,20 @@ class ErrorFinder(ParseForestNavigator):
                 start = ann.get("start", start)
                 end = ann.get("end", end)
         else:
-            # No: use a default text
+            # No custom text function: use a default text
             ann_text = "'{0}' er líklega rangt".format(span_text)
-            ann_detail = "Regla {0}".format(node.nonterminal.name)
+            ann_detail = "Regla {0}".format(rule.name)
         self._ann.append(
             # P_NT_ + nonterminal name: Probable grammatical error.
             Annotation(
                 start=start,
                 end=end,
-                code=code,
+                code=rule.code,
                 text=ann_text,
                 detail=ann_detail,
                 original=original,
                 suggest=suggestion,
-                is_warning=is_warning,
+                is_warning=rule.is_warning,
             )
         )
         return None
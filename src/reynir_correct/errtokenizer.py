@@ -83,7 +83,7 @@ from tokenizer.definitions import (
 )
 
 from .settings import Settings
-from .spelling import Corrector
+from .spelling import Corrector, SpellingBudget
 
 # Token constructor classes
 TokenCtor = Type["Correct_TOK"]
@@ -1759,9 +1759,12 @@ def lookup_unknown_words(
     generate_suggestion_list: bool,
     suggest_not_correct: bool,
     settings: Settings,
+    budget: Optional[SpellingBudget] = None,
 ) -> Iterator[CorrectToken]:
     """Try to identify unknown words in the token stream, for instance
-    as spelling errors (character juxtaposition, deletion, insertion...)"""
+    as spelling errors (character juxtaposition, deletion, insertion...).
+    If a time budget is given, the spelling corrector degrades to cheaper
+    strategies for words, or the rest of the document, that exceed it."""
     at_sentence_start = False
     context: Tuple[str, ...] = tuple()
     db = corrector.db
@@ -2148,6 +2151,7 @@ def lookup_unknown_words(
                     token.txt,
                     context=tuple(context[-3:-1]),
                     at_sentence_start=at_sentence_start,
+                    budget=budget,
                 )
                 final_sugg_list: List[str] = []
                 m_list: List[List[BIN_Tuple]] = []
@@ -2187,6 +2191,7 @@ def lookup_unknown_words(
                 token.txt,
                 context=tuple(context[-3:-1]),
                 at_sentence_start=at_sentence_start,
+                budget=budget,
             )
             _, m = db.lookup_g(corrected_txt, at_sentence_start=at_sentence_start)
             if is_valid_suggestion(token, m, corrected_txt):
@@ -3023,6 +3028,13 @@ class CorrectionPipeline(DefaultPipeline):
         # Wordlist for words that should not be marked as errors or corrected
         self._ignore_wordlist = options.pop("ignore_wordlist", set())
         self._ignore_rules = cast(frozenset[str], options.pop("ignore_rules", frozenset()))
+        # Time budgets, in seconds, for the spelling correction of a single
+        # word and of the whole document (see SpellingBudget)
+        self._spelling_word_budget: Optional[float] = options.pop("spelling_word_budget", None)
+        self._spelling_document_budget: Optional[float] = options.pop("spelling_document_budget", None)
+        # The spelling budget of the most recently tokenized document,
+        # recording the words whose correction was degraded
+        self.spelling_budget: Optional[SpellingBudget] = None
         self.settings = settings
 
     def correct_tokens(self, stream: TokenIterator) -> TokenIterator:
@@ -3036,6 +3048,9 @@ class CorrectionPipeline(DefaultPipeline):
         assert self._db is not None
         if self._corrector is None:
             self._corrector = Corrector(self._db)
+        self.spelling_budget = None
+        if self._spelling_word_budget is not None or self._spelling_document_budget is not None:
+            self.spelling_budget = SpellingBudget(self._spelling_word_budget, self._spelling_document_budget)
         only_ci = self._only_ci
         ignore_rules = self._ignore_rules
 
@@ -3061,6 +3076,7 @@ class CorrectionPipeline(DefaultPipeline):
             self._generate_suggestion_list,
             self._suggest_not_correct,
             self.settings,
+            self.spelling_budget,
         )
         # Check taboo words and tone of voice words
         err_codes = {"T001/w", "T001", "V001/w", "V001"}
@@ -36,13 +36,11 @@
 
 """
 
-from typing import Dict, Union
+from typing import Any, Dict
 
 import argparse
 import sys
 
-from .wrappers import check_errors
-
 # File types for UTF-8 encoded text files
 ReadFile = argparse.FileType("r", encoding="utf-8")
 WriteFile = argparse.FileType("w", encoding="utf-8")
@@ -135,6 +133,13 @@ parser.add_argument(
 correct. Probably correct sentences will not go through the full parsing process.""",
     action="store_true",
 )
+parser.add_argument(
+    "--parse_prefilter",
+    help="""Do not parse sentences that show no sign of a grammatical error, judging from
+token errors, unknown words, trigram perplexity and trigger lemmas. Unlike --sentence_prefilter,
+this requires no additional packages.""",
+    action="store_true",
+)
 parser.add_argument(
     "--flesch",
     help="Calculate Flesch readability score for the input text",
@@ -162,8 +167,80 @@ parser.add_argument(
     default=False,
 )
 
+parser.add_argument(
+    "--spelling_word_budget",
+    type=float,
+    default=None,
+    help="Time budget in seconds for the spelling correction of a single word",
+)
+parser.add_argument(
+    "--spelling_document_budget",
+    type=float,
+    default=None,
+    help="Time budget in seconds for the spelling correction of the whole input",
+)
+parser.add_argument(
+    "--parse_sentence_budget",
+    type=float,
+    default=None,
+    help="Time budget in seconds for parsing a single sentence",
+)
+parser.add_argument(
+    "--parse_document_budget",
+    type=float,
+    default=None,
+    help="Time budget in seconds for parsing the whole input",
+)
+parser.add_argument(
+    "--long_sentence_words",
+    type=int,
+    default=None,
+    help="Do not parse sentences with more words than this as a whole",
+)
+parser.add_argument(
+    "--long_sentence_policy",
+    choices=["skip", "split"],
+    default="skip",
+    help="Skip parsing long sentences, or split them at semicolons and colons",
+)
+parser.add_argument(
+    "--lean_results",
+    help="Release the parse trees of each sentence once it has been annotated, to save memory",
+    action="store_true",
+)
+parser.add_argument(
+    "--sentence_cache_size",
+    type=int,
+    default=None,
+    help="Cache the results of up to this many sentences in memory, so that recurring sentences are parsed once",
+)
+parser.add_argument(
+    "--sentence_cache_path",
+    type=str,
+    default=None,
+    help="Path of an SQLite file for caching sentence results on disk, shared by processes on the host",
+)
+parser.add_argument(
+    "--serve",
+    help="""Run as a daemon that keeps the corrector loaded and serves 'correct --client'
+invocations on a local Unix socket. The other options are the defaults of the daemon.""",
+    action="store_true",
+)
+parser.add_argument(
+    "--client",
+    help="""Forward the input and options to a daemon started with 'correct --serve',
+falling back to correcting in this process if no daemon is running""",
+    action="store_true",
+)
+parser.add_argument(
+    "--socket",
+    type=str,
+    default=None,
+    help="Path of the Unix socket of the daemon (default: in $XDG_RUNTIME_DIR or the temporary directory)",
+)
 
-def from_args(args: argparse.Namespace) -> Dict[str, Union[str, bool]]:
+
+def from_args(args: argparse.Namespace) -> Dict[str, Any]:
     """Fill options with information from args"""
     format = args.format
     if args.json or args.grammar:  # The --grammar option implies --json
@@ -178,10 +255,20 @@ def from_args(args: argparse.Namespace) -> Dict[str, Union[str, bool]]:
         "normalize": args.normalize,
         "all_errors": args.all_errors or args.grammar,
         "sentence_prefilter": args.sentence_prefilter,
+        "parse_prefilter": args.parse_prefilter,
         "tov_config": args.tov_config,
         "suggest_not_correct": args.suggest_not_correct,
         "flesch": args.flesch,
         "rare_words": args.rare_words,
+        "spelling_word_budget": args.spelling_word_budget,
+        "spelling_document_budget": args.spelling_document_budget,
+        "parse_sentence_budget": args.parse_sentence_budget,
+        "parse_document_budget": args.parse_document_budget,
+        "long_sentence_words": args.long_sentence_words,
+        "long_sentence_policy": args.long_sentence_policy,
+        "lean_results": args.lean_results,
+        "sentence_cache_size": args.sentence_cache_size,
+        "sentence_cache_path": args.sentence_cache_path,
     }
 
 
@@ -189,6 +276,13 @@ def main() -> None:
     """Main function, called when the 'correct' command is invoked"""
 
     args = parser.parse_args()
+    if args.serve:
+        from .daemon import serve
+
+        options = from_args(args)
+        del options["input"]
+        serve(args.socket, **options)
+        return
     # Fill options with information from args
     if args.infile is sys.stdin and sys.stdin.isatty():
         # terminal input is empty, most likely no value was given for infile:
@@ -196,6 +290,19 @@ def main() -> None:
         print("No input has been given, nothing can be returned")
         sys.exit(1)
     options = from_args(args)
+    if args.client:
+        from .daemon import request, split_input
+
+        lines, daemon_options = split_input(options)
+        try:
+            print(request(lines, daemon_options, args.socket), file=args.outfile)
+            return
+        except OSError:
+            # No daemon is running: correct the input here instead
+            options["input"] = lines
+    # Import the checker only when there is something to check,
+    # so that the command line help is fast
+    from .wrappers import check_errors
 
     print(check_errors(**options), file=args.outfile)
 
@@ -39,28 +39,51 @@
 
 """
 
-from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, Union, cast
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union, cast
 
+import hashlib
+import importlib.util
 import json
 import os
+from contextvars import ContextVar
 from functools import partial
+from importlib.abc import Loader
+from itertools import chain
+from threading import Lock
+from weakref import WeakKeyDictionary
 
 from islenska import Bin
-from reynir import NounPhrase, Sentence
+from reynir import NounPhrase, Sentence, TokenList
 from reynir.bintokenizer import ALL_CASES
-from reynir.matcher import ContextDict
+from reynir.matcher import ContextDict, ItemList
 from reynir.simpletree import SimpleTree
 from reynir.verbframe import VerbErrors
 
 from reynir_correct.errtokenizer import emulate_case
 
 from .annotation import Annotation
+from .settings import ConfigError, Settings
 
 # The types involved in pattern processing
+Trigger = Union[str, Set[str], FrozenSet[str]]
 AnnotationFunction = Callable[[SimpleTree], None]
-PatternTuple = Tuple[Union[str, Set[str], FrozenSet[str]], str, AnnotationFunction, Optional[ContextDict]]
+PatternTuple = Tuple[Trigger, str, AnnotationFunction, Optional[ContextDict]]
+# In the class-wide pattern table of PatternMatcher, annotation functions
+# take the PatternMatcher instance of the sentence as their first argument
+MatcherFunction = Callable[["PatternMatcher", SimpleTree], None]
+MatcherPatternTuple = Tuple[Trigger, str, MatcherFunction, Optional[ContextDict]]
+
+# The BÍN database for word form lookups, created on first use (see bin_db())
+_BIN: Optional[Bin] = None
+
+
+def bin_db() -> Bin:
+    """Return the BÍN database for word form lookups, creating it on first use"""
+    global _BIN
+    if _BIN is None:
+        _BIN = Bin()
+    return _BIN
 
-BIN = Bin()
 
 # Variants not needed for lookup
 SKIPVARS = frozenset(("op", "subj", "0", "1", "2"))
@@ -125,12 +148,302 @@ class IcelandicPlaces:
         return place in cls.ICELOC_PREP
 
 
+class TriggerIndex:
+
+    """An inverted index from trigger lemmas to the patterns that they
+    trigger, allowing the patterns that may apply to a sentence to be
+    selected by looking up the lemmas of the sentence, instead of
+    testing the triggers of all patterns in turn"""
+
+    def __init__(self, triggers: Sequence[Trigger]) -> None:
+        self._index: Dict[str, List[int]] = {}
+        # Patterns without a trigger, which are always applied
+        self._untriggered: List[int] = []
+        for ix, trigger in enumerate(triggers):
+            if not trigger:
+                self._untriggered.append(ix)
+                continue
+            for lemma in (trigger,) if isinstance(trigger, str) else trigger:
+                self._index.setdefault(lemma, []).append(ix)
+
+    def candidates(self, lemmas: Iterable[str]) -> List[int]:
+        """Return the indices of the patterns that are triggered by
+        any of the given lemmas, or have no trigger, in ascending order"""
+        found: Set[int] = set(self._untriggered)
+        index = self._index
+        for lemma in lemmas:
+            ixs = index.get(lemma)
+            if ixs is not None:
+                found.update(ixs)
+        return sorted(found)
+
+    @property
+    def lemmas(self) -> FrozenSet[str]:
+        """The trigger lemmas of the indexed patterns"""
+        return frozenset(self._index)
+
+    @property
+    def has_untriggered(self) -> bool:
+        """True if some of the indexed patterns have no trigger,
+        and may therefore apply to any sentence"""
+        return bool(self._untriggered)
+
+
+# MatchProgram compiles patterns with the internals of reynir.matcher, which
+# are not part of its public API. If they are missing or have changed shape,
+# each pattern is matched on its own with SimpleTree.all_matches() instead.
+try:
+    from reynir.matcher import (  # type: ignore[reportPrivateUsage]
+        _NOT_ITEMS,
+        _CompiledPattern,
+        _NestedList,
+        contained,
+        run_set,
+        single_match,
+    )
+except ImportError:  # pragma: no cover
+    COMPILED_MATCHING = False
+else:
+
+    def _matcher_compatible() -> bool:
+        """Return True if the reynir.matcher internals look as expected"""
+        try:
+            items = _CompiledPattern.compile("VP > { 'x' }").items
+            return (
+                items[:2] == ["VP", ">"]
+                and isinstance(items[2], _NestedList)
+                and items[2].kind == "{"
+                and isinstance(_NOT_ITEMS, frozenset)
+                and all(callable(f) for f in (contained, run_set, single_match))
+            )
+        except Exception:
+            return False
+
+    COMPILED_MATCHING = _matcher_compatible()
+
+# A root item of a compiled pattern
+RootItem = Union[str, "_NestedList"]
+
+# A root item that is shared by a group of patterns: a plain item, such as
+# 'VP', or a tuple of plain alternatives, such as ('PP', 'VP', 'IP')
+RootKey = Union[str, Tuple[str, ...]]
+
+
+def _root_key(item: RootItem) -> Optional[RootKey]:
+    """Return a key identifying a pattern's root item, if the item can be
+    tested once on behalf of other patterns with the same root item, or
+    None if it cannot, for instance because it is a %macro that depends
+    on the pattern's context"""
+    if isinstance(item, str):
+        return None if item.startswith("%") or item in _NOT_ITEMS else item
+    if item.kind != "(" or not all(isinstance(it, str) for it in item):
+        return None
+    key = tuple(cast(List[str], item))
+    return None if any(it.startswith("%") or it in _NOT_ITEMS for it in key) else key
+
+
+class MatchProgram:
+
+    """A set of tree patterns, each compiled once into its parsed list
+    of matching items, and grouped by their root item, so that a single
+    traversal of a SimpleTree evaluates all the patterns at once. At each
+    subtree, the root item of a group is tested once, and only if it
+    matches are the patterns of the group tested further, by their
+    containment constraints. The matches are the same, and in the same
+    order, as those of SimpleTree.all_matches() for each pattern.
+
+    If the reynir.matcher internals are not usable (see COMPILED_MATCHING),
+    the patterns are kept uncompiled and each selected pattern is matched
+    by SimpleTree.all_matches() in turn."""
+
+    def __init__(self, patterns: Sequence[Tuple[str, Optional[ContextDict]]]) -> None:
+        self._patterns = [(pattern, context or {}) for pattern, context in patterns]
+        self.compiled = COMPILED_MATCHING
+        self._items: List[ItemList] = []
+        self._contexts: List[ContextDict] = []
+        # For patterns of the form ROOT [ >|>>|>>> ARGUMENT ], the index of
+        # the argument and the containment operator, or (0, "") if there is
+        # no containment constraint. None if the pattern must be run in full.
+        self._tails: List[Optional[Tuple[int, str]]] = []
+        # The group of each pattern, and the root item of each group,
+        # where None means that the pattern is in a group of its own
+        self._group_of: List[int] = []
+        self._roots: List[Optional[RootItem]] = []
+        if not self.compiled:
+            self._group_of = list(range(len(self._patterns)))
+            self._roots = [None] * len(self._patterns)
+            return
+        groups: Dict[RootKey, int] = {}
+        for pattern, context in self._patterns:
+            items = _CompiledPattern.compile(pattern).items  # type: ignore[reportPrivateUsage]
+            self._items.append(items)
+            self._contexts.append(context)
+            tail = self._tail(items)
+            key = _root_key(items[0]) if tail is not None else None
+            if key is None:
+                self._group_of.append(len(self._roots))
+                self._roots.append(None)
+            else:
+                if key not in groups:
+                    groups[key] = len(self._roots)
+                    self._roots.append(items[0])
+                self._group_of.append(groups[key])
+            self._tails.append(tail)
+
+    @staticmethod
+    def _tail(items: ItemList) -> Optional[Tuple[int, str]]:
+        """Return the containment argument index and operator of a pattern
+        that consists of a single root item, or None for other patterns"""
+        if len(items) == 1:
+            return (0, "")
+        pc = 1
+        while pc < len(items) and pc <= 3 and items[pc] == ">":
+            pc += 1
+        if pc == 1 or pc != len(items) - 1:
+            return None
+        return (pc, ">" * (pc - 1))
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def matches(self, tree: SimpleTree, selected: Iterable[int]) -> Dict[int, List[SimpleTree]]:
+        """Return the subtrees of the tree, including the tree itself,
+        that match each of the selected patterns, in traversal order"""
+        return MatchProgram.match_all(tree, [(self, selected)])[0]
+
+    @staticmethod
+    def match_all(
+        tree: SimpleTree, selections: Sequence[Tuple["MatchProgram", Iterable[int]]]
+    ) -> List[Dict[int, List[SimpleTree]]]:
+        """Return, for each of several match programs and its selected
+        patterns, the matching subtrees of the tree, as in matches(),
+        while traversing the tree only once for all the programs"""
+        results: List[Dict[int, List[SimpleTree]]] = []
+        programs: List[
+            Tuple[
+                "MatchProgram",
+                Dict[int, List[SimpleTree]],
+                List[Tuple[Optional[RootItem], List[int]]],
+            ]
+        ] = []
+        for program, selected in selections:
+            found: Dict[int, List[SimpleTree]] = {}
+            grouped: Dict[int, List[int]] = {}
+            for ix in selected:
+                found[ix] = []
+                grouped.setdefault(program._group_of[ix], []).append(ix)
+            results.append(found)
+            if not program.compiled:
+                for ix in found:
+                    pattern, context = program._patterns[ix]
+                    found[ix] = list(tree.all_matches(pattern, context))
+            elif grouped:
+                active = [(program._roots[group], ixs) for group, ixs in grouped.items()]
+                programs.append((program, found, active))
+        if not programs:
+            return results
+        for subtree in chain([tree], tree.descendants):
+            for program, found, active in programs:
+                items, contexts, tails = program._items, program._contexts, program._tails
+                for root, ixs in active:
+                    if root is None:
+                        # A pattern in a group of its own: run it in full
+                        ix = ixs[0]
+                        if run_set(iter([subtree]), items[ix], contexts[ix]):
+                            found[ix].append(subtree)
+                        continue
+                    if not single_match(root, subtree, {}):
+                        continue
+                    for ix in ixs:
+                        pc, op = cast(Tuple[int, str], tails[ix])
+                        if not op or contained(subtree, items[ix], pc, op, contexts[ix]):
+                            found[ix].append(subtree)
+        return results
+
+
+# The PatternMatcher currently applying its patterns to a sentence
+_current_matcher: "ContextVar[Optional[PatternMatcher]]" = ContextVar("current_matcher", default=None)
+
+
+class PatternSet:
+
+    """A set of patterns from an external pattern module, such as the
+    tone of voice patterns given in the [tone_of_voice_patterns] section
+    of a configuration file. The module is imported, and its patterns
+    collected and validated, once per Settings object instead of once
+    per sentence.
+
+    The module's add_extra_patterns(pm) function is called with this
+    object in place of a PatternMatcher. Annotation functions that refer
+    to pm when called, for instance to pm._ann or pm._sent, are served
+    by the PatternMatcher that is currently applying the patterns."""
+
+    _cache: "WeakKeyDictionary[Settings, PatternSet]" = WeakKeyDictionary()
+    _lock = Lock()
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.patterns: List[PatternTuple] = []
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        if spec is None or not isinstance(spec.loader, Loader):
+            raise ConfigError(f"Could not find a spec for module '{module_name}' at '{path}'")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        add_extra_patterns = getattr(module, "add_extra_patterns", None)
+        if not callable(add_extra_patterns):
+            raise ConfigError(f"Pattern module '{path}' does not define add_extra_patterns()")
+        add_extra_patterns(self)
+        # A hash of the module source, which changes if the module is edited
+        with open(path, "rb") as f:
+            self.digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        self.index = TriggerIndex([p[0] for p in self.patterns])
+        self.program = MatchProgram([(p[1], p[3]) for p in self.patterns])
+
+    @classmethod
+    def for_settings(cls, settings: Settings) -> Optional["PatternSet"]:
+        """Return the external pattern set of the given settings,
+        if any, loading it on first use"""
+        path = settings.tone_of_voice_patterns.PATH
+        if not path:
+            return None
+        with cls._lock:
+            ps = cls._cache.get(settings)
+            if ps is None or ps.path != path:
+                # Not loaded, or the settings have been modified
+                ps = cls._cache[settings] = cls(path)
+            return ps
+
+    def add_pattern(self, p: PatternTuple) -> None:
+        """Validate and add a pattern to the set"""
+        if not isinstance(p, tuple) or len(p) != 4:
+            raise ConfigError(f"Pattern in '{self.path}' should be a (trigger, pattern, function, context) tuple")
+        trigger, pattern, func, ctx = p
+        if trigger and not isinstance(trigger, (str, set, frozenset)):
+            raise ConfigError(f"Invalid trigger for pattern '{pattern}' in '{self.path}'")
+        if not isinstance(pattern, str) or not callable(func):
+            raise ConfigError(f"Invalid pattern or annotation function in '{self.path}'")
+        if ("%" in pattern) != (ctx is not None):
+            raise ConfigError(
+                f"Pattern '{pattern}' in '{self.path}' should have a context if and only if it uses a %macro"
+            )
+        self.patterns.append(p)
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate other attribute access to the current PatternMatcher"""
+        pm = _current_matcher.get()
+        if pm is None:
+            raise AttributeError(f"'{name}' is only available while patterns are being applied")
+        return getattr(pm, name)
+
+
 class PatternMatcher:
 
     """Class to match parse trees with patterns to find probable usage errors"""
 
     # The patterns to be matched are created when the
-    # first class instance is initialized.
+    # first class instance is initialized, and are shared
+    # by all instances. They must not be modified thereafter.
 
     # Each entry in the patterns list is a tuple of four values:
 
@@ -139,35 +452,72 @@ class PatternMatcher:
     #   If the trigger is falsy (None, ""), it is not applied and the sentence will be
     #   checked regardless of its content.
     # * Match pattern expression, to be passed to match_pattern()
-    # * Annotation function, called for each match
+    # * Annotation function, called with the PatternMatcher instance and each match
     # * Context dictionary to be passed to match_pattern()
-    def __init__(self, ann: List[Annotation], sent: Sentence) -> None:
+    PATTERNS: Tuple[MatcherPatternTuple, ...] = ()
+    # Index from trigger lemmas to entries in PATTERNS
+    _index = TriggerIndex(())
+    # The compiled patterns of PATTERNS, for matching them in one traversal
+    _program = MatchProgram(())
+    # The pattern list while it is being created
+    _patterns: List[MatcherPatternTuple] = []
+    _patterns_created = False
+    _lock = Lock()
+
+    # Context dictionaries for the patterns, also created with the patterns
+    ctx_af: ContextDict = cast(ContextDict, None)
+    ctx_að: ContextDict = cast(ContextDict, None)
+    ctx_noun_af: ContextDict = cast(ContextDict, None)
+    ctx_noun_af_obj: ContextDict = cast(ContextDict, None)
+    ctx_verb_01: ContextDict = cast(ContextDict, None)
+    ctx_verb_02: ContextDict = cast(ContextDict, None)
+    ctx_noun_að: ContextDict = cast(ContextDict, None)
+    ctx_subjsing: ContextDict = cast(ContextDict, None)
+    ctx_place_names: ContextDict = cast(ContextDict, None)
+    ctx_uncertain_verbs: ContextDict = cast(ContextDict, None)
+    ctx_confident_verbs: ContextDict = cast(ContextDict, None)
+    ctx_dir_loc: ContextDict = cast(ContextDict, None)
+
+    def __init__(self, ann: List[Annotation], sent: Sentence, extra: Optional[PatternSet] = None) -> None:
         # Annotation list
         self._ann = ann
         # The original sentence object
         self._sent = sent
-        # Token list
-        self._tokens = sent.tokens
-        # Terminal node list
-        self._terminal_nodes = sent.terminal_nodes
-
-        self.PATTERNS: List[PatternTuple] = []
-
-        self.ctx_af: ContextDict = cast(ContextDict, None)
-        self.ctx_að: ContextDict = cast(ContextDict, None)
-        self.ctx_noun_af: ContextDict = cast(ContextDict, None)
-        self.ctx_noun_af_obj: ContextDict = cast(ContextDict, None)
-        self.ctx_verb_01: ContextDict = cast(ContextDict, None)
-        self.ctx_verb_02: ContextDict = cast(ContextDict, None)
-        self.ctx_noun_að: ContextDict = cast(ContextDict, None)
-        self.ctx_subjsing: ContextDict = cast(ContextDict, None)
-        self.ctx_place_names: ContextDict = cast(ContextDict, None)
-        self.ctx_uncertain_verbs: ContextDict = cast(ContextDict, None)
-        self.ctx_confident_verbs: ContextDict = cast(ContextDict, None)
-        self.ctx_dir_loc: ContextDict = cast(ContextDict, None)
-
-        # First instance: create the class-wide pattern list
-        self.create_patterns()
+        # Patterns of an external pattern module, if given
+        self._extra = extra
+        if not PatternMatcher._patterns_created:
+            # First instance: create the class-wide pattern list
+            PatternMatcher._create_pattern_table()
+
+    @classmethod
+    def _create_pattern_table(cls) -> None:
+        """Create the class-wide pattern table, its trigger index
+        and its match program, if not already done"""
+        with PatternMatcher._lock:
+            if not PatternMatcher._patterns_created:
+                PatternMatcher._patterns = []
+                PatternMatcher.create_patterns()
+                PatternMatcher.PATTERNS = tuple(PatternMatcher._patterns)
+                PatternMatcher._index = TriggerIndex([p[0] for p in PatternMatcher.PATTERNS])
+                PatternMatcher._program = MatchProgram([(p[1], p[3]) for p in PatternMatcher.PATTERNS])
+                PatternMatcher._patterns_created = True
+
+    @classmethod
+    def trigger_index(cls) -> TriggerIndex:
+        """Return the trigger index of the class-wide pattern table"""
+        if not PatternMatcher._patterns_created:
+            PatternMatcher._create_pattern_table()
+        return PatternMatcher._index
+
+    @property
+    def _tokens(self) -> TokenList:
+        """Token list"""
+        return self._sent.tokens
+
+    @property
+    def _terminal_nodes(self) -> List[SimpleTree]:
+        """Terminal node list"""
+        return self._sent.terminal_nodes
 
     @staticmethod
     def get_wordform(word: str, lemma: str, cat: str, variants: Iterable[str]) -> str:
@@ -182,7 +532,7 @@ class PatternMatcher:
                 realvars -= ALL_CASES
         else:
             realvars = variants
-        wordforms = BIN.lookup_variants(word, cat, tuple(realvars), lemma=lemma)
+        wordforms = bin_db().lookup_variants(word, cat, tuple(realvars), lemma=lemma)
         if not wordforms:
             return ""
         # Can be many possible word forms; we want the first one in most cases
@@ -1535,7 +1885,7 @@ class PatternMatcher:
         variants.discard("gr")
         variants.discard(no.cat)  # all_variants for no_ terminals includes the gender
         variants.add("nogr")
-        v = BIN.lookup_variants(no.lemma, no.cat, tuple(variants))
+        v = bin_db().lookup_variants(no.lemma, no.cat, tuple(variants))
         if not v:
             return
         suggest = v[0].bmynd.replace("-", "")
@@ -1707,17 +2057,19 @@ class PatternMatcher:
             )
         )
 
-    def add_pattern(self, p: PatternTuple) -> None:
+    @classmethod
+    def _add_pattern(cls, p: MatcherPatternTuple) -> None:
         """Validates and adds a pattern to the class global pattern list"""
         _, pattern, _, ctx = p
         if "%" in pattern:
             assert ctx is not None, "Missing context for pattern with %macro"
         else:
             assert ctx is None, "Unnecessary context given for pattern with no %macro"
-        self.PATTERNS.append(p)
+        cls._patterns.append(p)
 
-    def create_patterns(self) -> None:
-        """Initialize the list of patterns and handling functions"""
+    @classmethod
+    def create_patterns(cls) -> None:
+        """Initialize the class-wide list of patterns and handling functions"""
 
         # Access the dictionary of verb+preposition attachment errors
         # from the settings (actually from the reynir settings),
@@ -1768,333 +2120,333 @@ class PatternMatcher:
             # Note that we use the own_lemma_mm property instead of own_lemma. This
             # means that the lambda condition matches middle voice stem forms,
             # such as 'dást' instead of 'dá'.
-            self.ctx_af = {
+            cls.ctx_af = {
                 "verb": lambda tree: (tree.own_lemma_mm in verbs_af and not (set(tree.variants) & {"1", "2"}))
             }
             # Catch sentences such as 'Jón leitaði af kettinum'
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     verbs_af,  # Trigger lemma for this pattern
                     'VP > { VP >> { %verb } PP >> { P > { "af" } } }',
-                    self.wrong_preposition_af,
-                    self.ctx_af,
+                    cls.wrong_preposition_af,
+                    cls.ctx_af,
                 )
             )
             # Catch sentences such as 'Vissulega er hægt að brosa af þessu',
             # 'Friðgeir var leitandi af kettinum í allan dag'
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     verbs_af,  # Trigger lemma for this pattern
                     '. > { (NP-PRD | IP-INF) > { VP > { %verb } } PP >> { P > { "af" } } }',
-                    self.wrong_preposition_af,
-                    self.ctx_af,
+                    cls.wrong_preposition_af,
+                    cls.ctx_af,
                 )
             )
             # Catch "Það sem Jón spurði ekki af...", "Jón spyr (ekki) af því."
-            #    self.add_pattern(
+            #    cls._add_pattern(
             #        (
             #            "spyrja",  # Trigger lemma for this pattern
             #            "IP > { VP >> { 'spyrja' } ADVP > { 'af' } }",
-            #            self.wrong_preposition_af,
-            #            self.ctx_af,
+            #            cls.wrong_preposition_af,
+            #            cls.ctx_af,
             #        )
             #    )
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "spyrja",  # Trigger lemma for this pattern
                     "VP > { VP > { 'spyrja' } ADVP > { \"af\" } }",
-                    self.wrong_preposition_spyrja_af,
+                    cls.wrong_preposition_spyrja_af,
                     None,
                 )
             )
             # Catch "Jón spyr af því."
-            #    self.add_pattern(
+            #    cls._add_pattern(
             #        (
             #            "spyrja",  # Trigger lemma for this pattern
             #            "IP > { VP >> { 'spyrja' } PP > { 'af' } }",
-            #            self.wrong_preposition_af,
+            #            cls.wrong_preposition_af,
             #            None,
             #        )
             #    )
             # Catch "...vegna þess að dýr leita af öðrum smærri dýrum."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "leita",  # Trigger lemma for this pattern
                     "VP > { PP >> { 'leita' } PP > 'af' }",
-                    self.wrong_preposition_af,
+                    cls.wrong_preposition_af,
                     None,
                 )
             )
 
             # Catch "Þetta er mesta vitleysa sem ég hef orðið vitni af", "Hún varð vitni af því þegar kúturinn sprakk"
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "vitni",  # Trigger lemma for this pattern
                     "VP > { VP > { ('verða'|'vera') } NP > { \"vitni\" } ADVP > \"af\" }",
-                    self.wrong_preposition_vitni_af,
+                    cls.wrong_preposition_vitni_af,
                     None,
                 )
             )
             # Catch "Hún gerði grín af því.", "Þetta er mesta vitleysa sem ég hef gert grín af.", "...og gerir grín af sjálfum sér."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "grín",  # Trigger lemma for this pattern
                     # "IP",
                     "VP > { NP > { 'grín' } ( PP|ADVP ) > { \"af\" } }",
-                    self.wrong_preposition_grin_af,
+                    cls.wrong_preposition_grin_af,
                     None,
                 )
             )
             # Catch "Hann leiðir (ekki) líkur af því.", "Hann hefur aldrei leitt líkur af því."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "leiða",  # Trigger lemma for this pattern
                     "VP > { VP > { 'leiða' } NP > { ('líkur' | 'rök' | 'rak') } PP > { \"af\" } }",
-                    self.wrong_preposition_leida_af,
+                    cls.wrong_preposition_leida_af,
                     None,
                 )
             )
             # Catch "Tíminn markar upphaf af því."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "upphaf",  # Trigger lemma for this pattern
                     "VP > { VP > { 'marka' } NP-OBJ > { 'upphaf' PP > { 'af' } } }",
-                    self.wrong_preposition_marka_af,
+                    cls.wrong_preposition_marka_af,
                     None,
                 )
             )
             # Catch "Það markar ekki upphaf af því."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     frozenset(("upphafinn", "upphaf")),  # Trigger lemma for this pattern
                     "VP > { VP > { 'marka' } NP > { ('upphafinn'|'upphaf') } PP > { 'af' } }",
-                    self.wrong_preposition_marka_af,
+                    cls.wrong_preposition_marka_af,
                     None,
                 )
             )
             # Catch "Það markar upphaf af því."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "upphaf",  # Trigger lemma for this pattern
                     "VP > { VP > { VP > { 'marka' } NP-SUBJ > { 'upphaf' } } PP > { 'af' } }",
-                    self.wrong_preposition_marka_af,
+                    cls.wrong_preposition_marka_af,
                     None,
                 )
             )
-            #    self.add_pattern(
+            #    cls._add_pattern(
             #        (
             #            "upphefja",  # Trigger lemma for this pattern
             #            "IP",
-            #            self.wrong_preposition_marka_af,
+            #            cls.wrong_preposition_marka_af,
             #            None,
             #        )
             #    )
             # Catch "Það hefur ekki markað upphafið af því."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "upphefja",  # Trigger lemma for this pattern
                     "VP > { NP > { 'markaður' } VP > { 'upphefja' } PP > { 'af' } }",
-                    self.wrong_preposition_marka_af,
+                    cls.wrong_preposition_marka_af,
                     None,
                 )
             )
             # Catch "Jón leggur hann (ekki) af velli.", "Jón hefur (ekki) lagt hann af velli."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     frozenset(("völlur", "vell", "velli")),  # Trigger lemmas for this pattern
                     'VP > { VP > { \'leggja\' } PP > { P > { "af" } NP > { "velli" } } }',
-                    self.wrong_preposition_leggja_af,
+                    cls.wrong_preposition_leggja_af,
                     None,
                 )
             )
             # Catch "Jón kann það (ekki) utan af."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "kunna",  # Trigger lemma for this pattern
                     "VP > { VP > { 'kunna' } ADVP > { 'utan' } ADVP > { 'af' } }",
-                    self.wrong_preposition_utan_af,
+                    cls.wrong_preposition_utan_af,
                     None,
                 )
             )
             # Catch "Honum varð af ósk sinni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "ósk",  # Trigger lemma for this pattern
                     "(S-MAIN | IP) > { VP > { 'verða' } PP > { 'af' NP > { 'ósk' } } }",
-                    self.wrong_preposition_verða_af,
+                    cls.wrong_preposition_verða_af,
                     None,
                 )
             )
             # Catch "...en varð ekki af ósk sinni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "ósk",  # Trigger lemma for this pattern
                     "IP > { VP > { VP > { 'verða' } PP > { P > { 'af' } NP > { 'ósk' } } } }",
-                    self.wrong_preposition_verða_af,
+                    cls.wrong_preposition_verða_af,
                     None,
                 )
             )
             # Catch "Ég varð (ekki) uppvís af athæfinu.", "Hann hafði (ekki) orðið uppvís af því."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "uppvís",  # Trigger lemma for this pattern
                     "VP > { VP > { 'verða' } NP > { 'uppvís' } PP > { 'af' } }",
-                    self.wrong_preposition_uppvis_af,
+                    cls.wrong_preposition_uppvis_af,
                     None,
                 )
             )
 
         if verbs_að:
             # Create matching patterns with a context that catches the að/af verbs.
-            self.ctx_að = {
+            cls.ctx_að = {
                 "verb": lambda tree: (tree.own_lemma_mm in verbs_að and not (set(tree.variants) & {"1", "2"}))
             }
             # Catch sentences such as 'Jón heillaðist að kettinum'
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     verbs_að,  # Trigger lemmas for this pattern
                     'VP > { VP >> { %verb } PP >> { P > { "að" } } }',
-                    self.wrong_preposition_að,
-                    self.ctx_að,
+                    cls.wrong_preposition_að,
+                    cls.ctx_að,
                 )
             )
             # Catch sentences such as 'Vissulega er hægt að heillast að þessu'
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     verbs_að,  # Trigger lemma for this pattern
                     '(NP-PRD | IP-INF) > { VP > { %verb } } PP >> { P > { "að" } }',
-                    self.wrong_preposition_að,
-                    self.ctx_að,
+                    cls.wrong_preposition_að,
+                    cls.ctx_að,
                 )
             )
             # Catch "Þetta er fallegasta kona sem ég hef orðið heillaður að"
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "heilla",  # Trigger lemma for this pattern
                     "VP > { VP > [ .* ('verða' | 'vera') ] NP-PRD > [ .* 'heilla' .* ADVP > { \"að\" } ] }",
-                    self.wrong_preposition_heillaður_að,
+                    cls.wrong_preposition_heillaður_að,
                     None,
                 )
             )
             # Catch "Ég hef lengi verið heillaður að henni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "heilla",  # Trigger lemma for this pattern
                     "NP > { NP >> { 'heilla' } PP > { 'að' } }",
-                    self.wrong_preposition_heillaður_að,
+                    cls.wrong_preposition_heillaður_að,
                     None,
                 )
             )
             # Catch "Ég er (ekki) hluti að heildinni.", "Við höfum öll verið hluti að heildinni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "hluti",  # Trigger lemma for this pattern
                     "VP > { NP > { 'hluti' } PP > { \"að\" } }",
                     # "VP > { VP > { 'vera' NP-PRD > { 'hluti' } } PP > { 'að' } }",
-                    self.wrong_preposition_hluti_að,
+                    cls.wrong_preposition_hluti_að,
                     None,
                 )
             )
             # Catch "Þeir sögðu að ég hefði verið hluti að heildinni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "hluti",  # Trigger lemma for this pattern
                     "NP > { 'hluti' PP > { \"að\" } }",
-                    self.wrong_preposition_hluti_að,
+                    cls.wrong_preposition_hluti_að,
                     None,
                 )
             )
             # Catch "Þeir sögðu að ég hefði verið hluti að heildinni."  # Two patterns to catch the same sentence due to variable parsing
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "hluti",  # Trigger lemma for this pattern
                     "VP > { CP >> { 'hluti' } PP > { \"að\" } }",
-                    self.wrong_preposition_hluti_að,
+                    cls.wrong_preposition_hluti_að,
                     None,
                 )
             )
             # Catch "Ég hef (ekki) áhyggjur að honum.", "Ég hef áhyggjur að því að honum líði illa."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "áhyggja",  # Trigger lemma for this pattern
                     "VP > { NP > { 'áhyggja' } PP > { \"að\" } }",
                     # "VP > { VP >> { 'áhyggja' } PP > { 'að' } }",
-                    self.wrong_preposition_ahyggja_að,
+                    cls.wrong_preposition_ahyggja_að,
                     None,
                 )
             )
             # Catch "Ég hafði ekki lagt mikið að mörkum."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     frozenset(("mörk", "mark")),  # Trigger lemmas for this pattern
                     'VP > { VP >> { \'leggja\' } PP > { "að" "mörkum" } }',
-                    self.wrong_preposition_að_mörkum,
+                    cls.wrong_preposition_að_mörkum,
                     None,
                 )
             )
             # Catch "Jón hefur látið gott að sér leiða."
-            # self.add_pattern(
+            # cls._add_pattern(
             #    (
             #        "leiða",  # Trigger lemma for this pattern
             #        "VP > { VP > { 'láta' } PP > { P > \"að\" } VP > { 'leiða' } }",
-            #        self.wrong_preposition_að_leiða,
+            #        cls.wrong_preposition_að_leiða,
             #        None,
             #    )
             # )
             # Catch "Ég lét gott að mér leiða."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "leiða",  # Trigger lemma for this pattern
                     'VP > [ .* VP > { \'láta\' } NP ("að mér"|"að þér"|"að sér") \'leiða\']',
-                    self.wrong_preposition_að_leiða,
+                    cls.wrong_preposition_að_leiða,
                     None,
                 )
             )
             # Catch "Ég lét (ekki) gott að mér leiða." (In case of different parse)
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "leiður",  # Trigger lemma for this pattern
                     'VP > [ VP > [ .* \'láta\' .* ] NP > [ .* "gott" .* ] PP > [ "að" NP > [ ("mér"|"þér"|"sér"|"okkur") ] "leiða" ] ]',
-                    self.wrong_preposition_að_leiða,
+                    cls.wrong_preposition_að_leiða,
                     None,
                 )
             )
             # Catch "Hann lét (ekki) gott að sér leiða"
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "leiða",  # Trigger lemma for this pattern
                     'VP > [ VP > [ .* \'láta\' .* ] .* NP > [ .* "gott" .* ] PP > [ "að" NP > [ ("mér"|"þér"|"sér"|"okkur") ] ] VP > { \'leiða\' } ]',
-                    self.wrong_preposition_að_leiða,
+                    cls.wrong_preposition_að_leiða,
                     None,
                 )
             )
             # Catch "...lét ég (ekki) gott að mér leiða"
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "leiða",  # Trigger lemma for this pattern
                     'VP > [ VP > [ .* \'láta\' .* ] .* IP > [ NP > [ .* "gott" PP > [ "að" NP > [ ("mér"|"þér"|"sér"|"okkur") ] ] ] VP > { \'leiða\' } ] ]',
-                    self.wrong_preposition_að_leiða,
+                    cls.wrong_preposition_að_leiða,
                     None,
                 )
             )
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     frozenset(("leiða", "leiður")),  # Trigger lemma for this pattern (probably a wrong parse)
                     'VP > [ .* \'láta\' .* NP-OBJ > [ .* "gott" .* ("að mér leiða" | "að sér leiða" | "að þér leiða") ] ]',
-                    self.wrong_preposition_að_leiða,
+                    cls.wrong_preposition_að_leiða,
                     None,
                 )
             )
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     frozenset(("leiða", "leiður")),  # Trigger lemma for this pattern (probably a wrong parse)
                     'VP > { IP-INF > { "að" "láta" } NP-PRD > { "gott" } PP > [ "að" ( "mér" | "þér" | "sér" ) "leiða" ] }',
-                    self.wrong_preposition_að_leiða,
+                    cls.wrong_preposition_að_leiða,
                     None,
                 )
             )
             # Catch "Hún á/fær/hlýtur (ekki) heiðurinn að þessu.", "Hún hafði (ekki) fengið/hlotið heiðurinn að þessu." ÞA: Including 'eiga' here causes double annotation
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "heiður",  # Trigger lemma for this pattern
                     (
@@ -2104,12 +2456,12 @@ class PatternMatcher:
                         "VP > [ VP-AUX? .* VP > { ( 'fá'|'hljóta' ) } .* NP-OBJ > { 'heiður' } PP > { P > { 'að' } NP } ] "
                         ") "
                     ),
-                    self.wrong_preposition_heiður_að,
+                    cls.wrong_preposition_heiður_að,
                     None,
                 )
             )
             # Catch "Hún á (ekki) mikið/fullt/helling/gommu... að börnum."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "eiga",  # Trigger lemma for this pattern
                     (
@@ -2119,102 +2471,102 @@ class PatternMatcher:
                         "VP > [ VP-AUX? .* VP > { 'eiga' } .* NP-OBJ > { PP > { P > { 'að' } NP } } ] "
                         ") "
                     ),
-                    self.wrong_preposition_eiga_að,
+                    cls.wrong_preposition_eiga_að,
                     None,
                 )
             )
             # Catch "Hún á (ekki) lítið að börnum."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "eiga",  # Trigger lemma for this pattern
                     "VP > { VP > { 'eiga' } ADVP > { 'lítið' } PP > { P > { 'að' } NP } }",
-                    self.wrong_preposition_eiga_að,
+                    cls.wrong_preposition_eiga_að,
                     None,
                 )
             )
             # Catch "Það er (ekki) til mikið að þessu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "vera",  # Trigger lemma for this pattern
                     "VP > { VP > { 'vera' } NP > { NP >> { 'til' } PP > { 'að' } } }",
-                    self.wrong_preposition_vera_til_að,
+                    cls.wrong_preposition_vera_til_að,
                     None,
                 )
             )
             # Catch "Mikið er til að þessu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "vera",  # Trigger lemma for this pattern
                     "( S|VP ) > { NP VP > { 'vera' } ADVP > { 'til' } PP > { 'að' } }",
-                    self.wrong_preposition_vera_til_að,
+                    cls.wrong_preposition_vera_til_að,
                     None,
                 )
             )
             # Catch "Ekki er mikið til að þessu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "vera",  # Trigger lemma for this pattern
                     "VP > { VP > { 'vera' } ADVP > { 'til' } PP > { 'að' } }",
-                    self.wrong_preposition_vera_til_að,
+                    cls.wrong_preposition_vera_til_að,
                     None,
                 )
             )
             # Catch "Hún hefur (ekki) gagn að þessu.", "Hún hefur (ekki) haft gagn að þessu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "gagn",  # Trigger lemma for this pattern
                     "VP > { NP > { 'gagn' } PP > { \"að\" } }",
-                    self.wrong_preposition_gagn_að,
+                    cls.wrong_preposition_gagn_að,
                     None,
                 )
             )
             # Catch "Hvaða gagn hef ég að þessu?"
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "gagn",  # Trigger lemma for this pattern
                     "S > { NP > { 'gagn' } IP > { VP > { VP > { 'hafa' } PP > { 'að' } } } }",
-                    self.wrong_preposition_gagn_að,
+                    cls.wrong_preposition_gagn_að,
                     None,
                 )
             )
             # Catch "Fréttir bárust (ekki) að slysinu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "frétt",  # Trigger lemma for this pattern
                     "( IP|VP ) > { NP > { 'frétt' } VP > { PP > { P > { 'að' } } } }",
-                    self.wrong_preposition_frettir_að,
+                    cls.wrong_preposition_frettir_að,
                     None,
                 )
             )
             # Catch "Það bárust (ekki) fréttir að slysinu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "frétt",  # Trigger lemma for this pattern
                     "NP > { 'frétt' PP > { P > { 'að' } } }",
-                    self.wrong_preposition_frettir_að,
+                    cls.wrong_preposition_frettir_að,
                     None,
                 )
             )
             # Catch "Hætta stafar (ekki) að þessu.", "Hætta hefur (ekki) stafað að þessu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "stafa",  # Trigger lemma for this pattern
                     "VP > { VP >> { 'stafa' } ( PP|ADVP ) > { 'að' } }",
-                    self.wrong_preposition_stafa_að,
+                    cls.wrong_preposition_stafa_að,
                     None,
                 )
             )
             # Catch "Hún er (ekki) ólétt af sínu þriðja barni.", "Hún hefur (ekki) verið ólétt af sínu þriðja barni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "óléttur",  # Trigger lemma for this pattern
                     "VP > { NP > { 'óléttur' } PP > { 'af' } }",
-                    self.wrong_preposition_ólétt_af,
+                    cls.wrong_preposition_ólétt_af,
                     None,
                 )
             )
             # Catch "Hún heyrði að lausa starfinu.", "Hún hefur (ekki) heyrt að lausa starfinu."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "heyra",  # Trigger lemma for this pattern
                     "( "
@@ -2222,12 +2574,12 @@ class PatternMatcher:
                     "| "
                     "VP > [ VP > { 'heyra' } .* NP > { PP > { 'að' } } .* ]"
                     ") ",
-                    self.wrong_preposition_heyra_að,
+                    cls.wrong_preposition_heyra_að,
                     None,
                 )
             )
             # Catch "Ég hef (ekki) gaman að henni.", "Ég hef aldrei haft gaman að henni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "gaman",  # Trigger lemma for this pattern
                     "( "
@@ -2235,26 +2587,26 @@ class PatternMatcher:
                     "| "
                     "VP > [ .* VP > { 'hafa' } .* NP > { 'gaman' PP > { 'að' } } .* ]"
                     ")",
-                    self.wrong_preposition_hafa_gaman_að,
+                    cls.wrong_preposition_hafa_gaman_að,
                     None,
                 )
             )
             # Catch "Ég var valinn að henni.", "Ég hafði (ekki) verið valinn að henni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "velja",  # Trigger lemma for this pattern
                     "VP > { VP > { 'velja' } PP > { 'að' } }",
                     # "NP-PRD > { NP-PRD > { 'velja' } PP > { 'að' } }",
-                    self.wrong_preposition_valinn_að,
+                    cls.wrong_preposition_valinn_að,
                     None,
                 )
             )
             # Catch "Ég var ekki valinn að henni.", "Þau voru sérstaklega valin að stjórninni."
-            self.add_pattern(
+            cls._add_pattern(
                 (
                     "valinn",  # Trigger lemma for this pattern
                     "VP > { NP > { 'valinn' } PP > { 'að' } }",
-                    self.wrong_preposition_valinn_að,
+                    cls.wrong_preposition_valinn_að,
                     None,
                 )
             )
@@ -2289,32 +2641,32 @@ class PatternMatcher:
         # whose corresponding token has a meaning with the 'bjóða' lemma.
         # The macro %noun is resolved by calling the function wrong_noun()
         # with the potentially matching tree node as an argument.
-        self.ctx_verb_01 = {"verb": "@'bjóða'", "noun": partial(wrong_noun, NOUNS_01)}
-        self.add_pattern(
+        cls.ctx_verb_01 = {"verb": "@'bjóða'", "noun": partial(wrong_noun, NOUNS_01)}
+        cls._add_pattern(
             (
                 "bjóða",  # Trigger lemma for this pattern
                 "VP > { VP > { %verb } NP-OBJ >> { %noun } }",
-                lambda match: self.wrong_verb_use(
+                lambda pm, match: pm.wrong_verb_use(
                     match,
                     "bíða",
-                    self.ctx_verb_01,
+                    cls.ctx_verb_01,
                 ),
-                self.ctx_verb_01,
+                cls.ctx_verb_01,
             )
         )
 
         NOUNS_02: FrozenSet[str] = frozenset(["haus_þgf", "þvottur_þgf"])
-        self.ctx_verb_02 = {"verb": "@'hegna'", "noun": partial(wrong_noun, NOUNS_02)}
-        self.add_pattern(
+        cls.ctx_verb_02 = {"verb": "@'hegna'", "noun": partial(wrong_noun, NOUNS_02)}
+        cls._add_pattern(
             (
                 "hegna",  # Trigger lemma for this pattern
                 "VP > { VP > { %verb } NP-OBJ >> { %noun } }",
-                lambda match: self.wrong_verb_use(
+                lambda pm, match: pm.wrong_verb_use(
                     match,
                     "hengja",
-                    self.ctx_verb_02,
+                    cls.ctx_verb_02,
                 ),
-                self.ctx_verb_02,
+                cls.ctx_verb_02,
             )
         )
 
@@ -2335,14 +2687,14 @@ class PatternMatcher:
         NOUNS_AF: FrozenSet[str] = frozenset(("beiðni_þgf", "siður_þgf", "tilefni_þgf", "fyrirmynd_þgf"))
         # The macro %noun is resolved by calling the function wrong_noun_af()
         # with the potentially matching tree node as an argument.
-        self.ctx_noun_af = {"noun": partial(wrong_noun_af, NOUNS_AF)}
+        cls.ctx_noun_af = {"noun": partial(wrong_noun_af, NOUNS_AF)}
         af_lemmas = set(n.split("_")[0] for n in NOUNS_AF)
-        self.add_pattern(
+        cls._add_pattern(
             (
                 af_lemmas,  # Trigger lemmas for this pattern
                 "PP > { P > { 'af' } NP > { %noun } }",
-                lambda match: self.wrong_af_use(match, self.ctx_noun_af),
-                self.ctx_noun_af,
+                lambda pm, match: pm.wrong_af_use(match, cls.ctx_noun_af),
+                cls.ctx_noun_af,
             )
         )
 
@@ -2369,30 +2721,30 @@ class PatternMatcher:
         )
         # The macro %noun is resolved by calling the function wrong_noun_af()
         # with the potentially matching tree node as an argument.
-        self.ctx_noun_af_obj = {"noun": partial(wrong_noun_af, NOUNS_AF_OBJ)}
+        cls.ctx_noun_af_obj = {"noun": partial(wrong_noun_af, NOUNS_AF_OBJ)}
         af_lemmas = set(n.split("_")[0] for n in NOUNS_AF_OBJ)
-        self.add_pattern(
+        cls._add_pattern(
             (
                 af_lemmas,  # Trigger lemmas for this pattern
                 "NP > { %noun PP > { P > { 'af' } } }",
-                lambda match: self.wrong_af_use(match, self.ctx_noun_af_obj),
-                self.ctx_noun_af_obj,
+                lambda pm, match: pm.wrong_af_use(match, cls.ctx_noun_af_obj),
+                cls.ctx_noun_af_obj,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 af_lemmas,  # Trigger lemmas for this pattern
                 "VP > { VP >> { %noun } PP > { P > { 'af' } } }",
-                lambda match: self.wrong_af_use(match, self.ctx_noun_af_obj),
-                self.ctx_noun_af_obj,
+                lambda pm, match: pm.wrong_af_use(match, cls.ctx_noun_af_obj),
+                cls.ctx_noun_af_obj,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 af_lemmas,  # Trigger lemmas for this pattern
                 "VP > { PP > { NP > %noun } PP > { 'af' } }",
-                lambda match: self.wrong_af_use(match, self.ctx_noun_af_obj),
-                self.ctx_noun_af_obj,
+                lambda pm, match: pm.wrong_af_use(match, cls.ctx_noun_af_obj),
+                cls.ctx_noun_af_obj,
             )
         )
 
@@ -2418,14 +2770,14 @@ class PatternMatcher:
         }
         # The macro %noun is resolved by calling the function wrong_noun_að()
         # with the potentially matching tree node as an argument.
-        self.ctx_noun_að = {"noun": partial(wrong_noun_að, NOUNS_AÐ)}
+        cls.ctx_noun_að = {"noun": partial(wrong_noun_að, NOUNS_AÐ)}
         að_lemmas = set(n.split("_")[0] for n in NOUNS_AÐ)
-        self.add_pattern(
+        cls._add_pattern(
             (
                 að_lemmas,  # Trigger lemma for this pattern
                 "PP > { P > { 'að' } NP > { %noun } }",
-                lambda match: self.wrong_að_use(match, self.ctx_noun_að),
-                self.ctx_noun_að,
+                lambda pm, match: pm.wrong_að_use(match, cls.ctx_noun_að),
+                cls.ctx_noun_að,
             )
         )
 
@@ -2437,31 +2789,31 @@ class PatternMatcher:
             return lemma[0].isupper() if lemma else False
 
         # Check prepositions used with place names
-        self.ctx_place_names = {"maybe_place": maybe_place}
-        self.add_pattern(
+        cls.ctx_place_names = {"maybe_place": maybe_place}
+        cls._add_pattern(
             (
                 frozenset(("á", "í")),  # Trigger lemmas for this pattern
                 "PP > { P > ('á' | 'í') NP > %maybe_place }",
-                lambda match: self.check_pp_with_place(match),
-                self.ctx_place_names,
+                lambda pm, match: pm.check_pp_with_place(match),
+                cls.ctx_place_names,
             )
         )
         # Check use of 'bjóða e-m birginn' instead of 'bjóða e-m byrginn'
         # !!! TODO: This is a provisional placeholder for similar cases
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "birgir",  # Trigger lemma for this pattern
                 "VP > [ VP > { 'bjóða' } .* NP-IOBJ .* NP-OBJ > { \"birginn\" } ]",
-                self.wrong_noun_with_verb,
+                cls.wrong_noun_with_verb,
                 None,
             )
         )
         # Check use of "vera að" instead of a simple verb
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "vera",  # Trigger lemma for this pattern
                 "IP > {VP > [VP > { @'vera' } (ADVP|NP-SUBJ)? IP-INF > {TO > nhm}]}",
-                lambda match: self.vera_að(match),
+                lambda pm, match: pm.vera_að(match),
                 None,
             )
         )
@@ -2469,56 +2821,56 @@ class PatternMatcher:
         # Check mood in subclauses
 
         # Concessive clause - viðurkenningarsetning
-        self.add_pattern(
+        cls._add_pattern(
             (
                 frozenset(("þrátt fyrir", "þrátt", "þó", "þótt")),  # Trigger lemmas for this pattern
                 "CP-ADV-ACK > { IP >> {VP > so_fh} }",
-                lambda match: self.mood_ind("ACK", match),
+                lambda pm, match: pm.mood_ind("ACK", match),
                 None,
             )
         )
         # Relative clause - tilvísunarsetning
-        self.add_pattern(
+        cls._add_pattern(
             (
                 frozenset(("sem", "er")),  # Trigger lemmas for this pattern
                 "CP-REL > { IP >> {VP > so_vh} }",
-                lambda match: self.mood_sub("REL", match),
+                lambda pm, match: pm.mood_sub("REL", match),
                 None,
             )
         )
         # Temporal clause - tíðarsetning
-        self.add_pattern(
+        cls._add_pattern(
             (
                 frozenset(("áður", "eftir", "þangað", "þegar")),  # Trigger lemmas for this pattern
                 "CP-ADV-TEMP > { IP >> {VP > so_vh} }",
-                lambda match: self.mood_sub("TEMP/w", match),
+                lambda pm, match: pm.mood_sub("TEMP/w", match),
                 None,
             )
         )
         # Conditional clause - skilyrðissetning
-        self.add_pattern(
+        cls._add_pattern(
             (
                 frozenset(("ef", "svo")),  # Trigger lemmas for this pattern
                 "CP-ADV-COND > { IP >> {VP > so_vh} }",
-                lambda match: self.mood_sub("COND", match),
+                lambda pm, match: pm.mood_sub("COND", match),
                 None,
             )
         )
         # Purpose clause - tilgangssetning
-        self.add_pattern(
+        cls._add_pattern(
             (
                 frozenset(("til", "svo")),  # Trigger lemmas for this pattern
                 "CP-ADV-PURP > { IP >> {VP > so_fh} }",
-                lambda match: self.mood_ind("PURP", match),
+                lambda pm, match: pm.mood_ind("PURP", match),
                 None,
             )
         )
         # Article errors; demonstrative pronouns and nouns with an article
-        self.add_pattern(
+        cls._add_pattern(
             (
                 frozenset(("sá", "þessi")),  # Trigger lemmas for this pattern
                 "NP > [.* fn .* no_gr]",
-                lambda match: self.doubledefinite(match),
+                lambda pm, match: pm.doubledefinite(match),
                 None,
             )
         )
@@ -2536,371 +2888,371 @@ class PatternMatcher:
         VERBS = frozenset(("safna", "kaupa", "læsa", "geyma"))
         # The macro %verb is resolved by calling the function dir4loc()
         # with the potentially matching tree node as an argument.
-        self.ctx_dir_loc = {"verb": partial(dir4loc, VERBS)}
-        self.add_pattern(
+        cls.ctx_dir_loc = {"verb": partial(dir4loc, VERBS)}
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > { %verb } NP > { PP > { ADVP > { 'út' } P > { 'í' } NP > { 'búð' } } } }",
-                lambda match: self.dir_loc(match),
-                self.ctx_dir_loc,
+                lambda pm, match: pm.dir_loc(match),
+                cls.ctx_dir_loc,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > { VP > { %verb } ADVP > { 'saman' } PP > { ADVP > { 'inn' } P > { 'í' } NP } }",
-                lambda match: self.dir_loc(match),
-                self.ctx_dir_loc,
+                lambda pm, match: pm.dir_loc(match),
+                cls.ctx_dir_loc,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > { VP > { %verb } NP > { PP > { ADVP > { 'inn' } } } }",
-                lambda match: self.dir_loc(match),
-                self.ctx_dir_loc,
+                lambda pm, match: pm.dir_loc(match),
+                cls.ctx_dir_loc,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > { VP > { %verb } ADVP > { 'inn' } }",
-                lambda match: self.dir_loc(match),
-                self.ctx_dir_loc,
+                lambda pm, match: pm.dir_loc(match),
+                cls.ctx_dir_loc,
             )
         )
 
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "( PP|VP|IP ) > [ .* ADVP > { 'út' } PP > [ P > { ( 'í'|'á'|'um' ) } NP > ( no_þgf|pfn_þgf ) ] ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "( PP|VP|IP ) > [ .* VP > { 'hafa' } .* ADVP > { 'út' } PP > [ P > { ( 'í'|'á'|'um' ) } NP > ( no_þgf|pfn_þgf ) ] ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "NP > [ ( no_nf|pfn_nf ) PP > [ ADVP > { 'út' } PP > [ P > { ( 'í'|'á'|'um' ) } NP > ( no_þgf|pfn_þgf ) ] ] ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "( IP|NP|VP ) > { IP >> [ .* ADVP > { 'út' } ] PP > [ P > { ( 'í'|'á'|'um' ) } NP > ( no_þgf|pfn_þgf ) ] }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > [ .* VP > { VP > [ 'vera' ] IP >> { ADVP > [ 'út' ] } } .* PP > [ P > [ 'á' ] NP > { ( no_þgf|pfn_þgf ) } ] .* ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > [ VP > [ 'gera' ] NP > [ .* PP > { ADVP > { 'út' } P > [ 'í' ] NP } ] ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "útá",  # Trigger lemma for this pattern
                 "PP > { P > { 'útá' } NP > { ( no_þgf|pfn_þgf ) } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "útí",  # Trigger lemma for this pattern
                 "PP > { P > { 'útí' } NP > { ( no_þgf|pfn_þgf ) } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "( PP|VP|IP ) > [ .* ADVP > { 'inn' } PP > { P > { ( 'í'|'á' ) } NP > { ( no_þgf|pfn_þgf ) } } .* ]",
                 #    "( PP|VP|IP ) > [ .* ADVP > { 'inn' } .* PP > { P > { ( 'í'|'á' ) } NP > { ( no_þgf|pfn_þgf ) } } .* ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "( IP|NP|VP ) > { IP >> [ .* ADVP > { 'inn' } ] PP > [ P > { ( 'í'|'á' ) } NP > ( no_þgf|pfn_þgf ) ] }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "NP > { IP >> { VP > { 'vera' } ADVP > { 'inn' } } PP > [ P > { ( 'í'|'á' ) } NP > ( no_þgf|pfn_þgf ) ] }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > { VP > { 'verða' } ADVP > { 'inn' } PP > [ P > { ( 'í'|'á' ) } NP > ( no_þgf|pfn_þgf ) ] }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "geyma",  # Trigger lemma for this pattern
                 "VP > { VP > { 'geyma' } ADVP > { 'inn' } PP }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inná",  # Trigger lemma for this pattern
                 "PP > { P > { 'inná' } NP > { ( no_þgf|pfn_þgf ) } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inní",  # Trigger lemma for this pattern
                 "VP > { VP > [ .* ] NP > { PP > { P > { 'inní' } NP > { ( no_þgf|pfn_þgf ) } } } }",
                 # "PP > { P > { 'inní' } NP > { ( no_þgf|pfn_þgf ) } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > [ VP > { ( 'verða'|'vera' ) } .* ADVP > { 'inn' } PP > { P > { 'á' } } ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > [ VP > { 'vera' } .* ADVP > { 'inn' } PP > { P > { 'í' } } ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
         # Catches "Ég hef upp á honum."
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "upp",  # Trigger lemma for this pattern
                 "( PP|VP|IP ) > [ VP > { ('standa'|'hafa') } .* ADVP > { 'upp' } PP > { P > { ( 'í'|'á' ) } NP > { ( no_þgf|pfn_þgf ) } } ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
         # Catches "Það liggur í augum upp."
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "auga",  # Trigger lemma for this pattern
                 "VP > [ VP > [ 'liggja' ] PP > [ P > { ( 'í'|'á' ) } NP > { 'auga' } ] ADVP > [ 'upp' ] ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "teningur",  # Trigger lemma for this pattern
                 "PP > [ .* ADVP > { 'upp' } PP > { P > { ( 'í'|'á' ) } NP > { 'teningur' } } ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "upp",  # Trigger lemma for this pattern
                 "( IP|NP|VP ) > [ IP >> { ADVP > { 'upp' } } PP > [ P > { ( 'í'|'á' ) } NP > ( no_þgf|pfn_þgf ) ] ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
 
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "upp",  # Trigger lemma for this pattern
                 "VP > [ VP >> { VP > { VP > { 'hafa' } ADVP > { 'upp' } } } PP > [ P > { ( 'í'|'á' ) } NP > ( no_þgf|pfn_þgf ) ] .* ]",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "uppá",  # Trigger lemma for this pattern
                 "VP > { VP > { 'taka' } NP > { PP > { P > { 'uppá' } NP > { ( no_þgf|pfn_þgf|no_þf|pfn_þf ) } } } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "uppí",  # Trigger lemma for this pattern
                 "PP > { P > { 'uppí' } NP > { ( no_þgf|pfn_þgf ) } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "uppí",  # Trigger lemma for this pattern
                 "VP > { VP > { 'vera' } PP > { P > { 'uppí' } NP > { ( no_þf|pfn_þf ) } } }",
-                lambda match: self.dir_loc_comp(match),
+                lambda pm, match: pm.dir_loc_comp(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "niður",  # Trigger lemma for this pattern
                 "( PP|VP|IP ) > [ .* ADVP > { 'niður' } PP > { P > { ( 'í'|'á' ) } NP > ( no_þgf|pfn_þgf ) } ]",
-                lambda match: self.dir_loc_simple(match),
+                lambda pm, match: pm.dir_loc_simple(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "niður",  # Trigger lemma for this pattern
                 "VP > [ VP > { 'vera' } .* PP > { ADVP > { 'niður' } P > { 'í' } NP } ]",
-                lambda match: self.dir_loc_simple(match),
+                lambda pm, match: pm.dir_loc_simple(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "verða",  # Trigger lemma for this pattern
                 "VP > { VP > { 'verða' } NP > { ( pfn_þgf|abfn_þgf ) } NP > { 'út' 'um' } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "standa",  # Trigger lemma for this pattern
                 "IP > { ADVP > { 'upp' } VP > { VP > { 'vera' } NP > { 'standa' } } }",
-                lambda match: self.dir_loc_simple(match),
+                lambda pm, match: pm.dir_loc_simple(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > [ 'vera' ] NP > { PP > { ADVP > { 'út' } PP > { P > { 'um' } NP } } } }",
-                lambda match: self.dir_loc_simple(match),
+                lambda pm, match: pm.dir_loc_simple(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > [ 'vera' ] NP > [ .* PP > { ADVP > { 'út' } PP > { P > { 'um' } NP } } ] }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP PP >> { NP > { PP > { ADVP > { 'út' } PP > { P > { 'um' } NP } } } } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > [ 'vera' ] ADVP > [ 'út' ] PP > { P > [ 'um' ] } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > [ 'vera' .* ] NP > { 'út' 'um' } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "útum",  # Trigger lemma for this pattern
                 "VP > { VP > { 'vera' } NP > { 'útum' } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "útum",  # Trigger lemma for this pattern
                 "VP > { VP > { 'sækja' } PP > { 'um' } NP > { 'útum' } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > [ 'vera' .* ] ADVP > { 'út' } PP > { P > { 'um' } NP } }",
-                lambda match: self.dir_loc_ut_um(match),
+                lambda pm, match: pm.dir_loc_ut_um(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "út",  # Trigger lemma for this pattern
                 "VP > { VP > { 'gera' } NP > [ .* PP > { ADVP > { 'út' } P > { 'í' } } ] }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "inn",  # Trigger lemma for this pattern
                 "VP > { VP >> { ADVP > { 'hér' } } PP > { ADVP > { 'inn' } } }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "Skagi",  # Trigger lemma for this pattern
                 "VP > { VP > { 'vera' } PP >> { PP > { ADVP > { 'upp' } P > { 'á' } NP > { 'Skagi' } } } }",
-                lambda match: self.dir_loc(match),
+                lambda pm, match: pm.dir_loc(match),
                 None,
             )
         )
 
-        self.add_pattern(
+        cls._add_pattern(
             (
                 "né",  # Trigger lemma for this pattern
                 " IP >> { 'né' } ",
-                lambda match: self.né(match),
+                lambda pm, match: pm.né(match),
                 None,
             )
         )
@@ -2920,30 +3272,30 @@ class PatternMatcher:
         NOUNS_NUM = frozenset(("þríeyki", "tvíeyki", "hluti", "hópur"))
         # The macro %noun is resolved by calling the function subjnum()
         # with the potentially matching tree node as an argument.
-        self.ctx_subjsing = {"noun": partial(subjsing, NOUNS_NUM)}
+        cls.ctx_subjsing = {"noun": partial(subjsing, NOUNS_NUM)}
 
-        self.add_pattern(
+        cls._add_pattern(
             (
                 NOUNS_NUM,  # Trigger lemmas for this pattern
                 "NP-SUBJ >> [ %noun .* 'og' ]",
-                lambda match: self.singsub("QUANT", match),
-                self.ctx_subjsing,
+                lambda pm, match: pm.singsub("QUANT", match),
+                cls.ctx_subjsing,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 NOUNS_NUM,  # Trigger lemmas for this pattern
                 "NP-SUBJ >> [ %noun .* NP-POSS >> { no_ft_ef } ]",
-                lambda match: self.singsub("GEN", match),
-                self.ctx_subjsing,
+                lambda pm, match: pm.singsub("GEN", match),
+                cls.ctx_subjsing,
             )
         )
-        self.add_pattern(
+        cls._add_pattern(
             (
                 NOUNS_NUM,
                 "NP-SUBJ >> [ %noun .* PP >> [ no_ft_ef  ]]",
-                lambda match: self.singsub("AF", match),
-                self.ctx_subjsing,
+                lambda pm, match: pm.singsub("AF", match),
+                cls.ctx_subjsing,
             )
         )
 
@@ -2961,19 +3313,31 @@ class PatternMatcher:
             return
         lemmas = set(lemma.replace("-", "") for lemma in lemmas_mm)
 
-        def lemma_match(trigger: Union[str, FrozenSet[str], Set[str]]) -> bool:
-            """Returns True if any of the given trigger lemmas
-            occur in the sentence"""
-            if not trigger:
-                return True
-            if isinstance(trigger, str):
-                return trigger in lemmas
-            return bool(lemmas & trigger)
-
-        for trigger, pattern, func, context in self.PATTERNS:
-            # We only do the expensive pattern matching if the trigger lemma
-            # for a pattern rule (if given) is actually found in the sentence
-            if lemma_match(trigger):
-                for match in tree.all_matches(pattern, context):
-                    # Call the annotation function for this match
-                    func(match)
+        # We only do the expensive pattern matching for patterns whose
+        # trigger lemma (if given) is actually found in the sentence.
+        # The matches of all those patterns, including those of the external
+        # pattern set, if any, are found in a single traversal of the tree,
+        # and the patterns are then applied in their original order.
+        selections = [(self._program, self._index.candidates(lemmas))]
+        if self._extra is not None:
+            selections.append((self._extra.program, self._extra.index.candidates(lemmas)))
+        found = MatchProgram.match_all(tree, selections)
+        patterns = self.PATTERNS
+        for ix, matches in found[0].items():
+            func = patterns[ix][2]
+            for match in matches:
+                # Call the annotation function for this match
+                func(self, match)
+        if self._extra is None:
+            return
+        # Make this matcher available to the annotation functions
+        # of the external pattern set
+        token = _current_matcher.set(self)
+        try:
+            extra_patterns = self._extra.patterns
+            for ix, matches in found[1].items():
+                extra_func = extra_patterns[ix][2]
+                for match in matches:
+                    extra_func(match)
+        finally:
+            _current_matcher.reset(token)
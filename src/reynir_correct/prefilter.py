@@ -0,0 +1,232 @@
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    Heuristic sentence prefilter module
+
+    Copyright © 2025 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module contains a heuristic sentence prefilter that decides,
+    without parsing, whether a sentence may contain a grammatical error
+    that only a full parse would reveal. Unlike the neural classifier
+    in classifier.py, it has no dependencies beyond those of
+    GreynirCorrect itself, and it works on the tokens that the
+    correction pipeline has already produced.
+
+    A sentence is judged to need parsing if any of the following
+    signals is present:
+
+    * a token carries an error from the correction pipeline;
+    * the ratio of words not found in BÍN is high;
+    * the perplexity of the sentence, according to the icegrams
+      trigram model, is high;
+    * the sentence contains a trigger lemma of a PatternMatcher pattern;
+    * the sentence contains all the literal words of a production
+      of a nonterminal that is tagged with 'error' in the grammar,
+      or a verb whose subject case is often wrong (the $error
+      entries of the verb configuration).
+
+    Sentences without any of these signals are not parsed, and receive
+    only token-level annotations. As the error finder also detects
+    errors that no lexical signal reveals, such as agreement errors,
+    the prefilter has a nonzero miss rate; see tools/prefilterbench.py
+    for measuring it on an error corpus. On the 381 sentences of the
+    test suite, about half of which need parsing, the prefilter has a
+    precision of 0.49 and a recall of 0.97, missing 6 sentences, but
+    skips only 3% of them. Text with fewer errors is skipped more often.
+
+"""
+
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set
+
+import math
+import re
+
+from icegrams.ngrams import Ngrams
+from reynir import TOK, TokenList
+from reynir.grammar import Grammar, LiteralTerminal
+from reynir.settings import VerbSubjects
+
+from .checker import bin_word_counts
+from .pattern import PatternMatcher, PatternSet
+from .spelling import Corrector
+
+# The names of the signals that a sentence may need parsing
+SIGNAL_TOKEN_ERROR = "token_error"
+SIGNAL_UNKNOWN_WORDS = "unknown_words"
+SIGNAL_PERPLEXITY = "perplexity"
+SIGNAL_PATTERN_TRIGGER = "pattern_trigger"
+SIGNAL_GRAMMAR_TRIGGER = "grammar_trigger"
+
+# The word within a literal terminal, such as 'síðar' in 'síðar:ao'
+# or 'líða' in 'líða:so'_lhþt_þf_et_kk
+_LITERAL_WORD = re.compile(r"^['\"]([^'\":]+)")
+
+
+def grammar_trigger_words(grammar: Grammar) -> List[FrozenSet[str]]:
+    """Return, for each production of a nonterminal that is tagged
+    with 'error' in the grammar, the set of words of its literal
+    terminals, as lowercase lemmas or word forms. Productions without
+    literal words, or with literals that are not words, such as
+    punctuation, are not included, as they cannot be detected from
+    the words of a sentence."""
+    triggers: Set[FrozenSet[str]] = set()
+    for nt, productions in grammar.nt_dict.items():
+        if not nt.has_tag("error"):
+            continue
+        for _, prod in productions:
+            words: Set[str] = set()
+            for item in prod:
+                if not isinstance(item, LiteralTerminal):
+                    # Nonterminals, including optional literals
+                    # such as 'mikill:lo'?, are not required
+                    continue
+                m = _LITERAL_WORD.match(item.name)
+                if m is None or not m.group(1).isalpha():
+                    words.clear()
+                    break
+                words.add(m.group(1).lower())
+            if words:
+                triggers.add(frozenset(words))
+    return sorted(triggers, key=sorted)
+
+
+def sentence_lemmas(tokens: TokenList) -> Set[str]:
+    """Return the lowercase word forms and lemmas of the words in a
+    sentence, including the middle voice lemmas of verbs, such as
+    'dást' for 'dá', as used for the triggers of PatternMatcher"""
+    lemmas: Set[str] = set()
+    for t in tokens:
+        if t.kind != TOK.WORD:
+            continue
+        lemmas.add(t.txt.lower())
+        for m in t.val or ():
+            lemma = m.stofn.replace("-", "")
+            lemmas.add(lemma)
+            if m.ordfl == "so" and m.beyging.startswith("MM") and not lemma.endswith("st"):
+                lemmas.add(lemma + "st")
+    return lemmas
+
+
+class HeuristicPrefilter:
+    """Decides whether a sentence needs to be parsed to be checked
+    for grammatical errors, using signals that do not require parsing"""
+
+    # Maximum ratio of words not found in BÍN
+    MAX_UNKNOWN_RATIO = 0.2
+    # Maximum perplexity of the sentence, per token, in the trigram model
+    MAX_PERPLEXITY = 1000.0
+
+    # Singleton Ngrams dictionary, shared with the spelling corrector if loaded first
+    _NGRAMS: Optional[Ngrams] = None
+
+    def __init__(
+        self,
+        grammar: Grammar,
+        *,
+        patterns: Optional[PatternSet] = None,
+        ngrams: Optional[Ngrams] = None,
+        max_unknown_ratio: Optional[float] = None,
+        max_perplexity: Optional[float] = None,
+    ) -> None:
+        self._grammar_triggers = grammar_trigger_words(grammar)
+        # Verbs with erroneous subject cases, which the error finder annotates
+        self._verb_error_lemmas = frozenset(VerbSubjects.VERBS_ERRORS)
+        index = PatternMatcher.trigger_index()
+        lemmas = set(index.lemmas)
+        # If any pattern lacks a trigger, no sentence can be skipped on
+        # the basis of its lemmas, and the pattern signal is always present
+        always = index.has_untriggered
+        if patterns is not None:
+            lemmas.update(patterns.index.lemmas)
+            always = always or patterns.index.has_untriggered
+        self._pattern_lemmas = frozenset(lemmas)
+        self._always_triggered = always
+        self._ngrams = self._shared_ngrams() if ngrams is None else ngrams
+        self.max_unknown_ratio = self.MAX_UNKNOWN_RATIO if max_unknown_ratio is None else max_unknown_ratio
+        self.max_perplexity = self.MAX_PERPLEXITY if max_perplexity is None else max_perplexity
+
+    @classmethod
+    def _shared_ngrams(cls) -> Ngrams:
+        """Return the n-gram dictionary of the spelling corrector, if loaded,
+        or else the singleton dictionary of this class"""
+        ngrams = Corrector._NGRAMS  # type: ignore[reportPrivateUsage]
+        if ngrams is None:
+            if cls._NGRAMS is None:
+                cls._NGRAMS = Ngrams()
+            ngrams = cls._NGRAMS
+        return ngrams
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The n-gram dictionary is memory mapped and cannot be pickled:
+        # an unpickled prefilter, such as one passed to a worker process,
+        # uses the shared dictionary of its own process
+        state = self.__dict__.copy()
+        state["_ngrams"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._ngrams = self._shared_ngrams()
+
+    def perplexity(self, tokens: TokenList) -> float:
+        """Return the perplexity of a sentence per token, according to
+        the trigram model, or 0.0 if the sentence has no text"""
+        assert self._ngrams is not None
+        words = [t.txt for t in tokens if t.txt]
+        if not words:
+            return 0.0
+        logprob = self._ngrams.logprob
+        total = sum(logprob(*words[max(0, i - 2) : i + 1]) for i in range(len(words)))
+        return math.exp(-total / len(words))
+
+    def _signals(self, tokens: TokenList) -> Iterator[str]:
+        """Generate the names of the signals that the sentence may
+        contain a grammatical error, cheapest first"""
+        if any(getattr(t, "error_code", "") for t in tokens):
+            yield SIGNAL_TOKEN_ERROR
+        lemmas = sentence_lemmas(tokens)
+        if self._always_triggered or not lemmas.isdisjoint(self._pattern_lemmas):
+            yield SIGNAL_PATTERN_TRIGGER
+        if not lemmas.isdisjoint(self._verb_error_lemmas) or any(
+            words <= lemmas for words in self._grammar_triggers
+        ):
+            yield SIGNAL_GRAMMAR_TRIGGER
+        words_in_bin, words_not_in_bin = bin_word_counts(tokens)
+        num_words = words_in_bin + words_not_in_bin
+        if num_words and words_not_in_bin / num_words > self.max_unknown_ratio:
+            yield SIGNAL_UNKNOWN_WORDS
+        if self.perplexity(tokens) > self.max_perplexity:
+            yield SIGNAL_PERPLEXITY
+
+    def signals(self, tokens: TokenList) -> FrozenSet[str]:
+        """Return the names of all signals that the sentence
+        may contain a grammatical error"""
+        return frozenset(self._signals(tokens))
+
+    def needs_parse(self, tokens: TokenList) -> bool:
+        """Return True if the sentence may contain a grammatical error
+        and should therefore be parsed"""
+        return next(self._signals(tokens), None) is not None
@@ -0,0 +1,160 @@
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    Resource preloading module
+
+    Copyright © 2025 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module contains the warmup() function, which eagerly loads the
+    resources that GreynirCorrect otherwise loads on first use, such as
+    the grammar, the n-gram model of the spelling corrector and the
+    pattern table of the PatternMatcher. A server process can call it
+    before it accepts requests, so that the first request does not pay
+    for the loading, and report its readiness through is_ready().
+
+    The resources are class-wide singletons, so warming them up in a
+    process benefits all GreynirCorrect instances within it, including
+    the worker processes that are forked from it.
+
+"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+
+from reynir.bindb import GreynirBin
+
+from .checker import GreynirCorrect
+from .errtokenizer import CorrectionPipeline, load_config
+from .pattern import IcelandicPlaces, PatternMatcher, PatternSet, bin_db
+from .settings import Settings
+from .spelling import Corrector
+
+# The names of the resources that warmup() loads
+RESOURCE_SETTINGS = "settings"
+RESOURCE_BIN = "bin"
+RESOURCE_GRAMMAR = "grammar"
+RESOURCE_SPELLING = "spelling"
+RESOURCE_PATTERNS = "patterns"
+RESOURCE_PLACES = "places"
+
+ALL_RESOURCES = frozenset(
+    (RESOURCE_SETTINGS, RESOURCE_BIN, RESOURCE_GRAMMAR, RESOURCE_SPELLING, RESOURCE_PATTERNS, RESOURCE_PLACES)
+)
+
+# The resources that have been loaded in this process
+_loaded: Set[str] = set()
+_lock = Lock()
+
+
+@dataclass
+class WarmupReport:
+    """The resources loaded by warmup(), with their load times in seconds"""
+
+    load_times: Dict[str, float] = field(default_factory=dict)
+    # True if the spelling corrector has a known-word vocabulary, False if
+    # it has none, as the vocabulary file is missing or stale (see
+    # doc/installation.rst), or None if the corrector was not warmed up
+    vocabulary: Optional[bool] = None
+
+    @property
+    def total_time(self) -> float:
+        """The total time spent on loading resources"""
+        return sum(self.load_times.values())
+
+
+def _load_bin() -> None:
+    """Open the BÍN database and look up a word, to map it into memory"""
+    with GreynirBin.get_db() as db:
+        db.lookup_g("hestur")
+
+
+def _load_grammar(settings: Settings) -> None:
+    """Load the error grammar, and create the parser and the reducer"""
+    gc = GreynirCorrect(settings, CorrectionPipeline("", settings))
+    gc.parser
+    gc.reducer
+
+
+def _load_spelling(report: WarmupReport) -> None:
+    """Load the n-gram model and the vocabulary of the spelling corrector"""
+    with GreynirBin.get_db() as db:
+        report.vocabulary = Corrector(db).vocabulary is not None
+
+
+def _load_patterns(settings: Settings) -> None:
+    """Create the PatternMatcher pattern table, load the external
+    patterns of the settings, if any, and open its BÍN database"""
+    PatternMatcher.trigger_index()
+    PatternSet.for_settings(settings)
+    bin_db()
+
+
+def _load_places() -> None:
+    """Load the place name dictionary of the PatternMatcher"""
+    IcelandicPlaces.lookup_preposition("Akureyri")
+
+
+def warmup(
+    settings: Optional[Settings] = None,
+    *,
+    grammar: bool = True,
+    spelling: bool = True,
+    patterns: bool = True,
+) -> WarmupReport:
+    """Load the resources that GreynirCorrect otherwise loads on first use,
+    and return their load times. If settings are not given, the default
+    configuration is loaded. Resources that have already been loaded in
+    this process take next to no time."""
+    report = WarmupReport()
+    with _lock:
+        t0 = time.perf_counter()
+        if settings is None:
+            settings = load_config()
+        report.load_times[RESOURCE_SETTINGS] = time.perf_counter() - t0
+        steps: List[Tuple[str, bool, Callable[[], None]]] = [
+            (RESOURCE_BIN, True, _load_bin),
+            (RESOURCE_GRAMMAR, grammar, lambda: _load_grammar(settings)),
+            (RESOURCE_SPELLING, spelling, lambda: _load_spelling(report)),
+            (RESOURCE_PATTERNS, patterns, lambda: _load_patterns(settings)),
+            (RESOURCE_PLACES, patterns, _load_places),
+        ]
+        for name, enabled, load in steps:
+            if not enabled:
+                continue
+            t0 = time.perf_counter()
+            load()
+            report.load_times[name] = time.perf_counter() - t0
+        _loaded.update(report.load_times)
+    return report
+
+
+def is_ready() -> bool:
+    """Return True if all resources have been loaded by warmup(),
+    i.e. if a check will not be slowed down by loading them"""
+    return _loaded >= ALL_RESOURCES
@@ -35,15 +35,17 @@
 """
 
 from __future__ import annotations
-from typing import Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
 
 import math
 import re
 from enum import Enum
 
 import tokenizer
-from icegrams.ngrams import Ngrams
-from islenska import Bin
+
+if TYPE_CHECKING:
+    from icegrams.ngrams import Ngrams
+    from islenska import Bin
 
 diphtong_pattern = re.compile(r"(ei|ey|au)")
 vowel_pattern = re.compile(r"[aeiouyáéíóúýöæ]")
@@ -196,8 +198,12 @@ class RareWordsFinder:
     """
 
     def __init__(self):
-        self.bin = Bin()
-        self.ng = Ngrams()
+        # Only import BÍN and the n-gram model if we need them
+        from icegrams.ngrams import Ngrams
+        from islenska import Bin
+
+        self.bin: Bin = Bin()
+        self.ng: Ngrams = Ngrams()
 
     def get_rare_words_from_stream(
         self, tok_stream: Iterable[tokenizer.Tok], max_words: int, low_prob_cutoff: float
@@ -0,0 +1,500 @@
+#!/usr/bin/env python
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    HTTP server module
+
+    Copyright © 2025 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module contains a local HTTP server for GreynirCorrect, which
+    needs only the standard library. It exposes the /correct.api endpoint
+    of the Yfirlestur.is API, returning the annotation results of each
+    paragraph of the text in the AnnResultDict format. To run it:
+
+    $ python -m reynir_correct.server --port 5002 --workers 4
+
+    The paragraphs of concurrent requests are put on a bounded queue,
+    from which a dispatcher coalesces them into batches that are checked
+    in a pool of worker processes. Each worker keeps warm GreynirCorrectAPI
+    instances, one for each distinct set of options. When the queue is
+    full, requests are refused with HTTP status 503 (Service Unavailable),
+    so that clients back off instead of piling up work. Requests that are
+    not checked within REQUEST_TIMEOUT seconds get HTTP status 504 (Gateway
+    Timeout), and their paragraphs that are still queued are withdrawn.
+
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import argparse
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from multiprocessing.context import BaseContext
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from .wrappers import GreynirCorrectAPI, annotation_results
+
+log = logging.getLogger(__name__)
+
+# Options that clients may give in a request, and which affect the
+# construction of the GreynirCorrectAPI instance that checks it
+API_OPTIONS = frozenset(("annotate_unparsed_sentences", "generate_suggestion_list", "ignore_wordlist"))
+# Options that clients may give in a request, and which affect only its check
+REQUEST_OPTIONS = frozenset(("suppress_suggestions", "ignore_rules"))
+
+# Default maximum number of paragraphs waiting on the queue
+MAX_QUEUE_SIZE = 1000
+# Default maximum number of paragraphs in a batch
+MAX_BATCH_SIZE = 32
+# Default number of seconds that the dispatcher waits for more
+# paragraphs to add to a batch, once it has the first one
+BATCH_WAIT = 0.005
+# Maximum size of a request body in bytes
+MAX_BODY_SIZE = 1 << 20
+# Number of seconds that a request waits for its results
+REQUEST_TIMEOUT = 300.0
+
+# The result of checking a paragraph: its sentences and statistics
+ParagraphResult = Tuple[List[Any], Dict[str, Any]]
+
+
+class ServiceOverloaded(Exception):
+    """The queue of the correction service is full"""
+
+
+class CheckFailed(Exception):
+    """Checking a paragraph failed within a worker process"""
+
+
+class _Item(NamedTuple):
+    """A paragraph on the queue of the correction service"""
+
+    text: str
+    # Key of the options of the GreynirCorrectAPI instance
+    key: str
+    options: Dict[str, Any]
+    check_options: Dict[str, Any]
+    future: "Future[ParagraphResult]"
+
+
+# Warm GreynirCorrectAPI instances within a worker process, by option key
+_worker_apis: "OrderedDict[str, GreynirCorrectAPI]" = OrderedDict()
+# Maximum number of GreynirCorrectAPI instances in a worker process
+MAX_WORKER_INSTANCES = 8
+
+
+def options_key(options: Dict[str, Any]) -> str:
+    """Return the key of a set of GreynirCorrectAPI options"""
+    return json.dumps(options, sort_keys=True, default=str)
+
+
+def _worker_api(key: str, options: Dict[str, Any]) -> GreynirCorrectAPI:
+    """Return a warm GreynirCorrectAPI instance for the options, creating it if needed"""
+    api = _worker_apis.get(key)
+    if api is None:
+        options = dict(options)
+        if "ignore_wordlist" in options:
+            options["ignore_wordlist"] = set(options["ignore_wordlist"])
+        api = _worker_apis[key] = GreynirCorrectAPI.from_options(**options)
+        while len(_worker_apis) > MAX_WORKER_INSTANCES:
+            _worker_apis.popitem(last=False)
+    _worker_apis.move_to_end(key)
+    return api
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Initialize a worker process with a warm instance for the default options,
+    unless it has inherited one from the server process"""
+    from .preload import warmup
+
+    warmup(_worker_api(options_key(options), options).gc.settings)
+
+
+def _ping() -> None:
+    """A task that shows that a worker process has been initialized"""
+
+
+def _check_batch(batch: List[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]) -> List[Any]:
+    """Check a batch of paragraphs, given as (text, key, options, check_options)
+    tuples, within a worker process. Return a ParagraphResult, or an error
+    message string, for each paragraph."""
+    results: List[Any] = []
+    for text, key, options, check_options in batch:
+        try:
+            api = _worker_api(key, options)
+            result = api.correct(
+                [text],
+                ignore_rules=frozenset(check_options.get("ignore_rules") or ()),
+                suppress_suggestions=bool(check_options.get("suppress_suggestions")),
+            )
+            stats: Dict[str, Any] = {"num_sentences": len(result.sentences), "num_parsed": 0, "num_tokens": 0}
+            if result.parse_result_stats is not None:
+                stats["num_sentences"] = result.parse_result_stats.num_sentences
+                stats["num_parsed"] = result.parse_result_stats.num_parsed
+                stats["num_tokens"] = result.parse_result_stats.num_tokens
+            results.append((annotation_results(result), stats))
+        except Exception as e:
+            log.exception("Error while checking a paragraph")
+            results.append(f"{type(e).__name__}: {e}")
+    return results
+
+
+class CorrectionService:
+    """Checks paragraphs in a pool of worker processes, coalescing the
+    paragraphs of concurrent requests into batches"""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        *,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        batch_wait: float = BATCH_WAIT,
+        **options: Any,
+    ) -> None:
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait
+        # The options of the server, which are the defaults of each request
+        self._options = options
+        self._queue: "queue.Queue[Optional[_Item]]" = queue.Queue(max_queue_size)
+        # Bound the number of batches in flight, so that paragraphs wait on
+        # the queue, where they are counted for backpressure, rather than
+        # in the process pool
+        self._in_flight = threading.BoundedSemaphore(2 * self.workers)
+        self._ready = threading.Event()
+        if "fork" in multiprocessing.get_all_start_methods():
+            # Warm up an instance for the default options before forking,
+            # so that the workers inherit it and start warm
+            context: BaseContext = multiprocessing.get_context("fork")
+            _init_worker(options)
+        else:
+            context = multiprocessing.get_context()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=_init_worker, initargs=(options,)
+        )
+        # Start the workers before any other threads, and note when
+        # they have been initialized
+        pings = [self._executor.submit(_ping) for _ in range(self.workers)]
+        threading.Thread(target=self._wait_for_workers, args=(pings,), daemon=True).start()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _wait_for_workers(self, pings: "List[Future[None]]") -> None:
+        for ping in pings:
+            ping.result()
+        self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        """True if the worker processes have been initialized"""
+        return self._ready.is_set()
+
+    @property
+    def queued(self) -> int:
+        """The number of paragraphs waiting on the queue"""
+        return self._queue.qsize()
+
+    def submit(self, text: str, **request_options: Any) -> "List[Future[ParagraphResult]]":
+        """Queue the paragraphs of a text, i.e. its non-empty lines, for checking,
+        returning a future for the result of each. The request options are
+        among API_OPTIONS and REQUEST_OPTIONS. Raises ServiceOverloaded if the
+        queue does not have room for all the paragraphs."""
+        options = dict(self._options)
+        options.update((name, value) for name, value in request_options.items() if name in API_OPTIONS)
+        if "ignore_wordlist" in options:
+            options["ignore_wordlist"] = sorted(options["ignore_wordlist"])
+        check_options = {name: value for name, value in request_options.items() if name in REQUEST_OPTIONS}
+        key = options_key(options)
+        futures: "List[Future[ParagraphResult]]" = []
+        for paragraph in text.split("\n"):
+            if not paragraph.strip():
+                continue
+            future: "Future[ParagraphResult]" = Future()
+            try:
+                self._queue.put_nowait(_Item(paragraph, key, options, check_options, future))
+            except queue.Full:
+                # Withdraw the paragraphs of this request that were queued
+                for f in futures:
+                    f.cancel()
+                raise ServiceOverloaded("The correction service is overloaded")
+            futures.append(future)
+        return futures
+
+    def check(self, text: str, timeout: Optional[float] = None, **request_options: Any) -> List[ParagraphResult]:
+        """Check the paragraphs of a text, returning their results. If they are
+        not all ready within the timeout, the paragraphs that are still queued
+        are withdrawn and concurrent.futures.TimeoutError is raised."""
+        futures = self.submit(text, **request_options)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            return [
+                future.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+                for future in futures
+            ]
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _dispatch(self) -> None:
+        """Take paragraphs off the queue in batches and send them to the workers"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Shutting down: send this batch off first
+                    stopping = True
+                    break
+                batch.append(item)
+            # Skip paragraphs that were withdrawn
+            batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self._in_flight.acquire()
+            future = self._executor.submit(
+                _check_batch, [(item.text, item.key, item.options, item.check_options) for item in batch]
+            )
+            future.add_done_callback(partial(self._complete, batch))
+
+    def _complete(self, batch: List[_Item], future: "Future[List[Any]]") -> None:
+        """Set the results of the paragraphs in a batch"""
+        self._in_flight.release()
+        try:
+            results = future.result()
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+        for item, result in zip(batch, results):
+            if isinstance(result, str):
+                item.future.set_exception(CheckFailed(result))
+            else:
+                item.future.set_result(result)
+
+    def shutdown(self) -> None:
+        """Check the paragraphs on the queue and stop the workers. Paragraphs
+        must not be submitted after the service has been shut down."""
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown()
+
+
+def _parse_bool(value: Any) -> bool:
+    """Return a form or JSON value as a boolean"""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes", "on")
+    return bool(value)
+
+
+class CorrectionRequestHandler(BaseHTTPRequestHandler):
+    """Handles requests to the HTTP server"""
+
+    server: "CorrectionServer"
+
+    def _reply(self, status: HTTPStatus, reply: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(reply, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, reason: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._reply(status, {"valid": False, "reason": reason}, headers)
+
+    def _read_request(self) -> Optional[Dict[str, Any]]:
+        """Read the text and options of a request from its JSON or form body"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "The request is too large")
+            return None
+        body = self.rfile.read(length).decode("utf-8")
+        try:
+            if self.headers.get_content_type() == "application/json":
+                req: Dict[str, Any] = json.loads(body)
+            else:
+                form = parse_qs(body)
+                req = {name: values[0] for name, values in form.items()}
+                for name in ("ignore_wordlist", "ignore_rules"):
+                    if name in form:
+                        req[name] = [v for value in form[name] for v in value.split(",") if v]
+        except (ValueError, UnicodeDecodeError):
+            self._error(HTTPStatus.BAD_REQUEST, "The request body is not valid")
+            return None
+        if not isinstance(req, dict) or not isinstance(req.get("text"), str):
+            self._error(HTTPStatus.BAD_REQUEST, "The request has no text")
+            return None
+        for name in ("annotate_unparsed_sentences", "generate_suggestion_list", "suppress_suggestions"):
+            if name in req:
+                req[name] = _parse_bool(req[name])
+        for name in ("ignore_wordlist", "ignore_rules"):
+            value = req.get(name)
+            if isinstance(value, str):
+                # A comma-separated list, as in a form body
+                req[name] = [v for v in value.split(",") if v]
+            elif value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+                self._error(HTTPStatus.BAD_REQUEST, f"The {name} option must be a list of strings")
+                return None
+        return req
+
+    def do_GET(self) -> None:
+        if self.path != "/status":
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        service = self.server.service
+        self._reply(HTTPStatus.OK, {"ready": service.ready, "queued": service.queued, "workers": service.workers})
+
+    def do_POST(self) -> None:
+        if self.path != "/correct.api":
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        req = self._read_request()
+        if req is None:
+            return
+        text: str = req.pop("text")
+        try:
+            results = self.server.service.check(text, timeout=REQUEST_TIMEOUT, **req)
+        except ServiceOverloaded as e:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), {"Retry-After": "1"})
+            return
+        except FutureTimeoutError:
+            self._error(HTTPStatus.GATEWAY_TIMEOUT, "The request was not checked in time")
+            return
+        except Exception as e:
+            log.exception("Error while checking a request")
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+            return
+        stats: Dict[str, Any] = {"num_paragraphs": len(results), "num_sentences": 0, "num_parsed": 0, "num_tokens": 0}
+        for _, paragraph_stats in results:
+            for name, value in paragraph_stats.items():
+                stats[name] += value
+        self._reply(
+            HTTPStatus.OK, {"valid": True, "text": text, "result": [sents for sents, _ in results], "stats": stats}
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.info("%s - %s", self.address_string(), format % args)
+
+
+class CorrectionServer(ThreadingHTTPServer):
+    """An HTTP server that checks requests with a CorrectionService"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: CorrectionService) -> None:
+        self.service = service
+        super().__init__(address, CorrectionRequestHandler)
+
+
+# Define the command line arguments
+parser = argparse.ArgumentParser(description="Runs a local HTTP server for GreynirCorrect")
+
+parser.add_argument("--host", type=str, default="127.0.0.1", help="Host address to listen on (default=127.0.0.1)")
+parser.add_argument("--port", type=int, default=5002, help="Port to listen on (default=5002)")
+parser.add_argument(
+    "--workers", type=int, default=0, help="Number of worker processes (default=0, one per CPU core)"
+)
+parser.add_argument(
+    "--max_queue_size",
+    type=int,
+    default=MAX_QUEUE_SIZE,
+    help=f"Maximum number of paragraphs waiting to be checked (default={MAX_QUEUE_SIZE})",
+)
+parser.add_argument(
+    "--max_batch_size",
+    type=int,
+    default=MAX_BATCH_SIZE,
+    help=f"Maximum number of paragraphs in a batch (default={MAX_BATCH_SIZE})",
+)
+parser.add_argument(
+    "--batch_wait",
+    type=float,
+    default=BATCH_WAIT,
+    help=f"Seconds to wait for more paragraphs to add to a batch (default={BATCH_WAIT})",
+)
+parser.add_argument(
+    "--parse_sentence_budget",
+    type=float,
+    default=None,
+    help="Time budget in seconds for parsing a single sentence",
+)
+parser.add_argument(
+    "--spelling_word_budget",
+    type=float,
+    default=None,
+    help="Time budget in seconds for the spelling correction of a single word",
+)
+
+
+def main() -> None:
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    options: Dict[str, Any] = {}
+    if args.parse_sentence_budget is not None:
+        options["parse_sentence_budget"] = args.parse_sentence_budget
+    if args.spelling_word_budget is not None:
+        options["spelling_word_budget"] = args.spelling_word_budget
+    service = CorrectionService(
+        args.workers,
+        max_queue_size=args.max_queue_size,
+        max_batch_size=args.max_batch_size,
+        batch_wait=args.batch_wait,
+        **options,
+    )
+    with CorrectionServer((args.host, args.port), service) as server:
+        log.info("Serving corrections on http://%s:%d/correct.api", args.host, args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
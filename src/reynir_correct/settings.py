@@ -43,6 +43,7 @@
 
 from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
 
+import hashlib
 import os
 import threading
 from collections import defaultdict
@@ -712,6 +713,8 @@ class Settings:
         self.tone_of_voice_patterns = ToneOfVoicePatterns()
         self.wrong_formers = WrongFormers()
         self.wrong_formers_cid = WrongFormersCID()
+        # Hash of the configuration lines read so far (see version)
+        self._version = ""
 
     _lock = threading.Lock()
     loaded = False
@@ -1104,7 +1107,10 @@ class Settings:
                 # If an external path is given, use it to read the file
                 package_name = None if external else __name__.split(".")[0]
                 rdr = LineReader(fname, package_name=package_name)
+                # Chain the hash of this file to that of the files read before
+                digest = hashlib.blake2b(self._version.encode("utf-8"), digest_size=16)
                 for s in rdr.lines():
+                    digest.update(s.encode("utf-8"))
                     # Ignore comments
                     ix = s.find("#")
                     if ix >= 0:
@@ -1138,4 +1144,11 @@ class Settings:
                     e.set_pos(rdr.fname(), rdr.line())
                 raise e
 
+            self._version = digest.hexdigest()
             Settings.loaded = True
+
+    @property
+    def version(self) -> str:
+        """A hash of the configuration that has been read into this
+        instance, which changes if the configuration changes"""
+        return self._version
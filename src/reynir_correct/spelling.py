@@ -35,20 +35,25 @@
 
 """
 
-from typing import Callable, DefaultDict, Iterable, List, Optional, Set, Tuple
+from typing import Callable, DefaultDict, Deque, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 import math
+import multiprocessing
 import re
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from functools import lru_cache
+from multiprocessing.context import BaseContext
 
 from icegrams.ngrams import MAX_ORDER, Ngrams
-from reynir import TOK, correct_spaces, tokenize
+from reynir import TOK, Tok, correct_spaces, tokenize
 from reynir.bindb import GreynirBin, ResultTuple
 from reynir.bintokenizer import StringIterable
 
 from .settings import Settings
+from .vocabulary import Vocabulary, source_stamp
 
 
 EDIT_0_FACTOR = math.log(1.0 / 1.0)
@@ -62,6 +67,23 @@ EDIT_2_FACTOR = math.log(1.0 / 2048.0)
 # Parameter to use for lambda in 'stupid backoff'
 LOG_LAMBDA = math.log(0.4)
 
+# Number of sentences in each chunk of work in Corrector.correct_text_parallel()
+SENTENCES_PER_CHUNK = 64
+
+# A token reduced to its kind and text, as passed to worker processes
+TokenTuple = Tuple[int, str]
+
+# Levels of spelling correction under a time budget (see SpellingBudget),
+# from the most thorough to the cheapest:
+# all candidate generation strategies were applied
+SPELLING_FULL = "full"
+# edit distance 1 candidates were dropped
+SPELLING_SUBS = "subs"
+# substitution candidates were cut short as well
+SPELLING_EDITS0 = "edits0"
+# no correction was attempted
+SPELLING_SKIPPED = "skipped"
+
 
 @lru_cache(maxsize=2048)
 def _splits(word: str) -> Tuple[Tuple[str, str], ...]:
@@ -149,6 +171,73 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     return d0[-1]
 
 
+@dataclass
+class SubsStats:
+    """Statistics for a single call to Corrector.subs()"""
+
+    # Number of combinations in the full (unpruned) enumeration
+    combinations: int = 0
+    # Number of partial combinations that were expanded
+    expansions: int = 0
+    # Number of partial combinations cut off by the vocabulary
+    pruned: int = 0
+    # Number of complete combinations returned
+    generated: int = 0
+    # True if the expansion limit was reached
+    truncated: bool = False
+    # True if the enumeration was cut short by a deadline
+    timed_out: bool = False
+
+
+class DegradedWord(NamedTuple):
+    """A word whose spelling correction was degraded to a cheaper
+    level, or skipped, because of a time budget"""
+
+    word: str
+    level: str
+
+
+@dataclass
+class SpellingBudget:
+    """Time budget, in seconds, for the spelling correction of a single
+    document. Once a word exceeds its budget, the corrector stops
+    generating further candidates for it, dropping edit distance 1
+    candidates and then substitution candidates; once the budget of the
+    document is spent, correction of further words is skipped altogether.
+    Words that were degraded are recorded in the degraded list."""
+
+    word_time: Optional[float] = None
+    document_time: Optional[float] = None
+    # Time spent on candidate generation so far
+    spent: float = 0.0
+    degraded: List[DegradedWord] = field(default_factory=list)
+
+    @property
+    def exhausted(self) -> bool:
+        """Return True if the budget of the document has been spent"""
+        return self.document_time is not None and self.spent >= self.document_time
+
+    def deadline(self, start: float) -> Optional[float]:
+        """Return the deadline, in terms of time.perf_counter(), for a word
+        whose correction starts at the given time, or None if unlimited"""
+        limit = self.word_time
+        if self.document_time is not None:
+            remaining = self.document_time - self.spent
+            limit = remaining if limit is None else min(limit, remaining)
+        return None if limit is None else start + limit
+
+    def charge(self, word: str, start: float, level: str) -> None:
+        """Charge the time spent on a word since start to the budget,
+        recording the word if its correction was degraded"""
+        self.spent += time.perf_counter() - start
+        if level != SPELLING_FULL:
+            dw = DegradedWord(word, level)
+            # A word may be looked up for suggestions and then corrected:
+            # record it only once
+            if not self.degraded or self.degraded[-1] != dw:
+                self.degraded.append(dw)
+
+
 class Corrector:
 
     """A spelling corrector class using a word frequency dictionary"""
@@ -384,10 +473,27 @@ class Corrector:
     # Minimum frequency in trigrams database to be considered a "known" word
     _KNOWN_WORD_MIN_FREQUENCY = 3
 
+    # Maximum number of partial combinations expanded by subs() for a single
+    # word, when pruning with a vocabulary. Without a vocabulary, all the
+    # combinations are generated unless a limit is given explicitly.
+    _MAX_SUBS_EXPANSIONS = 4096
+    # Number of combinations or candidates between deadline checks
+    _DEADLINE_CHECK_INTERVAL = 64
+
     # Singleton Ngrams dictionary
     _NGRAMS: Optional[Ngrams] = None
+    # Singleton vocabulary of known words, if a prebuilt one is available
+    _VOCABULARY: Optional[Vocabulary] = None
+    _VOCABULARY_LOADED = False
 
-    def __init__(self, db: GreynirBin, dictionary: Optional[Ngrams] = None) -> None:
+    def __init__(
+        self,
+        db: GreynirBin,
+        dictionary: Optional[Ngrams] = None,
+        vocabulary: Optional[Vocabulary] = None,
+        *,
+        max_subs_expansions: Optional[int] = None,
+    ) -> None:
         # Word database
         self._db = db
         # N-gram frequency dictionary
@@ -402,18 +508,47 @@ class Corrector:
         self.logprob = self.ngrams.logprob
         # Function for (adjusted) frequency of word
         self.freq = self.ngrams.adj_freq
+        # Vocabulary of known words, used to prune substitution candidates
+        # and to look up candidates. If not given, the default vocabulary
+        # is loaded on first use (see the vocabulary property).
+        self._vocabulary = vocabulary
+        self._max_subs_expansions = max_subs_expansions
+        # Statistics for the most recent call to subs()
+        self.subs_stats = SubsStats()
 
     @property
     def db(self) -> GreynirBin:
         """Return the associated word database"""
         return self._db
 
+    @property
+    def vocabulary(self) -> Optional[Vocabulary]:
+        """Return the vocabulary of known words, if available,
+        loading the default one on first use. The default vocabulary
+        is only used if it was built from the installed BÍN and
+        trigram data, as it answers for them."""
+        if self._vocabulary is not None:
+            return self._vocabulary
+        if not Corrector._VOCABULARY_LOADED:
+            Corrector._VOCABULARY = Vocabulary.load(source=source_stamp(self._KNOWN_WORD_MIN_FREQUENCY))
+            Corrector._VOCABULARY_LOADED = True
+        return Corrector._VOCABULARY
+
     def lookup_word(self, word: str, *, at_sentence_start: bool = False, auto_uppercase: bool = False) -> ResultTuple:
         """Look up the given word in the associated word database"""
         return self._db.lookup_g(word, at_sentence_start, auto_uppercase)
 
-    def subs(self, word: str) -> Iterable[str]:
-        """Return all combinations of potential substitutions into the word."""
+    def subs(
+        self, word: str, *, max_expansions: Optional[int] = None, deadline: Optional[float] = None
+    ) -> Iterable[str]:
+        """Return combinations of potential substitutions into the word.
+        If a vocabulary of known words is available, the combinations are
+        built slot by slot, and partial combinations that are not a prefix
+        of any known word are pruned along the way. At most max_expansions
+        partial combinations are expanded (by default _MAX_SUBS_EXPANSIONS
+        when pruning, and unlimited otherwise), and the enumeration stops at the
+        given deadline (in terms of time.perf_counter()), if any; statistics
+        for the call are available in self.subs_stats afterwards."""
         # The following yields a list of tuples, for instance
         # [('gl', 'gl'), ('er', 'r'), ('aug', 'g')] for the word "gleraugu"
         fragments: List[Tuple[str, str]] = re.findall(self._SUBSTITUTE_REGEX, word)
@@ -438,22 +573,76 @@ class Corrector:
         suffix = word[end:]
         if suffix:
             combs.append([suffix])
-        # Prepare the result list, from which we will create result strings
-        result = [c[0] for c in combs]
-        # Prepare the combinations that we'll be selecting from at each slot
-        z = [(c, len(c)) for c in combs]
-        # Generate all the combinations, numbered from zero
-        for counter in range(num_combs):
-            numerator = counter
-            for i, (c, d) in enumerate(z):
-                # d is the divisor, i.e. the number of combinations for this slot
-                if d > 1:
-                    numerator, ix = divmod(numerator, d)
-                    # Assign the selected combination to the result
-                    result[i] = c[ix]
-            # assert numerator == 0
-            # print(result)
-            yield "".join(result)
+        stats = self.subs_stats = SubsStats(combinations=num_combs)
+        limit = self._max_subs_expansions if max_expansions is None else max_expansions
+        vocabulary = self.vocabulary
+        if vocabulary is None:
+            # No vocabulary to prune with: generate the combinations,
+            # numbered from zero, up to the expansion limit, if any
+            if limit is not None and num_combs > limit:
+                stats.truncated = True
+                num_combs = limit
+            # Prepare the result list, from which we will create result strings
+            result = [c[0] for c in combs]
+            # Prepare the combinations that we'll be selecting from at each slot
+            z = [(c, len(c)) for c in combs]
+            for counter in range(num_combs):
+                if deadline is not None and not counter % self._DEADLINE_CHECK_INTERVAL:
+                    if time.perf_counter() > deadline:
+                        stats.truncated = stats.timed_out = True
+                        return
+                numerator = counter
+                for i, (c, d) in enumerate(z):
+                    # d is the divisor, i.e. the number of combinations for this slot
+                    if d > 1:
+                        numerator, ix = divmod(numerator, d)
+                        # Assign the selected combination to the result
+                        result[i] = c[ix]
+                stats.expansions += 1
+                stats.generated += 1
+                yield "".join(result)
+            return
+        # Walk the combination slots depth first, extending a prefix with
+        # each alternative in turn and cutting off every prefix that cannot
+        # lead to a known word. Each complete combination is tagged with its
+        # number in the unpruned enumeration above, so that the combinations
+        # can be returned in the same order.
+        if limit is None:
+            limit = self._MAX_SUBS_EXPANSIONS
+        weights: List[int] = []
+        weight = 1
+        for c in combs:
+            weights.append(weight)
+            weight *= len(c)
+        num_slots = len(combs)
+        found: List[Tuple[int, str]] = []
+        stack: List[Tuple[int, str, int]] = [(0, "", 0)]
+        steps = 0
+        while stack:
+            slot, prefix, counter = stack.pop()
+            if slot == num_slots:
+                found.append((counter, prefix))
+                continue
+            if deadline is not None:
+                steps += 1
+                if not steps % self._DEADLINE_CHECK_INTERVAL and time.perf_counter() > deadline:
+                    stats.truncated = stats.timed_out = True
+                    break
+            for ix, alternative in enumerate(combs[slot]):
+                if stats.expansions >= limit:
+                    stats.truncated = True
+                    stack.clear()
+                    break
+                stats.expansions += 1
+                extended = prefix + alternative
+                if not vocabulary.has_prefix(extended):
+                    stats.pruned += 1
+                    continue
+                stack.append((slot + 1, extended, counter + ix * weights[slot]))
+        found.sort()
+        stats.generated = len(found)
+        for _, candidate in found:
+            yield candidate
 
     def _correct(
         self,
@@ -461,9 +650,10 @@ class Corrector:
         word: str,
         context: Tuple[str, ...],
         at_sentence_start: bool,
+        budget: Optional[SpellingBudget] = None,
     ) -> str:
         """Return best candidate or the original word if none are found"""
-        candidates = self.gen_candidates(original_word, word, context, at_sentence_start)
+        candidates = self.gen_candidates(original_word, word, context, at_sentence_start, budget=budget)
         if not candidates:
             # No good candidates
             return word
@@ -482,8 +672,12 @@ class Corrector:
         word: str,
         context: Tuple[str, ...],
         at_sentence_start: bool,
+        *,
+        budget: Optional[SpellingBudget] = None,
     ) -> List[Tuple[str, float]]:
         """Find the best candidates for spelling correction for this word.
+        If a time budget is given, candidate generation is cut short
+        when the word's deadline passes (see SpellingBudget).
         Credits for parts of this elegant code are due to Peter Norvig,
         cf. http://nbviewer.jupyter.org/url/norvig.com/ipython/
         How%20to%20Do%20Things%20with%20Words.ipynb"""
@@ -493,10 +687,16 @@ class Corrector:
 
         alphabet = self._ALPHABET
 
+        vocabulary = self.vocabulary
+
         def in_dictionary(w: str) -> bool:
             """Consider a word to be in-dictionary if it occurs in
             BÍN (potentially also in title case) or
             frequently enough in the trigrams database"""
+            if vocabulary is not None and w.islower():
+                # The prebuilt vocabulary answers for both the lower
+                # case and the title case form in a single probe
+                return vocabulary.is_known(w)
             if w in self._db or self.freq(w) >= self._KNOWN_WORD_MIN_FREQUENCY:
                 return True
             wt = w.title()
@@ -533,6 +733,9 @@ class Corrector:
         #
         #     return {e2 for e1 in edits1(pairs) for e2 in sub_edits1(e1)}
 
+        # The level of checking reached, lowered by _gen_candidates() if it runs out of time
+        level = SPELLING_FULL
+
         def _gen_candidates(original_word: str, word: str) -> Iterable[Tuple[str, float]]:
             """Generate candidates in order of generally decreasing likelihood"""
 
@@ -592,22 +795,46 @@ class Corrector:
                     # Multiply the prob by 0.4, i.e. add log(0.4) to the logprob
                     lamb += LOG_LAMBDA
 
+            nonlocal level
             P = stupid_backoff
             e0 = edits0(word)  # | edits0(original_word)
             for c in known(e0):
                 yield (c, P(c) + EDIT_0_FACTOR)
-            for c in known(self.subs(word)):
+            for c in known(self.subs(word, deadline=deadline)):
                 yield (c, P(c) + EDIT_S_FACTOR)
+            if self.subs_stats.timed_out:
+                level = SPELLING_EDITS0
+                return
+            if deadline is not None and time.perf_counter() > deadline:
+                level = SPELLING_SUBS
+                return
             pairs = _splits(word)
             e1 = edits1(pairs) - e0
-            for c in known(e1):
-                yield (c, P(c) + EDIT_1_FACTOR)
+            if deadline is None:
+                for c in known(e1):
+                    yield (c, P(c) + EDIT_1_FACTOR)
+                return
+            for ix, c in enumerate(e1):
+                if not ix % self._DEADLINE_CHECK_INTERVAL and time.perf_counter() > deadline:
+                    # Keep the edit distance 1 candidates found so far
+                    level = SPELLING_SUBS
+                    return
+                if in_dictionary(c):
+                    yield (c, P(c) + EDIT_1_FACTOR)
             # The following edit distance=2 stuff is currently too expensive
             # in terms of processor time and memory
             # e2 = edits2(pairs) - e1 - e0
             # for c in known(e2):
             #     yield (c, P(c) + EDIT_2_FACTOR)
 
+        start = time.perf_counter()
+        deadline: Optional[float] = None
+        if budget is not None:
+            if budget.exhausted:
+                budget.charge(original_word, start, SPELLING_SKIPPED)
+                return []
+            deadline = budget.deadline(start)
+
         # First, if the word itself is common enough as a unigram,
         # we don't bother checking it further and just assume it's fine
         log_prob = self.logprob(word)
@@ -621,7 +848,10 @@ class Corrector:
             # print(f"The original word {word} is above the threshold, returning it")
             return []
         # Otherwise, generate replacement candidates
-        return list(_gen_candidates(original_word, word))
+        candidates = list(_gen_candidates(original_word, word))
+        if budget is not None:
+            budget.charge(original_word, start, level)
+        return candidates
 
     def _best_list(
         self,
@@ -629,9 +859,10 @@ class Corrector:
         word: str,
         context: Tuple[str, ...],
         at_sentence_start: bool,
+        budget: Optional[SpellingBudget] = None,
     ) -> List[Tuple[str, float]]:
         """Remove unlikely candidates from list"""
-        candidates = self.gen_candidates(original_word, word, context, at_sentence_start)
+        candidates = self.gen_candidates(original_word, word, context, at_sentence_start, budget=budget)
         if not candidates:
             # No candidates beside the word itself: return an empty list
             # print(f"Candidate {word} is only candidate, returned list is empty")
@@ -685,22 +916,35 @@ class Corrector:
         # Return True if the lower case version is rare
         return self.logprob(wl) < self._RARE_THRESHOLD
 
-    def correct(self, word: str, *, context: Tuple[str, ...] = (), at_sentence_start: bool = False) -> str:
+    def correct(
+        self,
+        word: str,
+        *,
+        context: Tuple[str, ...] = (),
+        at_sentence_start: bool = False,
+        budget: Optional[SpellingBudget] = None,
+    ) -> str:
         """Correct a single word, keeping its case (lower/upper/title) intact.
         The optional context parameter contains a tuple of preceding
-        words, used to enable a more accurate probability prediction."""
-        return self._case_of(word)(self._correct(word, self._cast(word), context, at_sentence_start))
+        words, used to enable a more accurate probability prediction.
+        The optional budget limits the time spent on the word."""
+        return self._case_of(word)(self._correct(word, self._cast(word), context, at_sentence_start, budget))
 
     def suggest_list(
-        self, word: str, *, context: Tuple[str, ...] = (), at_sentence_start: bool = False
+        self,
+        word: str,
+        *,
+        context: Tuple[str, ...] = (),
+        at_sentence_start: bool = False,
+        budget: Optional[SpellingBudget] = None,
     ) -> List[Tuple[str, float]]:
         """Return a list of suggestions for a single word, keeping its case
         (lower/upper/title) intact. The optional context parameter contains
         a tuple of preceding words, used to enable a more accurate probability
-        prediction."""
+        prediction. The optional budget limits the time spent on the word."""
         return list(
             (self._case_of(word)(cased_cand[0]), cased_cand[1])
-            for cased_cand in self._best_list(word, self._cast(word), context, at_sentence_start)
+            for cased_cand in self._best_list(word, self._cast(word), context, at_sentence_start, budget)
         )
 
     def __getitem__(self, word: str) -> str:
@@ -711,27 +955,114 @@ class Corrector:
         """Support "word" in corrector"""
         return self._db.__contains__(word)
 
-    # pylint: disable=used-before-assignment
-    def correct_text(self, text: StringIterable, *, only_rare: bool = False) -> str:
-        """Attempt to correct all words within a text, returning the corrected text.
-        If only_rare is True, correction is only attempted on rare words."""
-        result: List[str] = []
+    def _correct_tokens(
+        self, tokens: Iterable[TokenTuple], *, only_rare: bool = False, context: Tuple[str, ...] = ()
+    ) -> List[str]:
+        """Correct the words in a stream of (kind, text) token tuples,
+        returning a list of token texts. The optional context contains
+        the preceding texts, which are used for the first words but are
+        not included in the result."""
+        result: List[str] = list(context)
         look_back = -MAX_ORDER + 1
-        for token in tokenize(text):
-            if token.kind == TOK.WORD:
-                if only_rare and not self.is_rare(token.txt):
+        for kind, txt in tokens:
+            if kind == TOK.WORD:
+                if only_rare and not self.is_rare(txt):
                     # The word is not rare, so we don't attempt correction
-                    result.append(token.txt)
+                    result.append(txt)
                 else:
                     # Correct the word and return the result
-                    result.append(self.correct(token.txt, context=tuple(result[look_back:])))
-            elif token.txt:
-                result.append(token.txt)
-            elif token.kind in {TOK.S_BEGIN, TOK.S_END}:
+                    result.append(self.correct(txt, context=tuple(result[look_back:])))
+            elif txt:
+                result.append(txt)
+            elif kind in {TOK.S_BEGIN, TOK.S_END}:
                 result.append("")
+        return result[len(context) :]
+
+    def correct_text(self, text: StringIterable, *, only_rare: bool = False) -> str:
+        """Attempt to correct all words within a text, returning the corrected text.
+        If only_rare is True, correction is only attempted on rare words."""
+        result = self._correct_tokens(((t.kind, t.txt) for t in tokenize(text)), only_rare=only_rare)
+        return correct_spaces(" ".join(result))
+
+    def correct_text_parallel(
+        self,
+        text: StringIterable,
+        *,
+        only_rare: bool = False,
+        processes: Optional[int] = None,
+        sentences_per_chunk: int = SENTENCES_PER_CHUNK,
+    ) -> str:
+        """Attempt to correct all words within a text, using a pool of
+        worker processes (by default one per CPU core), and return the
+        corrected text. The text is split into chunks at sentence
+        boundaries and the result is identical to that of correct_text()."""
+        if "fork" in multiprocessing.get_all_start_methods():
+            # The workers inherit this corrector, and thereby share the
+            # memory-mapped BÍN, trigram database and vocabulary
+            context: BaseContext = multiprocessing.get_context("fork")
+            corrector: Optional[Corrector] = self
+        else:
+            # The workers must create their own correctors
+            context = multiprocessing.get_context()
+            corrector = None
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=context, initializer=_init_worker, initargs=(corrector,)
+        ) as executor:
+            # Keep a bounded number of chunks in flight, so that arbitrarily
+            # long token streams can be processed in constant memory
+            max_pending = 4 * (processes or multiprocessing.cpu_count())
+            pending: Deque["Future[List[str]]"] = deque()
+            result: List[str] = []
+            for chunk in _sentence_chunks(tokenize(text), sentences_per_chunk):
+                pending.append(executor.submit(_correct_chunk, chunk, only_rare))
+                if len(pending) >= max_pending:
+                    result.extend(pending.popleft().result())
+            while pending:
+                result.extend(pending.popleft().result())
         return correct_spaces(" ".join(result))
 
 
+# Corrector instance used within worker processes of correct_text_parallel()
+_worker_corrector: Optional[Corrector] = None
+
+
+def _init_worker(corrector: Optional[Corrector]) -> None:
+    """Initialize a worker process for correct_text_parallel()"""
+    global _worker_corrector
+    _worker_corrector = corrector if corrector is not None else Corrector(GreynirBin.get_db())
+
+
+def _correct_chunk(chunk: Tuple[bool, List[TokenTuple]], only_rare: bool) -> List[str]:
+    """Correct a chunk of sentences within a worker process"""
+    assert _worker_corrector is not None
+    continued, tokens = chunk
+    # A chunk that continues the text starts right after a sentence end,
+    # which contributes an empty string to the context of the first word
+    return _worker_corrector._correct_tokens(  # type: ignore[reportPrivateUsage]
+        tokens, only_rare=only_rare, context=("",) if continued else ()
+    )
+
+
+def _sentence_chunks(tokens: Iterable[Tok], sentences_per_chunk: int) -> Iterator[Tuple[bool, List[TokenTuple]]]:
+    """Split a token stream into chunks of whole sentences, yielding
+    (continued, tokens) tuples where continued is True for all chunks
+    but the first one"""
+    chunk: List[TokenTuple] = []
+    sentences = 0
+    continued = False
+    for t in tokens:
+        chunk.append((t.kind, t.txt))
+        if t.kind == TOK.S_END:
+            sentences += 1
+            if sentences >= sentences_per_chunk:
+                yield continued, chunk
+                chunk = []
+                sentences = 0
+                continued = True
+    if chunk:
+        yield continued, chunk
+
+
 def test() -> None:
     with GreynirBin.get_db() as db:
         c = Corrector(db)
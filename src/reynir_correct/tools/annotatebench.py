@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+"""
+Benchmark GreynirCorrect.annotate(), i.e. the sentence-level annotation
+that runs after parsing (ErrorFinder and PatternMatcher), on a fixed set
+of sentences. The sentences are parsed once, and then annotated
+repeatedly, so that parsing time is excluded from the results, which
+are reported as JSON. The mean time of each sentence is also reported,
+split into the error finder, which walks the deep parse tree, and the
+pattern matcher, which walks the simplified tree. To run:
+$ python annotatebench.py --repeat 20
+
+"""
+from typing import Any, Dict, List, cast
+
+import argparse
+import importlib.metadata
+import json
+import platform
+import sys
+import time
+
+from reynir_correct.annotation import Annotation
+from reynir_correct.checker import AnnotatedSentence, ErrorDetectingParser
+from reynir_correct.errfinder import ErrorFinder
+from reynir_correct.pattern import PatternMatcher, PatternSet
+from reynir_correct.wrappers import GreynirCorrectAPI
+
+# Sentences that exercise the pattern matcher and the error finder
+SENTENCES: List[str] = [
+    "Ráðherrann dáðist af hugrekki stjórnarandstöðunnar.",
+    "Mig langaði að leita af bílnum, en dáðist svo af hugrekki lögreglukonunnar að ég gerði það ekki.",
+    "Við höfum leitað í allan dag af kettinum, en fundum hann ekki.",
+    "Ég hef áhyggjur að honum.",
+    "Það er mikill heiður að fá að hitta þig.",
+    "Hann er fluttur út á land og býr nú á Akureyri.",
+    "Ég fór uppí sveit og var þar í heilan mánuð.",
+    "Fjöldi manns voru á fundinum í gærkvöldi.",
+    "Einn af drengjunum fóru í sund af gefnu tilefni.",
+    "Mig hlakkaði til að fara í ferðalagið með fjölskyldunni.",
+    "Páli, vini mínum, langaði að horfa á sjónvarpið.",
+    "Hún sagði að hann væri kominn heim og að allt væri í lagi.",
+    "Ef ég hefði vitað það hefði ég ekki farið.",
+    "Stjórnin ákvað að bjóða almenningi upp á ókeypis aðgang að söfnum borgarinnar.",
+    "Nefndin mun fjalla um málið á næsta fundi sínum í byrjun næsta mánaðar.",
+    "Í gær var mikið rætt um efnahagsmál á Alþingi og um stöðu heimilanna.",
+]
+
+# Define the command line arguments
+parser = argparse.ArgumentParser(description="Benchmarks sentence annotation in GreynirCorrect")
+
+parser.add_argument(
+    "--repeat",
+    "-r",
+    type=int,
+    default=10,
+    help="Number of times each sentence is annotated",
+)
+parser.add_argument(
+    "--output",
+    "-o",
+    type=argparse.FileType("w", encoding="utf-8"),
+    default=sys.stdout,
+    help="Output JSON file",
+)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Return the p-th percentile of a sorted list, by the nearest-rank method"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def main() -> None:
+    args = parser.parse_args()
+    api = GreynirCorrectAPI.from_options()
+    gc = api.gc
+    t0 = time.perf_counter()
+    result = gc.parse_all_tokens(gc.tokenize(" ".join(SENTENCES)))
+    parse_time = time.perf_counter() - t0
+    sentences: List[AnnotatedSentence] = result["sentences"]
+    parsed = [s for s in sentences if s.tree is not None]
+    latencies: List[float] = []
+    for _ in range(args.repeat):
+        for sent in parsed:
+            t0 = time.perf_counter()
+            gc.annotate(sent)
+            latencies.append(time.perf_counter() - t0)
+    # Time the tree walks of each sentence separately
+    rules = cast(ErrorDetectingParser, gc.parser).error_rules
+    extra = PatternSet.for_settings(gc.settings)
+    per_sentence: List[Dict[str, Any]] = []
+    for sent in parsed:
+        annotate_time = errfinder_time = patterns_time = 0.0
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            gc.annotate(sent)
+            t1 = time.perf_counter()
+            ann: List[Annotation] = []
+            ErrorFinder(ann, sent, rules).run()
+            t2 = time.perf_counter()
+            PatternMatcher(ann, sent, extra).run()
+            t3 = time.perf_counter()
+            annotate_time += t1 - t0
+            errfinder_time += t2 - t1
+            patterns_time += t3 - t2
+        per_sentence.append(
+            {
+                "text": sent.tidy_text,
+                "tokens": len(sent.tokens),
+                "mean_ms": round(annotate_time / args.repeat * 1000.0, 3),
+                "errfinder_ms": round(errfinder_time / args.repeat * 1000.0, 3),
+                "patterns_ms": round(patterns_time / args.repeat * 1000.0, 3),
+            }
+        )
+    total = sum(latencies)
+    latencies.sort()
+    report: Dict[str, Any] = {
+        "version": importlib.metadata.version("reynir-correct"),
+        "python": "{0} {1}".format(platform.python_implementation(), platform.python_version()),
+        "sentences": len(sentences),
+        "parsed": len(parsed),
+        "repeat": args.repeat,
+        "parse_seconds": round(parse_time, 3),
+        "annotate": {
+            "calls": len(latencies),
+            "sentences_per_sec": round(len(latencies) / total, 1) if total > 0.0 else None,
+            "mean_ms": round(total / len(latencies) * 1000.0, 3) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000.0, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000.0, 3),
+        },
+        "per_sentence": per_sentence,
+    }
+    json.dump(report, args.output, ensure_ascii=False, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
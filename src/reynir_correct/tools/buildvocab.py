@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+"""
+Build the known-word vocabulary used by the spelling corrector
+(see vocabulary.py) from one or more BÍN files in Kristínarsnið CSV
+format, plus the unigram vocabulary of the trigram database. The CSV
+files should be of the same BÍN release as the installed islenska
+package: forms that are not found in its BÍN database are left out,
+and the vocabulary is stamped as built from the installed data files.
+To build the default vocabulary file:
+$ python buildvocab.py KRISTINsnid.csv
+
+"""
+from typing import Iterable, Iterator
+
+import argparse
+import time
+
+from icegrams.ngrams import Ngrams
+from reynir.bindb import GreynirBin
+
+from reynir_correct.spelling import Corrector
+from reynir_correct.vocabulary import VOCABULARY_PATH, Vocabulary, source_stamp
+
+# Define the command line arguments
+parser = argparse.ArgumentParser(description="Builds the known-word vocabulary for the spelling corrector")
+
+parser.add_argument(
+    "bin_files",
+    nargs="+",
+    help="BÍN files in Kristínarsnið CSV format (semicolon-separated, UTF-8)",
+)
+parser.add_argument(
+    "--output",
+    "-o",
+    default=VOCABULARY_PATH,
+    help="Output vocabulary file",
+)
+
+
+def bin_forms(fnames: Iterable[str]) -> Iterator[str]:
+    """Generate the word forms (fifth column) in the given BÍN files"""
+    for fname in fnames:
+        with open(fname, "r", encoding="utf-8") as f:
+            for line in f:
+                a = line.split(";", 5)
+                if len(a) >= 5 and a[4]:
+                    yield a[4]
+
+
+def ngram_words(ngrams: Ngrams) -> Iterator[str]:
+    """Generate the unigrams that are frequent enough to be
+    considered known words by the spelling corrector"""
+    storage = ngrams.ngrams
+    ix = 1
+    while True:
+        try:
+            w = storage.id_to_word(ix)
+        except IndexError:
+            # Past the end of the vocabulary
+            break
+        if ngrams.adj_freq(w) >= Corrector._KNOWN_WORD_MIN_FREQUENCY:  # type: ignore[reportPrivateUsage]
+            yield w
+        ix += 1
+
+
+def main() -> None:
+    args = parser.parse_args()
+    t0 = time.time()
+    forms = set(bin_forms(args.bin_files))
+    with GreynirBin.get_db() as db:
+        # The vocabulary answers for the installed BÍN database
+        words = {w for w in forms if w in db}
+    print("Read {0} distinct word forms from BÍN".format(len(forms)))
+    if len(words) < len(forms):
+        print("Left out {0} forms that are not in the installed BÍN database".format(len(forms) - len(words)))
+    words.update(ngram_words(Ngrams()))
+    min_frequency = Corrector._KNOWN_WORD_MIN_FREQUENCY  # type: ignore[reportPrivateUsage]
+    count = Vocabulary.build(words, args.output, source_stamp(min_frequency))
+    print("Wrote {0} entries to {1} in {2:.1f} seconds".format(count, args.output, time.time() - t0))
+
+
+if __name__ == "__main__":
+    main()
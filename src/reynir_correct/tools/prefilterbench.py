@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+"""
+Evaluate the heuristic parse prefilter (see prefilter.py) against full
+parsing. Each sentence is checked with full parsing, and its annotations
+are compared with those it gets when it is not parsed. A sentence for
+which parsing adds or changes annotations is a positive; the prefilter
+predicts a positive when it judges that the sentence needs parsing.
+Precision, recall, the ratio of skipped sentences and the number of
+sentences with each signal are reported as JSON.
+
+The input is a glob path of either iceErrorCorpus files in TEI XML format
+(see eval/eval.py), from which the original sentences are read, or plain
+text files with one sentence per line. To run:
+$ python prefilterbench.py "../../../eval/iceErrorCorpus/data/**/*.xml"
+
+"""
+from typing import Any, Counter, Dict, FrozenSet, Iterator, List, Tuple
+
+import argparse
+import glob
+import importlib.metadata
+import json
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from reynir import TokenList, correct_spaces
+
+from reynir_correct.checker import AnnotatedSentence, GreynirCorrect
+from reynir_correct.prefilter import HeuristicPrefilter
+from reynir_correct.wrappers import GreynirCorrectAPI
+
+# XML namespace of the TEI files in the error corpus
+NS = "{http://www.tei-c.org/ns/1.0}"
+
+# Define the command line arguments
+parser = argparse.ArgumentParser(description="Evaluates the heuristic parse prefilter against full parsing")
+
+parser.add_argument("path", type=str, help="Glob path of TEI XML or plain text files")
+parser.add_argument(
+    "--number",
+    "-n",
+    type=int,
+    default=0,
+    help="Maximum number of sentences to evaluate (default=all)",
+)
+parser.add_argument(
+    "--max_unknown_ratio",
+    type=float,
+    default=None,
+    help=f"Maximum ratio of unknown words (default={HeuristicPrefilter.MAX_UNKNOWN_RATIO})",
+)
+parser.add_argument(
+    "--max_perplexity",
+    type=float,
+    default=None,
+    help=f"Maximum trigram perplexity (default={HeuristicPrefilter.MAX_PERPLEXITY})",
+)
+parser.add_argument(
+    "--output",
+    "-o",
+    type=argparse.FileType("w", encoding="utf-8"),
+    default=sys.stdout,
+    help="Output JSON file",
+)
+
+
+def xml_sentences(fpath: str) -> Iterator[str]:
+    """Generate the original text of the sentences in an error corpus file"""
+    root = ET.parse(fpath).getroot()
+    for sent in root.iterfind(f"{NS}text/{NS}body/{NS}p/{NS}s"):
+        words: List[str] = []
+        for el in sent:
+            if el.tag == f"{NS}revision":
+                # Use the original, uncorrected tokens of the revision
+                words.extend("".join(sub.itertext()) for sub in el.iterfind(f"{NS}original/*"))
+            else:
+                words.append("".join(el.itertext()))
+        text = correct_spaces(" ".join(w for w in words if w))
+        if text:
+            yield text
+
+
+def sentences(path: str) -> Iterator[str]:
+    """Generate the sentences in the files matching the glob path"""
+    for fpath in sorted(glob.iglob(path, recursive=True)):
+        if fpath.endswith(".xml"):
+            yield from xml_sentences(fpath)
+        else:
+            with open(fpath, encoding="utf-8") as f:
+                yield from (line.strip() for line in f if line.strip())
+
+
+class SkipAll(HeuristicPrefilter):
+    """A prefilter that judges all sentences clean"""
+
+    def __init__(self) -> None:
+        pass
+
+    def needs_parse(self, tokens: TokenList) -> bool:
+        return False
+
+
+def annotation_set(sent: AnnotatedSentence) -> FrozenSet[Tuple[int, int, str]]:
+    """Return the spans and codes of a sentence's annotations"""
+    return frozenset((a.start, a.end, a.code) for a in sent.annotations)
+
+
+def ratio(a: int, b: int) -> float:
+    """Return a / b, rounded, or 0.0 if b is zero"""
+    return round(a / b, 4) if b else 0.0
+
+
+def main() -> None:
+    args = parser.parse_args()
+    api = GreynirCorrectAPI.from_options()
+    gc = api.gc
+    prefilter = HeuristicPrefilter(
+        gc.parser.grammar, max_unknown_ratio=args.max_unknown_ratio, max_perplexity=args.max_perplexity
+    )
+    # A checker that never parses, for the annotations of skipped sentences
+    skipping = GreynirCorrect(gc.settings, gc.pipeline, parse_prefilter=SkipAll())
+    skipping_job = skipping.create_job((), parse=True)
+    tp = fp = fn = tn = 0
+    signal_counts: Counter[str] = Counter()
+    parse_time = prefilter_time = 0.0
+    for count, text in enumerate(sentences(args.path)):
+        if args.number and count >= args.number:
+            break
+        tokens = list(gc.tokenize(text))
+        t0 = time.perf_counter()
+        full = gc.parse_all_tokens(tokens)
+        parse_time += time.perf_counter() - t0
+        for sent in full["sentences"]:
+            t0 = time.perf_counter()
+            signals = prefilter.signals(sent.tokens)
+            prefilter_time += time.perf_counter() - t0
+            signal_counts.update(signals)
+            predicted = bool(signals)
+            # Annotate the sentence without parsing it
+            unparsed = skipping.create_sentence(skipping_job, sent.tokens)
+            actual = annotation_set(sent) != annotation_set(unparsed)
+            if predicted:
+                if actual:
+                    tp += 1
+                else:
+                    fp += 1
+            elif actual:
+                fn += 1
+            else:
+                tn += 1
+    total = tp + fp + fn + tn
+    report: Dict[str, Any] = {
+        "version": importlib.metadata.version("reynir-correct"),
+        "sentences": total,
+        "needs_parse": tp + fn,
+        "predicted_parse": tp + fp,
+        "precision": ratio(tp, tp + fp),
+        "recall": ratio(tp, tp + fn),
+        "skipped_ratio": ratio(fn + tn, total),
+        "missed": fn,
+        "signals": dict(signal_counts.most_common()),
+        "parse_seconds": round(parse_time, 3),
+        "prefilter_seconds": round(prefilter_time, 3),
+    }
+    json.dump(report, args.output, ensure_ascii=False, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
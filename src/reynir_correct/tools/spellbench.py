@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the main operations of the spelling corrector (spelling.py)
+on fixed lists of Icelandic words, reporting throughput, latency
+percentiles and peak memory as JSON, so that results can be compared
+across versions. To run all benchmarks and write the results to a file:
+$ python spellbench.py --output bench.json
+To run only some of the benchmarks:
+$ python spellbench.py correct subs
+
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+import argparse
+import importlib.metadata
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+from reynir.bindb import GreynirBin
+
+from reynir_correct.spelling import Corrector, _splits, levenshtein_distance  # type: ignore[reportPrivateUsage]
+
+# Misspelled words, grouped by length: short words, ordinary words,
+# and long compounds, which are the most expensive to correct
+WORD_LISTS: Dict[str, List[str]] = {
+    "short": [
+        "svef",
+        "þo",
+        "alvoru",
+        "lýðan",
+        "gamgi",
+        "áhri",
+        "þe",
+        "olikur",
+        "mikkil",
+        "bill",
+        "semm",
+        "bidu",
+        "hvad",
+        "eftri",
+        "eing",
+    ],
+    "medium": [
+        "rasisku",
+        "allveg",
+        "sjalsögðu",
+        "orettlæti",
+        "politiskum",
+        "rettlatara",
+        "gitarinn",
+        "missnotað",
+        "tilhneygjingu",
+        "þjoðfelagið",
+        "áfengissyki",
+        "ollíugeimir",
+        "klukkutímun",
+        "fjölmiðlaheimunum",
+        "skriffstofan",
+        "heimilisinns",
+    ],
+    "long": [
+        "hæstarréttarlögmaður",
+        "fangageimslan",
+        "aðstoðarframkvæmdarstjórinn",
+        "sjálfstæðisflokkurin",
+        "einkavinavæðingarinar",
+        "skoðanamindandi",
+        "félagshygjuflokkanna",
+        "heilbrigðisráðuneytisinns",
+        "umhverfisverndarsamtökinn",
+        "menntamálaráðherans",
+        "kjarasamningsviðræðunar",
+        "lögreglustjóraembætið",
+    ],
+}
+
+# Correctly spelled words of all lengths, which are reported separately,
+# as the "known" list, so that they do not skew the figures for misspellings
+KNOWN_WORDS: List[str] = [
+    "hæg",
+    "biddu",
+    "dag",
+    "mikil",
+    "sem",
+    "bíll",
+    "klukkutímum",
+    "fjölmiðlaheiminum",
+    "skrifstofan",
+    "heimilisins",
+    "aðstoðarframkvæmdastjórinn",
+    "sjálfstæðisflokkurinn",
+    "einkavinavæðingarinnar",
+    "skoðanamyndandi",
+    "menntamálaráðherrans",
+    "lögreglustjóraembættið",
+]
+
+# Pairs of misspelled and correct words for levenshtein_distance()
+DISTANCE_PAIRS: List[Tuple[str, str]] = [
+    ("hæstarréttarlögmaður", "hæstaréttarlögmaður"),
+    ("fangageimslan", "fangageymslan"),
+    ("ollíugeimir", "olíugeymir"),
+    ("tilhneygjingu", "tilhneigingu"),
+    ("áfengissyki", "áfengissýki"),
+    ("sjalsögðu", "sjálfsögðu"),
+    ("rasisku", "rasísku"),
+    ("allveg", "alveg"),
+    ("sona", "svona"),
+    ("svef", "svefn"),
+    ("heilbrigðisráðuneytisinns", "heilbrigðisráðuneytisins"),
+    ("umhverfisverndarsamtökinn", "umhverfisverndarsamtökin"),
+]
+
+# A benchmark is a function from a corrector and a word list
+# to a list of zero-argument calls, one per benchmarked word
+Calls = List[Callable[[], Any]]
+
+
+def bench_correct(c: Corrector, words: List[str]) -> Calls:
+    return [partial(c.correct, w) for w in words]
+
+
+def bench_suggest_list(c: Corrector, words: List[str]) -> Calls:
+    return [partial(c.suggest_list, w) for w in words]
+
+
+def bench_subs(c: Corrector, words: List[str]) -> Calls:
+    def subs(w: str) -> List[str]:
+        return list(c.subs(w))
+
+    return [partial(subs, w) for w in words]
+
+
+def bench_gen_candidates(c: Corrector, words: List[str]) -> Calls:
+    return [partial(c.gen_candidates, w, w.lower(), (), False) for w in words]
+
+
+def bench_is_rare(c: Corrector, words: List[str]) -> Calls:
+    return [partial(c.is_rare, w) for w in words]
+
+
+BENCHMARKS: Dict[str, Callable[[Corrector, List[str]], Calls]] = {
+    "correct": bench_correct,
+    "suggest_list": bench_suggest_list,
+    "subs": bench_subs,
+    "gen_candidates": bench_gen_candidates,
+    "is_rare": bench_is_rare,
+}
+
+ALL_BENCHMARKS = list(BENCHMARKS) + ["levenshtein_distance"]
+
+# Define the command line arguments
+parser = argparse.ArgumentParser(description="Benchmarks the spelling corrector")
+
+parser.add_argument(
+    "benchmarks",
+    nargs="*",
+    help="Benchmarks to run (default: all): {0}".format(", ".join(ALL_BENCHMARKS)),
+)
+parser.add_argument(
+    "--repeat",
+    "-r",
+    type=int,
+    default=3,
+    help="Number of times each word list is processed",
+)
+parser.add_argument(
+    "--output",
+    "-o",
+    type=argparse.FileType("w", encoding="utf-8"),
+    default=sys.stdout,
+    help="Output JSON file",
+)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Return the p-th percentile of a sorted list, by the nearest-rank method"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure(calls: Calls, repeat: int) -> Dict[str, Any]:
+    """Time the given calls, then measure their peak memory in a separate
+    pass, since tracing memory allocations slows them down considerably"""
+    latencies: List[float] = []
+    total = 0.0
+    for _ in range(repeat):
+        # Start each round with a cold cache
+        _splits.cache_clear()
+        for call in calls:
+            t0 = time.perf_counter()
+            call()
+            t = time.perf_counter() - t0
+            latencies.append(t)
+            total += t
+    latencies.sort()
+    _splits.cache_clear()
+    tracemalloc.start()
+    for call in calls:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "calls": len(latencies),
+        "words_per_sec": round(len(latencies) / total, 1) if total > 0.0 else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000.0, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000.0, 3),
+        "max_ms": round(latencies[-1] * 1000.0, 3) if latencies else 0.0,
+        "peak_memory_kb": round(peak / 1024.0, 1),
+    }
+
+
+def run(c: Corrector, names: List[str], repeat: int) -> Dict[str, Any]:
+    """Run the given benchmarks, returning the results as a dict"""
+    results: Dict[str, Any] = {}
+    for name in names:
+        if name == "levenshtein_distance":
+            calls: Calls = [partial(levenshtein_distance, a, b) for a, b in DISTANCE_PAIRS]
+            results[name] = {"pairs": measure(calls, repeat)}
+            continue
+        make_calls = BENCHMARKS[name]
+        word_lists = dict(WORD_LISTS, known=KNOWN_WORDS)
+        results[name] = {list_name: measure(make_calls(c, words), repeat) for list_name, words in word_lists.items()}
+    return results
+
+
+def main() -> None:
+    args = parser.parse_args()
+    names = args.benchmarks or ALL_BENCHMARKS
+    for name in names:
+        if name not in ALL_BENCHMARKS:
+            parser.error("Unknown benchmark: {0}".format(name))
+    with GreynirBin.get_db() as db:
+        c = Corrector(db)
+        # Warm up: load the trigram database and the vocabulary,
+        # so that their load times are not included in the results
+        c.correct("hestur")
+        t0 = time.time()
+        results = run(c, names, args.repeat)
+    report = {
+        "version": importlib.metadata.version("reynir-correct"),
+        "python": "{0} {1}".format(platform.python_implementation(), platform.python_version()),
+        "vocabulary": c.vocabulary is not None,
+        "repeat": args.repeat,
+        "seconds": round(time.time() - t0, 2),
+        "results": results,
+    }
+    json.dump(report, args.output, ensure_ascii=False, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
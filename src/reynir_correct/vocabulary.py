@@ -0,0 +1,255 @@
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    Known-word vocabulary module
+
+    Copyright © 2025 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module implements the Vocabulary class, a memory-mapped table
+    of known word forms, keyed by their lower case form and sorted in
+    byte order so that it can be searched with a binary search. Each
+    entry has flags telling whether the lower case form itself and/or
+    its title case form is a known word, so that the spelling corrector
+    can answer both questions with a single probe. The table also answers
+    whether any known word starts with a given prefix, which allows the
+    corrector to prune substitution candidates that cannot lead to a
+    known word.
+
+    The table is built offline, see tools/buildvocab.py, from the word
+    forms in BÍN and the unigram vocabulary of the trigram database. Its
+    header carries a stamp of the BÍN and trigram data files that it was
+    built against (see source_stamp()), and a vocabulary whose stamp does
+    not match the installed data files is not used, so that it can be
+    trusted to answer for them.
+
+    File layout (all integers are little-endian uint32):
+
+        VERSION       16 bytes
+        source        16 bytes, the stamp of the data it was built from
+        count         number of words, N
+        offsets       N + 1 offsets into the word area
+        flags         N bytes, one per word (KNOWN_LOWER | KNOWN_TITLE)
+        words         UTF-8 encoded words, concatenated, in byte order
+
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import array
+import hashlib
+import importlib.resources
+import mmap
+import os
+import struct
+import sys
+import warnings
+
+UINT32 = struct.Struct("<I")
+
+# Default location of the prebuilt vocabulary file
+VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), "resources", "vocabulary.bin")
+
+# Entry flags: the lower case form is a known word
+KNOWN_LOWER = 0x01
+# Entry flags: the title case form is a known word
+KNOWN_TITLE = 0x02
+
+# The source stamp of a vocabulary that was not built against any particular data
+NO_SOURCE = bytes(16)
+
+
+def source_stamp(min_frequency: int) -> bytes:
+    """Return a stamp of the installed BÍN and trigram data files, and of the
+    minimum trigram frequency of a known word, which identifies the data that
+    a vocabulary must be built from in order to answer for them"""
+    from islenska.basics import BIN_COMPRESSED_FILE, BIN_FILE_ENV
+    from icegrams.ngrams import BINARY_FILENAME
+
+    # The BÍN file may be overridden with an environment variable, as in islenska
+    bin_fname = os.environ.get(BIN_FILE_ENV) or str(
+        importlib.resources.files("islenska") / "resources" / BIN_COMPRESSED_FILE
+    )
+    digest = hashlib.blake2b(str(min_frequency).encode("ascii"), digest_size=16)
+    for fname in (bin_fname, BINARY_FILENAME):
+        # The size and the header and trailer of a file identify its
+        # contents well enough, without reading it all
+        size = os.path.getsize(fname)
+        with open(fname, "rb") as f:
+            digest.update(UINT32.pack(size & 0xFFFFFFFF))
+            digest.update(f.read(256))
+            f.seek(max(0, size - 256))
+            digest.update(f.read(256))
+    return digest.digest()
+
+
+class Vocabulary:
+
+    """A sorted, memory-mapped table of known word forms"""
+
+    VERSION = b"Greynir vocab03\n"
+
+    def __init__(self, fname: str) -> None:
+        with open(fname, "rb") as stream:
+            self._b = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._b[0:16] != self.VERSION:
+            self._b.close()
+            raise ValueError("Invalid or outdated vocabulary file: {0}".format(fname))
+        # The stamp of the data that the vocabulary was built from
+        self.source = bytes(self._b[16:32])
+        self._count: int = UINT32.unpack_from(self._b, 32)[0]
+        # Start of the offset table, the flags and the word area, respectively
+        offsets = 36
+        self._flags = offsets + 4 * (self._count + 1)
+        self._words = self._flags + self._count
+        self._view: Optional[memoryview] = None
+        self._offsets: Sequence[int]
+        if sys.byteorder == "little":
+            # Access the offset table directly within the memory map
+            self._view = memoryview(self._b)[offsets : self._flags].cast("I")
+            self._offsets = self._view
+        else:
+            a = array.array("I")
+            a.frombytes(self._b[offsets : self._flags])
+            a.byteswap()
+            self._offsets = a
+
+    @classmethod
+    def load(cls, fname: Optional[str] = None, source: Optional[bytes] = None) -> Optional["Vocabulary"]:
+        """Load a vocabulary file, returning None if it does not exist. If a
+        source stamp is given, a vocabulary that was built from other data,
+        or in an outdated format, is not loaded either, with a warning."""
+        fname = fname or VOCABULARY_PATH
+        if not os.path.isfile(fname):
+            return None
+        try:
+            vocabulary = cls(fname)
+        except ValueError as e:
+            if source is None:
+                raise
+            warnings.warn(f"{e}; rebuild it with tools/buildvocab.py")
+            return None
+        if source is not None and vocabulary.source != source:
+            vocabulary.close()
+            warnings.warn(
+                f"The vocabulary file {fname} was built from other BÍN or trigram data "
+                "and is not used; rebuild it with tools/buildvocab.py"
+            )
+            return None
+        return vocabulary
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _word(self, ix: int) -> bytes:
+        """Return the UTF-8 encoded word at index ix"""
+        offsets, words = self._offsets, self._words
+        return self._b[words + offsets[ix] : words + offsets[ix + 1]]
+
+    def _bisect(self, key: bytes) -> int:
+        """Return the index of the first word that is >= key"""
+        # This is the innermost loop of all lookups, hence the inlining
+        b, offsets, words = self._b, self._offsets, self._words
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if b[words + offsets[mid] : words + offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def flags(self, word: str) -> int:
+        """Return the flags of the given lower case word,
+        or 0 if it is not found in the vocabulary"""
+        key = word.encode("utf-8")
+        ix = self._bisect(key)
+        if ix < self._count and self._word(ix) == key:
+            return self._b[self._flags + ix]
+        return 0
+
+    def __contains__(self, word: str) -> bool:
+        """Return True if the word is found as a key in the vocabulary"""
+        key = word.encode("utf-8")
+        ix = self._bisect(key)
+        return ix < self._count and self._word(ix) == key
+
+    def is_known(self, word: str) -> bool:
+        """Return True if the given lower case word, or its title
+        case form, is a known word"""
+        return self.flags(word) != 0
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Return True if at least one word in the vocabulary
+        starts with the given prefix"""
+        key = prefix.encode("utf-8")
+        ix = self._bisect(key)
+        return ix < self._count and self._word(ix).startswith(key)
+
+    def close(self) -> None:
+        """Close the underlying memory map"""
+        if self._view is not None:
+            # The memory map cannot be closed while exported
+            self._view.release()
+            self._view = None
+        self._b.close()
+
+    @classmethod
+    def build(cls, words: Iterable[str], fname: str, source: bytes = NO_SOURCE) -> int:
+        """Write a vocabulary file containing the given known words,
+        keyed by their lower case forms, and stamped with the source
+        stamp of the data they were taken from, returning the number
+        of distinct entries"""
+        assert len(source) == 16
+        entries: Dict[bytes, int] = {}
+        for w in words:
+            if not w:
+                continue
+            lower = w.lower()
+            flag = 0
+            if w == lower:
+                flag = KNOWN_LOWER
+            elif w == lower.title():
+                flag = KNOWN_TITLE
+            key = lower.encode("utf-8")
+            # Words that are neither in lower case nor in title case,
+            # such as 'McDonald', only serve as prefixes
+            entries[key] = entries.get(key, 0) | flag
+        keys = sorted(entries)
+        offsets = bytearray()
+        pos = 0
+        for k in keys:
+            offsets += UINT32.pack(pos)
+            pos += len(k)
+        offsets += UINT32.pack(pos)
+        with open(fname, "wb") as f:
+            f.write(cls.VERSION)
+            f.write(source)
+            f.write(UINT32.pack(len(keys)))
+            f.write(offsets)
+            f.write(bytes(entries[k] for k in keys))
+            for k in keys:
+                f.write(k)
+        return len(keys)
@@ -50,16 +50,63 @@
     ignore_wordlist: The value is a set of strings, a whitelist. Each string is a word that should not be marked as an error or corrected.
     one_sent: Defines input as containing only one sentence.
     ignore_rules: A list of error codes that should be ignored in the annotation process.
+    spelling_word_budget: Time budget in seconds for the spelling correction of a single word.
+                          Candidate generation for the word is cut short when it is exceeded.
+    spelling_document_budget: Time budget in seconds for the spelling correction of the whole input.
+                              Further words are not corrected when it is exceeded.
+    parse_sentence_budget: Time budget in seconds for parsing a single sentence. A sentence whose
+                           parse exceeds it is annotated with E008 instead of being fully checked.
+    parse_document_budget: Time budget in seconds for parsing the whole input.
+                           Further sentences are not parsed, and get E008, when it is exceeded.
+    long_sentence_words: Sentences with more words than this are not parsed as a whole, but are
+                         annotated with E005 and handled according to long_sentence_policy.
+    long_sentence_policy: "skip" (the default) to keep only the token-level annotations of long
+                          sentences, or "split" to split them at semicolons and colons and
+                          parse and annotate the pieces separately.
+    parse_prefilter: If True, sentences that a heuristic prefilter judges free of grammatical errors,
+                     from signals such as token errors, unknown words, trigram perplexity and
+                     trigger lemmas, are not parsed and get only token-level annotations.
+                     Unlike sentence_prefilter, it needs no additional packages.
+    sentence_cache_size: If set, the results of up to this many sentences are cached in memory,
+                         keyed by the tokens of the sentence, the relevant options and the version
+                         of the settings, so that recurring sentences are only parsed once.
+    sentence_cache_path: If set, sentence results are also cached in an SQLite file at this path,
+                         which is shared by all processes that use it.
+    lean_results: If True, the parse trees of each sentence are released as soon as it has been
+                  annotated, so that memory use does not grow with the length of the document.
+                  The sentences then keep only their tokens, annotations and parse statistics.
+    processes: If larger than 1, sentences are parsed and annotated in a pool of that many
+               worker processes; 0 means one worker per CPU core.
+    max_in_flight: The maximum number of sentences that correct_stream_async() checks
+                   ahead of its consumer.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 from typing_extensions import TypedDict
 
 import argparse
+import asyncio
 import json
 import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 
@@ -68,8 +115,9 @@ from tokenizer.definitions import AmountTuple, NumberTuple
 
 from .errtokenizer import CorrectionPipeline, CorrectToken, Error, load_config
 from .readability import FleschKincaidFeedback, FleschKincaidScorer, RareWordsFinder
+from .spelling import DegradedWord
 from .annotation import Annotation
-from .checker import AnnotatedSentence, CheckResult, GreynirCorrect
+from .checker import AnnotatedSentence, CheckJob, CheckResult, GreynirCorrect
 from .classifier import SentenceClassifier
 
 log = logging.getLogger(__name__)
@@ -176,7 +224,10 @@ class CorrectedSentence:
         """Create a CorrectedSentence from a parser sentence"""
         tokens = sentence.correct_tokens
         parsed = False
-        if sentence.tree is not None and sentence.terminals is not None:
+        if sentence.released:
+            # Lean results: the terminal text is already in the tokens
+            parsed = bool(sentence.combinations)
+        elif sentence.tree is not None and sentence.terminals is not None:
             # Successfully parsed: use the text from the terminals (where available)
             # since we have more info there, for instance on em/en dashes.
             # Create a map of token indices to corresponding terminal text
@@ -212,6 +263,12 @@ class ParseResultStats:
     num_tokens: int
     ambiguity: float
     parse_time: float
+    reduce_time: float = 0.0
+    max_sentence_time: float = 0.0
+    num_timed_out: int = 0
+    num_foreign: int = 0
+    num_long: int = 0
+    num_prefiltered: int = 0
 
 
 @dataclass
@@ -220,6 +277,8 @@ class CorrectionResult:
     parse_result_stats: Optional[ParseResultStats] = None
     flesch_result: Optional[Tuple[float, FleschKincaidFeedback]] = None
     rare_words: Optional[List[Tuple[str, float]]] = None
+    # Words whose spelling correction was degraded because of a time budget
+    degraded_words: Optional[List[DegradedWord]] = None
 
     def filter_annotations(self, ignore_rules: frozenset[str]) -> None:
         """Remove ignored annotations"""
@@ -227,9 +286,47 @@ class CorrectionResult:
             sent.filter_annotations(ignore_rules)
 
 
+@dataclass
+class BatchStats:
+    """Throughput statistics of GreynirCorrectAPI.correct_many()"""
+
+    num_documents: int = 0
+    num_sentences: int = 0
+    num_parsed: int = 0
+    num_tokens: int = 0
+    # Wall clock time of the batch, in seconds
+    elapsed: float = 0.0
+    # Total parse time of the sentences, in seconds, summed over the workers
+    parse_time: float = 0.0
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.num_documents / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def sentences_per_second(self) -> float:
+        return self.num_sentences / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.num_tokens / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class BatchResult:
+    """The results of GreynirCorrectAPI.correct_many(), in the order of the documents"""
+
+    results: List[CorrectionResult]
+    stats: BatchStats
+
+
 class GreynirCorrectAPI:
     """A high level api for correcting Icelandic texts"""
 
+    # Default maximum number of sentences that correct_stream_async()
+    # checks ahead of its consumer
+    MAX_IN_FLIGHT = 8
+
     def __init__(
         self,
         gc: GreynirCorrect,
@@ -237,6 +334,8 @@ class GreynirCorrectAPI:
         do_flesch: bool = False,
         rare_word_analyzer: Optional[RareWordsFinder] = None,
         do_grammar_check: bool = True,
+        processes: int = 1,
+        max_in_flight: int = MAX_IN_FLIGHT,
     ):
         self.gc = gc
         self.do_grammar_check = do_grammar_check
@@ -244,6 +343,13 @@ class GreynirCorrectAPI:
         self.do_flesch = do_flesch
         # If it's defined, it will be used
         self.rare_word_analyzer = rare_word_analyzer
+        # Number of worker processes for parsing, where 1 means parsing in the calling thread
+        self.processes = processes
+        self.max_in_flight = max_in_flight
+        # The thread in which the async API checks texts, and the lock that admits
+        # one async request at a time, as the pipeline keeps state while checking
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._async_lock: Optional[asyncio.Lock] = None
 
     @staticmethod
     def from_options(**options: Any) -> GreynirCorrectAPI:
@@ -251,6 +357,8 @@ class GreynirCorrectAPI:
         settings = load_config(options.pop("tov_config", None))
         do_flesch_analysis = bool(options.pop("flesch", False))
         do_rare_word_analysis = bool(options.pop("rare_words", False))
+        processes = int(options.pop("processes", 1))
+        max_in_flight = int(options.pop("max_in_flight", GreynirCorrectAPI.MAX_IN_FLIGHT))
         pipeline = CorrectionPipeline(
             "",
             settings,
@@ -274,6 +382,8 @@ class GreynirCorrectAPI:
             do_flesch=do_flesch_analysis,
             rare_word_analyzer=rare_word_analyzer,
             do_grammar_check=do_grammar_check,
+            processes=processes,
+            max_in_flight=max_in_flight,
         )
 
     def _correct_spelling(
@@ -295,18 +405,22 @@ class GreynirCorrectAPI:
         return self.sentence_prefilter.classify(original_sentence)
 
     def _correct_grammar(self, corrected_tokens: Iterable[CorrectToken]) -> CheckResult:
-        results = self.gc.parse_all_tokens(corrected_tokens)
+        results = self.gc.parse_all_tokens(corrected_tokens, processes=self.processes)
         return results
 
-    def correct(
-        self, text: Iterable[str], ignore_rules: Optional[frozenset[str]] = None, suppress_suggestions: bool = False
-    ) -> CorrectionResult:
-        """Correct the input text by first correcting spelling and then grammatical errors."""
+    def _prepare(
+        self, text: Iterable[str], ignore_rules: Optional[frozenset[str]], suppress_suggestions: bool
+    ) -> Tuple[CorrectionResult, Optional[List[CorrectToken]]]:
+        """Correct the spelling of the input text and analyze it. Return the result,
+        along with the corrected tokens if they remain to be grammar checked
+        (see _add_grammar()), or None if the result is complete."""
         corrected_tokens = self._correct_spelling(
             text, ignore_rules=ignore_rules, suppress_suggestions=suppress_suggestions
         )
         # Convert the tokens to a list, so it can be reused - this must be done at some point anyway
         corrected_tokens = list(corrected_tokens)
+        spelling_budget = self.gc.pipeline.spelling_budget
+        degraded_words = spelling_budget.degraded if spelling_budget is not None else None
         flesch_result = None
         if self.do_flesch:
             flesch_score = FleschKincaidScorer.get_score_from_stream(corrected_tokens)
@@ -318,44 +432,207 @@ class GreynirCorrectAPI:
             rare_words = self.rare_word_analyzer.get_rare_words_from_stream(
                 [tok for tok in corrected_tokens if tok.kind == TOK.WORD], max_words=10, low_prob_cutoff=0.00000005
             )
+        result = CorrectionResult(
+            sentences=[CorrectedSentence(tokens=corrected_tokens, parsed=False)],
+            flesch_result=flesch_result,
+            rare_words=rare_words,
+            degraded_words=degraded_words,
+        )
         if not self.do_grammar_check:
             # Only run the spelling correction
-            return CorrectionResult(
-                sentences=[CorrectedSentence(tokens=corrected_tokens, parsed=False)],
-                flesch_result=flesch_result,
-                rare_words=rare_words,
-            )
+            return result, None
         # Only run the sentence classifier if we should
         if self.sentence_prefilter is not None:
             # Check if the sentence contains an error
             # TODO: We will want to chunk the input into sentences and run the classifier on each sentence
             if not self._sentence_contains_error(corrected_tokens):
                 # The sentence is probably correct, so we skip the rest of the processing
-                return CorrectionResult(
-                    sentences=[CorrectedSentence(tokens=corrected_tokens, parsed=False)],
-                    flesch_result=flesch_result,
-                    rare_words=rare_words,
-                )
+                return result, None
             # The sentence is probably incorrect, so we continue with the full grammar check
-        # Run the full grammar check
-        check_result = self._correct_grammar(corrected_tokens)
-        corrected_sentences = [CorrectedSentence.from_parser_sentence(sentence=s) for s in check_result["sentences"]]
-        result = CorrectionResult(
-            sentences=corrected_sentences,
-            flesch_result=flesch_result,
-            rare_words=rare_words,
-            parse_result_stats=ParseResultStats(
-                num_sentences=check_result["num_sentences"],
-                num_parsed=check_result["num_parsed"],
-                num_tokens=check_result["num_tokens"],
-                ambiguity=check_result["ambiguity"],
-                parse_time=check_result["parse_time"],
-            ),
+        return result, corrected_tokens
+
+    @staticmethod
+    def _add_grammar(
+        result: CorrectionResult, check_result: CheckResult, ignore_rules: Optional[frozenset[str]]
+    ) -> None:
+        """Add the outcome of the grammar check of a text to its result"""
+        result.sentences = [CorrectedSentence.from_parser_sentence(sentence=s) for s in check_result["sentences"]]
+        result.parse_result_stats = ParseResultStats(
+            num_sentences=check_result["num_sentences"],
+            num_parsed=check_result["num_parsed"],
+            num_tokens=check_result["num_tokens"],
+            ambiguity=check_result["ambiguity"],
+            parse_time=check_result["parse_time"],
+            reduce_time=check_result["reduce_time"],
+            max_sentence_time=check_result["max_sentence_time"],
+            num_timed_out=check_result["num_timed_out"],
+            num_foreign=check_result["num_foreign"],
+            num_long=check_result["num_long"],
+            num_prefiltered=check_result["num_prefiltered"],
         )
         # Filter annotations based on ignore rules
         result.filter_annotations(ignore_rules=ignore_rules or frozenset())
+
+    def correct(
+        self, text: Iterable[str], ignore_rules: Optional[frozenset[str]] = None, suppress_suggestions: bool = False
+    ) -> CorrectionResult:
+        """Correct the input text by first correcting spelling and then grammatical errors."""
+        result, corrected_tokens = self._prepare(text, ignore_rules, suppress_suggestions)
+        if corrected_tokens is not None:
+            # Run the full grammar check
+            self._add_grammar(result, self._correct_grammar(corrected_tokens), ignore_rules)
         return result
 
+    def correct_many(
+        self,
+        documents: Iterable[Union[str, Iterable[str]]],
+        *,
+        ignore_rules: Optional[frozenset[str]] = None,
+        suppress_suggestions: bool = False,
+        workers: int = 1,
+    ) -> BatchResult:
+        """Correct a number of independent documents, such as user comments,
+        returning their results in order, along with throughput statistics.
+        The spelling of each document is corrected in this process. If workers
+        is larger than 1, the sentences of consecutive documents share chunks
+        of work in a single pool of that many worker processes, where they are
+        parsed and annotated; 0 means one worker per CPU core."""
+        t0 = time.perf_counter()
+        results: List[CorrectionResult] = []
+        # The documents whose results await the grammar check, by job
+        pending: Dict[int, CorrectionResult] = {}
+
+        def jobs() -> Iterator[CheckJob]:
+            """Prepare the documents as their sentences are needed, so that each
+            document's parse budget starts when it is about to be parsed"""
+            for text in documents:
+                result, corrected_tokens = self._prepare(
+                    [text] if isinstance(text, str) else text, ignore_rules, suppress_suggestions
+                )
+                results.append(result)
+                if corrected_tokens is not None:
+                    job = self.gc.create_job(corrected_tokens, parse=workers == 1)
+                    pending[id(job)] = result
+                    yield job
+
+        for job, sentences in self.gc.iter_jobs_sentences(jobs(), processes=workers):
+            self._add_grammar(pending.pop(id(job)), job.result(sentences), ignore_rules)
+        stats = BatchStats(num_documents=len(results), elapsed=time.perf_counter() - t0)
+        for result in results:
+            if result.parse_result_stats is None:
+                stats.num_sentences += len(result.sentences)
+                stats.num_tokens += sum(len(s.tokens) for s in result.sentences)
+            else:
+                stats.num_sentences += result.parse_result_stats.num_sentences
+                stats.num_parsed += result.parse_result_stats.num_parsed
+                stats.num_tokens += result.parse_result_stats.num_tokens
+                stats.parse_time += result.parse_result_stats.parse_time
+        return BatchResult(results=results, stats=stats)
+
+    def correct_sentences(
+        self, text: Iterable[str], ignore_rules: Optional[frozenset[str]] = None, suppress_suggestions: bool = False
+    ) -> Generator[CorrectedSentence, None, None]:
+        """Correct the input text like correct(), but generate the corrected sentences
+        one by one, as they are parsed and annotated. The readability analysis and
+        the statistics of correct() are not available."""
+        ignore_rules = ignore_rules or frozenset()
+        corrected_tokens: Iterable[CorrectToken] = self._correct_spelling(
+            text, ignore_rules=ignore_rules, suppress_suggestions=suppress_suggestions
+        )
+        if not self.do_grammar_check or self.sentence_prefilter is not None:
+            corrected_tokens = list(corrected_tokens)
+            if not self.do_grammar_check or not self._sentence_contains_error(corrected_tokens):
+                # Only the spelling is corrected
+                yield CorrectedSentence(tokens=corrected_tokens, parsed=False)
+                return
+        job = self.gc.create_job(corrected_tokens, parse=self.processes == 1)
+        for sentence in self.gc.iter_job_sentences(job, processes=self.processes):
+            corrected = CorrectedSentence.from_parser_sentence(sentence=sentence)
+            corrected.filter_annotations(ignore_rules)
+            yield corrected
+
+    def _async_executor(self) -> ThreadPoolExecutor:
+        """Return the thread in which the async API checks texts"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="GreynirCorrectAPI")
+        return self._executor
+
+    def _admission(self) -> asyncio.Lock:
+        """Return the lock that admits one async request at a time"""
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    async def correct_async(
+        self, text: Iterable[str], ignore_rules: Optional[frozenset[str]] = None, suppress_suggestions: bool = False
+    ) -> CorrectionResult:
+        """Correct the input text like correct(), without blocking the event loop.
+        Requests are checked one at a time, in a thread that belongs to this
+        instance. If the caller is cancelled while its text is being checked,
+        the check runs to completion and its result is discarded; use
+        correct_stream_async() to stop checking between sentences."""
+        async with self._admission():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._async_executor(),
+                partial(self.correct, text, ignore_rules=ignore_rules, suppress_suggestions=suppress_suggestions),
+            )
+
+    async def correct_stream_async(
+        self, text: Iterable[str], ignore_rules: Optional[frozenset[str]] = None, suppress_suggestions: bool = False
+    ) -> AsyncIterator[CorrectedSentence]:
+        """Correct the input text like correct_sentences(), without blocking the
+        event loop, yielding each sentence as soon as it has been checked.
+        Up to max_in_flight sentences are checked ahead of the consumer.
+        If the consumer is cancelled, or closes the generator, checking
+        stops after the sentence in progress. To release the instance
+        promptly when stopping early, close the generator explicitly,
+        e.g. with contextlib.aclosing()."""
+        async with self._admission():
+            loop = asyncio.get_running_loop()
+            executor = self._async_executor()
+            sentences = self.correct_sentences(
+                text, ignore_rules=ignore_rules, suppress_suggestions=suppress_suggestions
+            )
+            pending: Deque[asyncio.Future[Optional[CorrectedSentence]]] = deque()
+            try:
+                while True:
+                    while len(pending) < self.max_in_flight:
+                        # Each step checks one sentence in the executor thread
+                        pending.append(loop.run_in_executor(executor, next, sentences, None))
+                    sentence = await pending.popleft()
+                    if sentence is None:
+                        return
+                    yield sentence
+            finally:
+                # Withdraw the steps that have not started, and close the generator
+                # in the executor thread once the step in progress, if any, is done
+                for step in pending:
+                    step.cancel()
+                executor.submit(sentences.close)
+
+    def close(self) -> None:
+        """Stop the thread of the async API, if it has been started"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# Options of check_errors() that affect only a single check and its output,
+# not the construction of the GreynirCorrectAPI instance
+CHECK_OPTIONS = frozenset(
+    (
+        "all_errors",
+        "format",
+        "spaced",
+        "normalize",
+        "annotations",
+        "print_all",
+        "ignore_rules",
+        "suppress_suggestions",
+    )
+)
+
 
 def check_errors(**options: Any) -> str:
     """Return a string in the chosen format and correction level
@@ -363,18 +640,30 @@ def check_errors(**options: Any) -> str:
     text: str | List[str] = options.pop("input", "")
     if not text:
         return ""
-    all_errors: bool = options.pop("all_errors", True)
-    format: str = options.pop("format", "json")
-    spaced: bool = options.pop("spaced", False)
-    normalize: bool = options.pop("normalize", False)
-    annotations: bool = options.pop("annotations", False)
-    print_all: bool = options.pop("print_all", False)
-    ignore_rules: frozenset[str] = options.pop("ignore_rules", frozenset())
-    suppress_suggestions: bool = options.pop("suppress_suggestions", False)
+    check_options = {name: options.pop(name) for name in CHECK_OPTIONS if name in options}
     api = GreynirCorrectAPI.from_options(**options)
+    return check_errors_with(api, text, **check_options)
+
+
+def check_errors_with(
+    api: GreynirCorrectAPI,
+    text: str | Iterable[str],
+    *,
+    all_errors: bool = True,
+    format: str = "json",
+    spaced: bool = False,
+    normalize: bool = False,
+    annotations: bool = False,
+    print_all: bool = False,
+    ignore_rules: Iterable[str] = frozenset(),
+    suppress_suggestions: bool = False,
+) -> str:
+    """Return a string in the chosen format and correction level, using
+    an existing GreynirCorrectAPI instance, such as a long-lived one in
+    a server process. The keyword arguments are the CHECK_OPTIONS."""
     if isinstance(text, str):
         text = [text]
-    results = api.correct(text, ignore_rules=ignore_rules, suppress_suggestions=suppress_suggestions)
+    results = api.correct(text, ignore_rules=frozenset(ignore_rules), suppress_suggestions=suppress_suggestions)
     text_results = ""
     if all_errors:
         text_results = format_output(results=results, format=format, print_annotations=annotations)
@@ -533,8 +822,9 @@ def format_text(results: CorrectionResult, print_annotations: bool = False) -> s
     return "\n".join(output)
 
 
-def format_json(results: CorrectionResult) -> str:
-    formatted_sentences: List[str] = []
+def annotation_results(results: CorrectionResult) -> List[AnnResultDict]:
+    """Return the annotation results of the sentences, as returned by the Yfirlestur.is API"""
+    ann_results: List[AnnResultDict] = []
 
     offset = 0
     for result in results.sentences:
@@ -572,11 +862,15 @@ def format_json(results: CorrectionResult) -> str:
             annotations=formatted_annotations,
         )
 
-        formatted_sentences.append(json.dumps(ard, ensure_ascii=False))
+        ann_results.append(ard)
         # The offset for the next sentence needs to be increased by the length of this (original) sentence
         offset += char_indexes[-1]
 
-    return "\n".join(formatted_sentences)
+    return ann_results
+
+
+def format_json(results: CorrectionResult) -> str:
+    return "\n".join(json.dumps(ard, ensure_ascii=False) for ard in annotation_results(results))
 
 
 def format_csv(results: CorrectionResult) -> str:
@@ -57,6 +57,14 @@
 
 """
 
+from typing import List, Tuple
+
+import asyncio
+import multiprocessing
+import pickle
+import sqlite3
+import time
+from functools import partial
 
 import pytest
 
@@ -128,6 +136,28 @@ def test_error_finder(api):
     check_sentence(api, s, [(4, 4, "T001/w"), (5, 5, "P_NT_Heldur/w")])
 
 
+def test_error_rules(api) -> None:
+    """The error rules of the grammar are built once, when it is loaded"""
+    parser = api.gc.parser
+    rules = parser.error_rules
+    grammar = parser.grammar
+    assert rules
+    for ix, rule in rules.items():
+        nt = grammar.nonterminals_by_ix[ix]
+        assert nt.has_tag("error") and not nt.is_optional
+        assert rule.name == nt.name
+        assert rule.code.startswith("P_NT_")
+    by_name = {rule.name: rule for rule in rules.values()}
+    heldur = by_name["AðvörunHeldur"]
+    assert (heldur.code, heldur.is_warning) == ("P_NT_Heldur", True)
+    assert heldur.handler is not None
+    assert by_name["VillaVístAð"].code == "P_NT_VístAð"
+    assert not by_name["VillaVístAð"].is_warning
+    einn_af = by_name["VillaEinnAf_nf_kk"]
+    assert (einn_af.code, einn_af.variants) == ("P_NT_EinnAf", "nf_kk")
+    assert len(rules) == sum(1 for nt in grammar.nonterminals.values() if nt.has_tag("error") and not nt.is_optional)
+
+
 def test_ordinals(api):
     # NOTE: Commented out as this functionality increases the number of
     # false positives on the iceErrorCorpus test set.
@@ -210,6 +240,16 @@ def test_foreign_sentences(api):
     )  # Note: Example needed to be made longer due to 'in' appearing as an Icelandic error
 
 
+def test_foreign_sentences_not_parsed(api):
+    result = api.correct("It was the best of times, it was the worst of times. Manninum vantaði hamar.")
+    stats = result.parse_result_stats
+    assert stats.num_sentences == 2
+    assert stats.num_foreign == 1
+    assert stats.num_parsed == 1
+    assert [a.code for a in result.sentences[0].annotations] == ["E004"]
+    assert not result.sentences[0].parsed
+
+
 def test_number(api):
     check_sentence(api, "Vinnuvika sjómanna eru 7 heilir dagar.", [(2, 2, "P_NT_ÍTölu")])
     check_sentence(api, "Hjón borðar matinn sinn.", [(1, 1, "P_NT_ÍTölu")])
@@ -266,6 +306,355 @@ def test_lhþt_variant(api) -> None:
         assert False, "Regression in handling of LHÞT variants in BinPackage"
 
 
+def test_parse_all_tokens_parallel(api) -> None:
+    text = (
+        "Manninum á verkstæðinu vantaði hamar. Ég borðum matinn minn. "
+        "Pál langaði að horfa á sjónvarpið. It was the best of times, it was the worst of times. "
+        "Hjón borðar matinn sinn. Mig dreymdi mús sem elti kött."
+    )
+    tokens = list(api._correct_spelling(text))
+    serial = api.gc.parse_all_tokens(tokens)
+    parallel = api.gc.parse_all_tokens(tokens, processes=2)
+    for key in ("num_sentences", "num_parsed", "num_tokens"):
+        assert parallel[key] == serial[key]
+    assert parallel["ambiguity"] == pytest.approx(serial["ambiguity"])
+    assert len(parallel["sentences"]) == len(serial["sentences"]) == 6
+    for s, p in zip(serial["sentences"], parallel["sentences"]):
+        assert p.tokens == s.tokens
+        assert p.combinations == s.combinations
+        assert (p.tree is None) == (s.tree is None)
+        assert p.err_index == s.err_index
+        assert [(a.start, a.end, a.code) for a in p.annotations] == [(a.start, a.end, a.code) for a in s.annotations]
+    assert parallel["sentences"][0].terminals is not None
+    assert parallel["sentences"][3].error is not None
+
+
+def test_parse_all_tokens_spawn(monkeypatch) -> None:
+    # Without fork, the workers create their own instances, which must
+    # have the same options as the one in the parent process
+    text = (
+        "Manninum á verkstæðinu vantaði hamar. "
+        "It was the best of times, it was the worst of times. "
+        "Ég fór í búðina í gær og keypti mjólk en hún var súr og ég skilaði henni. "
+        "Kötturinn borðaði fiskinn sinn."
+    )
+    api = reynir_correct.GreynirCorrectAPI.from_options(
+        parse_foreign_sentences=True, long_sentence_words=12, parse_prefilter=True
+    )
+    tokens = list(api._correct_spelling(text))
+    serial = api.gc.parse_all_tokens(tokens)
+    assert serial["num_long"] == 1 and serial["num_prefiltered"] == 1 and serial["num_foreign"] == 0
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    monkeypatch.setattr(multiprocessing, "get_context", partial(multiprocessing.get_context, "spawn"))
+    spawned = api.gc.parse_all_tokens(tokens, processes=2)
+    monkeypatch.undo()
+    for key in ("num_sentences", "num_parsed", "num_foreign", "num_long", "num_prefiltered"):
+        assert spawned[key] == serial[key], key
+    for s, p in zip(serial["sentences"], spawned["sentences"]):
+        assert (p.tree is None) == (s.tree is None)
+        assert [(a.start, a.end, a.code) for a in p.annotations] == [(a.start, a.end, a.code) for a in s.annotations]
+
+
+def test_parse_budget() -> None:
+    text = "Manninum á verkstæðinu vantaði hamar. Hjón borðar matinn sinn."
+    # A zero sentence budget abandons every parse
+    api = reynir_correct.GreynirCorrectAPI.from_options(parse_sentence_budget=0.0)
+    result = api.correct(text)
+    stats = result.parse_result_stats
+    assert stats.num_timed_out == 2
+    assert stats.num_parsed == 0
+    for sent in result.sentences:
+        assert not sent.parsed
+        codes = [a.code for a in sent.annotations]
+        assert "E008" in codes
+        assert "E001" not in codes
+    # A zero document budget skips every sentence, also in worker processes
+    api = reynir_correct.GreynirCorrectAPI.from_options(parse_document_budget=0.0)
+    tokens = list(api._correct_spelling(text))
+    for processes in (1, 2):
+        check_result = api.gc.parse_all_tokens(tokens, processes=processes)
+        assert check_result["num_timed_out"] == 2
+        assert all(a.code == "E008" for s in check_result["sentences"] for a in s.annotations)
+    # A generous budget changes nothing
+    api = reynir_correct.GreynirCorrectAPI.from_options(parse_sentence_budget=60.0, parse_document_budget=600.0)
+    stats = api.correct(text).parse_result_stats
+    assert stats.num_timed_out == 0
+    assert stats.num_parsed == 2
+    assert 0.0 < stats.max_sentence_time <= stats.parse_time
+
+
+def test_long_sentence_policy() -> None:
+    text = (
+        "Ég fór í búðina í gær og keypti mjólk; manninum vantaði hamar og hann fór í bæinn: "
+        "hundurinn hans Páls fóru í bað og kötturinn svaf allan daginn í sólinni."
+    )
+    # Skip parsing the sentence: only token-level annotations and E005
+    api = reynir_correct.GreynirCorrectAPI.from_options(long_sentence_words=10)
+    result = api.correct(text)
+    assert result.parse_result_stats.num_long == 1
+    assert result.parse_result_stats.num_parsed == 0
+    codes = [a.code for a in result.sentences[0].annotations]
+    assert "E005" in codes
+    assert "E001" not in codes
+    assert "P_WRONG_CASE_þgf_þf" not in codes
+    # Split the sentence at the semicolon and the colon, and parse the pieces
+    api = reynir_correct.GreynirCorrectAPI.from_options(long_sentence_words=10, long_sentence_policy="split")
+    result = api.correct(text)
+    assert result.parse_result_stats.num_long == 1
+    anns = [(a.start, a.end, a.code) for a in result.sentences[0].annotations]
+    assert (0, 31, "E005") in anns
+    assert (9, 9, "P_WRONG_CASE_þgf_þf") in anns
+    with pytest.raises(ValueError):
+        reynir_correct.GreynirCorrectAPI.from_options(long_sentence_policy="truncate")
+
+
+def test_parse_prefilter() -> None:
+    text = "Kötturinn borðaði fiskinn sinn. Hún dáðist af hugrekki hans. Einn af drengjunum fóru heim."
+    api = reynir_correct.GreynirCorrectAPI.from_options(parse_prefilter=True)
+    result = api.correct(text)
+    stats = result.parse_result_stats
+    assert stats.num_sentences == 3
+    # Only the first sentence is judged clean and skipped
+    assert stats.num_prefiltered == 1
+    assert stats.num_parsed == 2
+    clean, pattern, grammar = result.sentences
+    assert not clean.annotations
+    assert "P_WRONG_PREP_AF" in [a.code for a in pattern.annotations]
+    assert grammar.annotations
+    prefilter = api.gc.prefilter
+    assert prefilter is not None
+    assert prefilter.signals(clean.tokens) == frozenset()
+    assert "pattern_trigger" in prefilter.signals(pattern.tokens)
+    assert "grammar_trigger" in prefilter.signals(grammar.tokens)
+    # A sentence with a token-level error needs parsing
+    tokens = list(api.gc.tokenize("Kötturin borðaði fiskinn sinn."))
+    assert "token_error" in prefilter.signals(tokens)
+    # A prefilter can be pickled, as for worker processes, without its n-gram model
+    copy = pickle.loads(pickle.dumps(prefilter))
+    assert copy._ngrams is not None
+    assert copy.signals(pattern.tokens) == prefilter.signals(pattern.tokens)
+
+
+def test_check_session() -> None:
+    api = reynir_correct.GreynirCorrectAPI.from_options()
+    session = api.gc.session()
+    text = "Hún dáðist af hugrekki hans. Kötturinn borðaði fiskinn sinn.\nÉg hlakka til jólanna. Honum langar heim."
+    update = session.update(text)
+    assert (update.num_checked, update.num_reused) == (4, 0)
+    assert [s.paragraph for s in update.sentences] == [0, 0, 1, 1]
+
+    def spans(text: str, update: reynir_correct.SessionUpdate) -> List[Tuple[str, str]]:
+        return [
+            (a.code, text[start : end + 1].strip())
+            for s in update.sentences
+            for a, (start, end) in zip(s.sentence.annotations, s.annotation_spans())
+        ]
+
+    assert spans(text, update) == [("P_WRONG_PREP_AF", "af"), ("P_WRONG_CASE_þgf_þf", "Honum")]
+    # Insert a sentence and change another one: the rest are reused,
+    # and the offsets of their annotations are shifted
+    text = "Þetta er nýtt. " + text.replace("fiskinn sinn", "fiskin sinn")
+    update = session.update(text)
+    assert (update.num_checked, update.num_reused) == (2, 3)
+    assert spans(text, update) == [
+        ("P_WRONG_PREP_AF", "af"),
+        ("W001/w", "fiskin"),
+        ("P_WRONG_CASE_þgf_þf", "Honum"),
+    ]
+    # An unchanged document is not checked again
+    update = session.update(text)
+    assert (update.num_checked, update.num_reused) == (0, 5)
+
+
+def test_sentence_cache(tmp_path) -> None:
+    text = "Hún dáðist af hugrekki hans. Kötturinn borðaði fiskinn sinn. Hún dáðist af hugrekki hans."
+    path = str(tmp_path / "sentences.db")
+    api = reynir_correct.GreynirCorrectAPI.from_options(sentence_cache_size=100, sentence_cache_path=path)
+    cache = api.gc.sentence_cache
+    assert cache is not None
+    result = api.correct(text)
+
+    def annotations(result: reynir_correct.CorrectionResult) -> List[List[Tuple[int, int, str, str]]]:
+        return [[(a.start, a.end, a.code, a.text) for a in s.annotations] for s in result.sentences]
+
+    # The repeated sentence is taken from the memory tier
+    assert (cache.stats.misses, cache.stats.memory_hits, cache.stats.stores) == (2, 1, 2)
+    assert result.parse_result_stats.num_parsed == 3
+    first, _, repeated = annotations(result)
+    assert first == repeated
+    assert "P_WRONG_PREP_AF" in [code for _, _, code, _ in first]
+    # Another checker, such as one in a worker process, finds the results on disk
+    other = reynir_correct.GreynirCorrectAPI.from_options(sentence_cache_size=100, sentence_cache_path=path)
+    other_result = other.correct(text)
+    other_cache = other.gc.sentence_cache
+    assert other_cache is not None
+    assert (other_cache.stats.disk_hits, other_cache.stats.memory_hits, other_cache.stats.misses) == (2, 1, 0)
+    assert annotations(other_result) == annotations(result)
+    # A change of settings version invalidates the cached results
+    other.gc.settings._version = "changed"
+    other.correct(text)
+    assert other_cache.stats.misses == 2
+    assert len(other_cache) == 2
+
+
+def test_sentence_cache_processes(tmp_path) -> None:
+    # With a process pool, the cache is looked up in the parent process,
+    # and only the sentences that are not found are sent to the workers
+    text = "Hún dáðist af hugrekki hans. Kötturinn borðaði fiskinn sinn. Hún dáðist af hugrekki hans."
+    path = str(tmp_path / "sentences.db")
+    api = reynir_correct.GreynirCorrectAPI.from_options(sentence_cache_size=100, sentence_cache_path=path)
+    cache = api.gc.sentence_cache
+    assert cache is not None
+    serial = api.gc.parse_all_tokens(list(api.gc.tokenize(text)))
+    assert (cache.stats.misses, cache.stats.memory_hits) == (2, 1)
+    parallel = api.gc.parse_all_tokens(list(api.gc.tokenize(text)), processes=2)
+    assert (cache.stats.misses, cache.stats.memory_hits, cache.stats.stores) == (2, 4, 2)
+    assert [s.annotations for s in parallel["sentences"]] == [s.annotations for s in serial["sentences"]]
+    assert parallel["num_parsed"] == 3
+    # Results from the workers are stored in the parent process
+    other = reynir_correct.GreynirCorrectAPI.from_options(sentence_cache_size=100)
+    other_cache = other.gc.sentence_cache
+    assert other_cache is not None
+    other.gc.parse_all_tokens(list(other.gc.tokenize(text)), processes=2)
+    # The repeated sentence is in the same chunk, which is looked up at once
+    assert (other_cache.stats.misses, other_cache.stats.stores) == (3, 3)
+    other.gc.parse_all_tokens(list(other.gc.tokenize(text)), processes=2)
+    assert (other_cache.stats.misses, other_cache.stats.memory_hits) == (3, 3)
+    # Entries of other versions are removed from the disk tier,
+    # including any without a version
+    db = sqlite3.connect(path)
+    db.execute("INSERT INTO sentences (key, version, result) VALUES ('x', NULL, '')")
+    db.commit()
+    api.gc.settings._version = "changed"
+    api.gc.parse_all_tokens(list(api.gc.tokenize(text)), processes=2)
+    versions = {v for v, in db.execute("SELECT version FROM sentences")}
+    assert versions == {api.gc.cache_version()}
+    db.close()
+
+
+def test_lean_results() -> None:
+    text = "Hún dáðist af hugrekki hans – og þó. Kötturinn borðaði fiskinn sinn. Xyzzy plugh qwerty."
+
+    def summary(result: reynir_correct.CorrectionResult) -> List[Tuple[bool, str, List[Tuple[int, int, str]]]]:
+        return [
+            (s.parsed, " ".join(t.txt for t in s.tokens), [(a.start, a.end, a.code) for a in s.annotations or []])
+            for s in result.sentences
+        ]
+
+    full = reynir_correct.GreynirCorrectAPI.from_options()
+    lean = reynir_correct.GreynirCorrectAPI.from_options(lean_results=True)
+    assert summary(lean.correct(text)) == summary(full.correct(text))
+    # The sentences keep only their tokens, annotations and statistics,
+    # also when they are parsed in worker processes
+    tokens = list(lean._correct_spelling(text))
+    for processes in (1, 2):
+        check_result = lean.gc.parse_all_tokens(tokens, processes=processes)
+        assert check_result["num_parsed"] == 2
+        for sent in check_result["sentences"]:
+            assert sent.released
+            assert sent.deep_tree is None and sent.tree is None and sent.terminals is None
+
+
+def test_warmup() -> None:
+    report = reynir_correct.warmup(grammar=False, spelling=False, patterns=False)
+    assert set(report.load_times) == {"settings", "bin"}
+    assert report.vocabulary is None
+    report = reynir_correct.warmup()
+    assert set(report.load_times) == {"settings", "bin", "grammar", "spelling", "patterns", "places"}
+    assert report.total_time == sum(report.load_times.values())
+    assert report.vocabulary is not None
+    assert reynir_correct.is_ready()
+
+
+def test_async_api() -> None:
+    text = "Hún dáðist af hugrekki hans. Kötturinn borðaði fiskinn sinn. Barnið vil grænann lit."
+
+    def summary(sentences: List[reynir_correct.CorrectedSentence]) -> List[Tuple[bool, str, List[str]]]:
+        return [(s.parsed, s.corrected_str(), [a.code for a in s.annotations or []]) for s in sentences]
+
+    api = reynir_correct.GreynirCorrectAPI.from_options(max_in_flight=2)
+    expected = summary(api.correct(text).sentences)
+    assert summary(list(api.correct_sentences(text))) == expected
+
+    async def stream(text: str, api: reynir_correct.GreynirCorrectAPI = api) -> List[reynir_correct.CorrectedSentence]:
+        return [s async for s in api.correct_stream_async(text)]
+
+    async def first_sentence() -> reynir_correct.CorrectedSentence:
+        sentences = api.correct_stream_async(" ".join([text] * 20))
+        try:
+            return await sentences.__anext__()
+        finally:
+            await sentences.aclose()
+
+    async def run() -> None:
+        ticks: List[float] = []
+
+        async def tick() -> None:
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        # The event loop keeps running while the text is checked
+        ticker = asyncio.ensure_future(tick())
+        result = await api.correct_async(text)
+        ticker.cancel()
+        assert len(ticks) > 1
+        assert summary(result.sentences) == expected
+        # Concurrent requests are checked one at a time
+        streamed = await asyncio.gather(stream(text), stream(text), api.correct_async(text))
+        assert summary(streamed[0]) == summary(streamed[1]) == expected
+        assert summary(streamed[2].sentences) == expected
+        # Stopping a stream early releases the instance
+        assert summary([await first_sentence()]) == expected[:1]
+        task = asyncio.ensure_future(stream(" ".join([text] * 20)))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert summary(await stream(text)) == expected
+
+    try:
+        asyncio.run(run())
+    finally:
+        api.close()
+    # Sentences are streamed from worker processes as well
+    pooled = reynir_correct.GreynirCorrectAPI.from_options(processes=2)
+    try:
+        assert summary(asyncio.run(stream(text, pooled))) == expected
+    finally:
+        pooled.close()
+
+
+def test_correct_many() -> None:
+    documents = [
+        "Hún dáðist af hugrekki hans.",
+        "",
+        "Kötturinn borðaði fiskinn sinn. Barnið vil grænann lit.",
+        ["Ég fór út í búð.\n", "Mig langar að fara heim."],
+        "Xyzzy plugh qwerty.",
+    ] * 3
+
+    def summary(result: reynir_correct.CorrectionResult) -> List[Tuple[bool, str, List[Tuple[int, int, str]]]]:
+        return [
+            (s.parsed, " ".join(t.txt for t in s.tokens), [(a.start, a.end, a.code) for a in s.annotations or []])
+            for s in result.sentences
+        ]
+
+    api = reynir_correct.GreynirCorrectAPI.from_options()
+    expected = [summary(api.correct(doc)) for doc in documents]
+    for workers in (1, 2):
+        batch = api.correct_many(documents, workers=workers)
+        assert [summary(result) for result in batch.results] == expected
+        assert batch.stats.num_documents == len(documents)
+        assert batch.stats.num_sentences == sum(len(s) for s in expected)
+        assert batch.stats.num_parsed == sum(r.parse_result_stats.num_parsed for r in batch.results)
+        assert batch.stats.sentences_per_second > 0
+    # Ignored rules are filtered out of each document
+    batch = api.correct_many(documents[2:3], ignore_rules=frozenset(("S004",)), workers=2)
+    codes = [a.code for s in batch.results[0].sentences for a in s.annotations or []]
+    assert codes and "S004" not in codes
+
+
 if __name__ == "__main__":
     from reynir_correct import GreynirCorrect
 
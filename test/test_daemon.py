@@ -0,0 +1,73 @@
+from typing import Iterator
+
+import os
+import tempfile
+import threading
+
+import pytest
+
+from reynir_correct.daemon import CorrectionDaemon, DaemonError, default_socket_path, request, split_input
+from reynir_correct.wrappers import check_errors
+
+from .test_imports import HEAVY_MODULES, run_imports
+
+
+@pytest.fixture
+def daemon_socket(tmp_path) -> Iterator[str]:
+    socket_path = str(tmp_path / "correct.sock")
+    daemon = CorrectionDaemon(socket_path, all_errors=False)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    daemon.shutdown()
+    daemon.server_close()
+    thread.join()
+
+
+def test_daemon(daemon_socket: str) -> None:
+    assert oct(os.stat(daemon_socket).st_mode & 0o777) == "0o600"
+    text = "Þinngið samþikkti tilöguna.\nBarnið vil grænann lit."
+    for options in (
+        {"input": text, "all_errors": False, "format": "text"},
+        {"input": text, "all_errors": False, "format": "json"},
+        {"input": text, "all_errors": True, "format": "json", "annotations": True},
+        {"input": text, "all_errors": False, "format": "text", "ignore_rules": ["S004"]},
+    ):
+        lines, daemon_options = split_input(options)
+        assert request(lines, daemon_options, daemon_socket) == check_errors(**options)
+    assert request([], {}, daemon_socket) == ""
+    with pytest.raises(DaemonError):
+        request(["Halló"], {"format": "text", "tov_config": ["/no/such/file.conf"]}, daemon_socket)
+
+
+def test_daemon_unreachable(tmp_path) -> None:
+    with pytest.raises(OSError):
+        request(["Halló"], {}, str(tmp_path / "missing.sock"))
+
+
+def test_default_socket_path(tmp_path, monkeypatch) -> None:
+    # Without a runtime directory, the socket is in a private directory
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    socket_path = default_socket_path()
+    private_dir = os.path.dirname(socket_path)
+    assert os.path.dirname(private_dir) == str(tmp_path)
+    assert oct(os.stat(private_dir).st_mode & 0o777) == "0o700"
+    assert default_socket_path() == socket_path
+    # A directory that others may access is refused
+    os.chmod(private_dir, 0o755)
+    with pytest.raises(OSError):
+        default_socket_path()
+
+
+def test_daemon_stale_socket(tmp_path) -> None:
+    socket_path = str(tmp_path / "stale.sock")
+    open(socket_path, "w").close()
+    daemon = CorrectionDaemon(socket_path)
+    daemon.server_close()
+    assert not os.path.exists(socket_path)
+
+
+def test_import_client() -> None:
+    modules, _ = run_imports("from reynir_correct.daemon import request")
+    assert not modules & HEAVY_MODULES
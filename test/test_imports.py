@@ -0,0 +1,78 @@
+from typing import Dict, Set, Tuple
+
+import subprocess
+import sys
+
+import reynir_correct
+
+# Modules that must not be imported unless the parser or the
+# n-gram model is actually needed
+HEAVY_MODULES = frozenset(("reynir", "icegrams", "islenska", "reynir_correct.checker", "reynir_correct.pattern"))
+
+# Generous upper bound, in microseconds, on the time it takes to import the package
+MAX_PACKAGE_IMPORT_US = 300_000
+
+
+def run_imports(code: str) -> Tuple[Set[str], Dict[str, int]]:
+    """Run the code in a fresh interpreter with -X importtime and return
+    the modules that are loaded afterwards, along with the cumulative
+    import time, in microseconds, of each module that is imported by an
+    import statement (modules imported through importlib.import_module(),
+    as the names of the package are, are not timed)"""
+    code += "\nimport sys\nprint('\\n'.join(sys.modules))\n"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (field.strip() for field in line.split("|"))
+        if cumulative.isdigit():
+            times[name] = int(cumulative)
+    return set(proc.stdout.split()), times
+
+
+def test_import_package() -> None:
+    modules, times = run_imports("import reynir_correct")
+    assert not modules & HEAVY_MODULES
+    assert times["reynir_correct"] < MAX_PACKAGE_IMPORT_US
+
+
+def test_import_command_line_help() -> None:
+    code = (
+        "import sys\n"
+        "sys.argv = ['correct', '--help']\n"
+        "from reynir_correct.main import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit as e:\n"
+        "    assert e.code == 0\n"
+    )
+    modules, _ = run_imports(code)
+    assert not modules & HEAVY_MODULES
+
+
+def test_import_readability() -> None:
+    modules, _ = run_imports(
+        "import tokenizer\n"
+        "from reynir_correct import FleschKincaidScorer\n"
+        "FleschKincaidScorer.get_score_from_stream(tokenizer.tokenize('Halló heimur.'))"
+    )
+    assert "reynir_correct.readability" in modules
+    assert not modules & HEAVY_MODULES
+
+
+def test_import_tokenizer() -> None:
+    # Token-level checking needs BÍN, but not the parser and the grammar checker
+    modules, _ = run_imports("from reynir_correct import tokenize; list(tokenize('Halló heimur.'))")
+    assert "reynir_correct.errtokenizer" in modules
+    assert "reynir_correct.checker" not in modules
+    assert "reynir_correct.pattern" not in modules
+
+
+def test_lazy_names() -> None:
+    for name in reynir_correct.__all__:
+        assert getattr(reynir_correct, name) is not None
+        assert name in dir(reynir_correct)
+    assert callable(reynir_correct.warmup)
+    assert reynir_correct.GreynirCorrect.__module__ == "reynir_correct.checker"
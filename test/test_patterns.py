@@ -357,3 +357,181 @@ def test_dir_loc(api):
     check_sentence(api, s, [])
     s = "Ég ólst upp í Breiðholtinu."
     check_sentence(api, s, [])
+
+
+TOV_MODULE = '''
+from reynir_correct.annotation import Annotation
+
+
+def add_extra_patterns(pm):
+    def annotate(match):
+        start, end = match.span
+        # The annotation function refers to pm when called
+        pm._ann.append(Annotation(start=start, end=end, code="T_KÖTTUR", text="Köttur", is_warning=True))
+
+    pm.add_pattern(("köttur", "NP > { 'köttur' }", annotate, None))
+'''
+
+
+def test_tone_of_voice_patterns(tmp_path):
+    from reynir_correct.pattern import PatternSet
+
+    module_path = tmp_path / "tov_patterns.py"
+    module_path.write_text(TOV_MODULE, encoding="utf-8")
+    config_path = tmp_path / "tov.conf"
+    config_path.write_text('[tone_of_voice_patterns]\nfile_path = "{0}"\n'.format(module_path), encoding="utf-8")
+    tov_api = reynir_correct.GreynirCorrectAPI.from_options(tov_config=str(config_path))
+    for _ in range(2):
+        result = tov_api.correct("Kötturinn hljóp yfir götuna. Hundurinn elti köttinn.")
+        codes = [[(a.start, a.end, a.code) for a in s.annotations] for s in result.sentences]
+        assert codes == [[(0, 0, "T_KÖTTUR/w")], [(2, 2, "T_KÖTTUR/w")]]
+    # The module is loaded and its patterns collected once per settings object
+    ps = PatternSet.for_settings(tov_api.gc.settings)
+    assert ps is not None
+    assert PatternSet.for_settings(tov_api.gc.settings) is ps
+    assert len(ps.patterns) == 1
+    # Editing the module changes the version of the sentence cache
+    version = tov_api.gc.cache_version()
+    assert version.endswith(ps.digest)
+    module_path.write_text(TOV_MODULE + "# Edited\n", encoding="utf-8")
+    edited_api = reynir_correct.GreynirCorrectAPI.from_options(tov_config=str(config_path))
+    assert edited_api.gc.settings.version == tov_api.gc.settings.version
+    assert edited_api.gc.cache_version() != version
+
+
+def test_trigger_index():
+    from reynir_correct.pattern import TriggerIndex
+
+    index = TriggerIndex(["leita", "", frozenset(("á", "í")), {"leita", "dást"}, None])
+    assert index.candidates([]) == [1, 4]
+    assert index.candidates(["leita"]) == [0, 1, 3, 4]
+    assert index.candidates(["í", "dást", "hestur"]) == [1, 2, 3, 4]
+
+
+def test_trigger_index_patterns(api):
+    from reynir_correct.pattern import PatternMatcher
+
+    # Make sure that the class-wide pattern table has been created
+    api.correct("Ég leitaði af kettinum.")
+    # The index selects exactly the patterns whose triggers match
+    patterns = PatternMatcher.PATTERNS
+    lemmas = {"leita", "köttur", "af", "ég"}
+    expected = [
+        ix
+        for ix, (trigger, _, _, _) in enumerate(patterns)
+        if not trigger or (trigger in lemmas if isinstance(trigger, str) else lemmas & trigger)
+    ]
+    assert PatternMatcher._index.candidates(lemmas) == expected
+
+
+def test_match_program(api, monkeypatch):
+    import reynir_correct.pattern
+    from reynir_correct.pattern import MatchProgram, PatternMatcher
+
+    patterns = [
+        ("VP > { 'leita' }", None),
+        ("VP > { PP > { P > { 'af' } } }", None),
+        ("VP", None),
+        ("(PP | VP) >> { 'köttur' }", None),
+        ("%noun", {"noun": "no_et"}),
+        ("VP NP", None),
+    ]
+    program = MatchProgram(patterns)
+    # The first three patterns share the VP root item, while the macro
+    # and the multi-item patterns are each in a group of their own
+    assert len(set(program._group_of)) == 4
+    sent = api.gc.parse_single("Ég leitaði lengi af kettinum en fann hann ekki.")
+    assert sent.tree is not None
+    found = program.matches(sent.tree, range(len(patterns)))
+    assert list(found) == list(range(len(patterns)))
+    for ix, (pattern, context) in enumerate(patterns):
+        expected = list(sent.tree.all_matches(pattern, context))
+        assert [m.text for m in found[ix]] == [m.text for m in expected]
+    assert found[0] and found[4]
+    assert program.matches(sent.tree, [1]).keys() == {1}
+    # Several programs are matched in a single traversal, with the same results
+    other = MatchProgram(patterns[3:])
+    both = MatchProgram.match_all(sent.tree, [(program, [0, 1]), (other, range(3))])
+    assert both[0] == program.matches(sent.tree, [0, 1])
+    assert both[1] == other.matches(sent.tree, range(3))
+    assert MatchProgram.match_all(sent.tree, [(program, [])]) == [{}]
+    # Without the reynir.matcher internals, each pattern is matched on its own
+    monkeypatch.setattr(reynir_correct.pattern, "COMPILED_MATCHING", False)
+    fallback = MatchProgram(patterns)
+    monkeypatch.undo()
+    assert not fallback.compiled and program.compiled
+    assert len(fallback) == len(program)
+    assert fallback.matches(sent.tree, range(len(patterns))) == found
+    both = MatchProgram.match_all(sent.tree, [(fallback, [0, 1]), (other, range(3))])
+    assert both[0] == program.matches(sent.tree, [0, 1])
+    assert both[1] == other.matches(sent.tree, range(3))
+    # The class-wide pattern table is compiled along with the trigger index
+    PatternMatcher([], sent)
+    assert len(PatternMatcher._program) == len(PatternMatcher.PATTERNS)
+
+
+def test_match_program_all_patterns(api):
+    # MatchProgram relies on the internals of reynir.matcher: it must give
+    # exactly the same matches as SimpleTree.all_matches() for every pattern
+    from reynir_correct.pattern import MatchProgram, PatternMatcher
+
+    api.correct("Ég leitaði af kettinum.")
+    patterns = [(p[1], p[3]) for p in PatternMatcher.PATTERNS]
+    assert patterns
+    program = MatchProgram(patterns)
+    # Sentences from the tests above, which between them match many of the patterns
+    sentences = [
+        "Páll brosti af töktunum í Gunnu.",
+        "Að öllu leyti er til fullt að mjólk.",
+        "Hún hafði ekki átt heiðurinn að þessu en fékk heiðurinn að þessu.",
+        "Illgresið er út um allt.",
+        "Börnin voru inn á vellinum allan daginn.",
+        "Vissulega er hægt að vera hluti að heildinni.",
+        "Þú ert valinn að guði að okkar mati.",
+        "Að endingu berast fréttir að slysinu.",
+        "Hann gaf mér uppskriftina af réttinum.",
+        "Honum varð af ósk sinni.",
+        "Þau eru alltaf uppí bústað.",
+        "Að endingu heyrði ég að starfinu.",
+        "Útí heimi er þetta öðruvísi.",
+        "Hætta hefur aldrei stafað að þessu.",
+        "Jón kann það ekki utan af.",
+        "Ég heillast að þannig fólki.",
+        "Ég hafði lagt mikið að mörkum.",
+        "Hann varð ekki uppvís af því.",
+        "Það var gert af þeirri fyrirmynd.",
+        "Jón leggur hann ekki af velli.",
+        "Honum hafði orðið af ósk sinni.",
+        "Hún hefur ekki gert þetta að miklum krafti.",
+        "Það markar ekki upphafið af því.",
+        "Börnin voru útá túni allan daginn.",
+        "Hún hefur ekki haft gagn að þessu.",
+        "Hann læsti sig inn í gær.",
+        "Þau voru sérstaklega valin að stjórninni.",
+        "Ég lét gott að mér leiða.",
+        "Börnin safnast saman inn í búð.",
+        "Að mínu mati lét ég ekki gott að mér leiða.",
+        "Ég keypti þetta út í búð.",
+        "Börnin voru inná vellinum allan daginn.",
+        "Jón gerir grín af því.",
+        "Það sem Jón spurði ekki af var óljóst.",
+        "Fréttir bárust seint að slysinu.",
+        "Það hefur ekki markað upphafið af því.",
+        "Jón leiðir ekki líkur af því.",
+        "Það kom henni á óvart að hún væri ólétt af strák.",
+        "Málið liggur í augum upp.",
+        "Börnin voru út á túni allan daginn.",
+        "Hún var niður í bæ í gær.",
+        "Tíminn markar upphaf af því.",
+        "Ég hef aldrei haft gaman að henni.",
+    ]
+    matched = 0
+    for text in sentences:
+        sent = api.gc.parse_single(text)
+        assert sent.tree is not None
+        found = program.matches(sent.tree, range(len(patterns)))
+        for ix, (pattern, context) in enumerate(patterns):
+            expected = [(m.tag, m.span, m.text) for m in sent.tree.all_matches(pattern, context)]
+            assert [(m.tag, m.span, m.text) for m in found.get(ix, [])] == expected, pattern
+            matched += len(expected)
+    assert matched
@@ -0,0 +1,100 @@
+from typing import Any, Dict, Iterator, Tuple
+
+import json
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pytest
+
+import reynir_correct.server
+from reynir_correct.server import CorrectionServer, CorrectionService, ServiceOverloaded
+from reynir_correct.wrappers import GreynirCorrectAPI, annotation_results
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[Tuple[str, CorrectionService]]:
+    service = CorrectionService(2)
+    httpd = CorrectionServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", service
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def post(url: str, data: bytes, content_type: str) -> Tuple[int, Dict[str, Any]]:
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_correct_api(server: Tuple[str, CorrectionService]) -> None:
+    url, service = server
+    text = "Þinngið samþikkti tilöguna.\n\nBarnið vil grænann lit. Hann fór á fjöll."
+    api = GreynirCorrectAPI.from_options()
+    expected = [annotation_results(api.correct([p])) for p in text.split("\n") if p]
+    status, reply = post(f"{url}/correct.api", json.dumps({"text": text}).encode("utf-8"), "application/json")
+    assert status == 200
+    assert reply["valid"]
+    assert reply["result"] == json.loads(json.dumps(expected))
+    assert reply["stats"]["num_paragraphs"] == 2
+    assert reply["stats"]["num_sentences"] == 3
+    # Form requests, with options
+    form = urllib.parse.urlencode({"text": "Barnið vil grænann lit.", "ignore_rules": "S004,Z001"})
+    status, reply = post(f"{url}/correct.api", form.encode("utf-8"), "application/x-www-form-urlencoded")
+    assert status == 200
+    assert all(ann["code"] != "S004" for ann in reply["result"][0][0]["annotations"])
+    # In JSON requests, list options are lists, or comma-separated strings as in forms
+    replies = []
+    for ignore_rules in (["S004", "Z001"], "S004,Z001"):
+        body = json.dumps({"text": "Barnið vil grænann lit.", "ignore_rules": ignore_rules}).encode("utf-8")
+        status, reply = post(f"{url}/correct.api", body, "application/json")
+        assert status == 200
+        replies.append(reply["result"])
+    assert replies[0] == replies[1]
+    assert all(ann["code"] != "S004" for ann in replies[0][0][0]["annotations"])
+    body = json.dumps({"text": "Barnið vil grænann lit.", "ignore_rules": {"S004": True}}).encode("utf-8")
+    status, reply = post(f"{url}/correct.api", body, "application/json")
+    assert status == 400 and "ignore_rules" in reply["reason"]
+    status, reply = post(f"{url}/correct.api", b"{}", "application/json")
+    assert status == 400 and not reply["valid"]
+    with urllib.request.urlopen(f"{url}/status") as resp:
+        status_reply = json.loads(resp.read())
+    assert status_reply["workers"] == 2 and status_reply["queued"] == 0
+
+
+def test_batching(server: Tuple[str, CorrectionService]) -> None:
+    _, service = server
+    texts = [f"Hann keypti {n} bækur." for n in range(20)]
+    futures = [f for text in texts for f in service.submit(text)]
+    results = [f.result() for f in futures]
+    assert [sents[0]["original"] for sents, _ in results] == texts
+
+
+def test_backpressure() -> None:
+    service = CorrectionService(1, max_queue_size=2, max_batch_size=1)
+    try:
+        with pytest.raises(ServiceOverloaded):
+            service.submit("\n".join("Hann fór á fjöll." for _ in range(100)))
+    finally:
+        service.shutdown()
+
+
+def test_timeout(server: Tuple[str, CorrectionService], monkeypatch) -> None:
+    url, service = server
+    monkeypatch.setattr(reynir_correct.server, "REQUEST_TIMEOUT", 0.0)
+    text = "\n".join(f"Hann keypti {n} bækur." for n in range(50))
+    status, reply = post(f"{url}/correct.api", json.dumps({"text": text}).encode("utf-8"), "application/json")
+    assert status == 504 and not reply["valid"]
+    # The paragraphs that were still queued are withdrawn
+    monkeypatch.undo()
+    data = json.dumps({"text": "Hann fór á fjöll."}).encode("utf-8")
+    status, reply = post(f"{url}/correct.api", data, "application/json")
+    assert status == 200
+    assert service.queued == 0
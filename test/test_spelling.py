@@ -0,0 +1,245 @@
+# type: ignore
+"""
+
+    test_spelling.py
+
+    Tests for the spelling corrector in GreynirCorrect
+
+    Copyright © 2025 by Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module tests the Corrector class in spelling.py and the
+    known-word vocabulary in vocabulary.py.
+
+"""
+
+import pytest
+from reynir.bindb import GreynirBin
+
+import reynir_correct.vocabulary
+from reynir_correct.spelling import (
+    SPELLING_EDITS0,
+    SPELLING_SKIPPED,
+    Corrector,
+    DegradedWord,
+    SpellingBudget,
+)
+from reynir_correct.vocabulary import KNOWN_LOWER, KNOWN_TITLE, Vocabulary, source_stamp
+
+KNOWN_WORDS = ["hæstaréttarlögmaður", "hæstaréttarlögmann", "fangageymslan", "Olíugeymir", "olía"]
+
+
+@pytest.fixture(scope="module")
+def vocabulary(tmp_path_factory):
+    """Provide a small vocabulary file as a test fixture"""
+    fname = str(tmp_path_factory.mktemp("vocab") / "vocabulary.bin")
+    Vocabulary.build(KNOWN_WORDS, fname)
+    vocab = Vocabulary(fname)
+    yield vocab
+    vocab.close()
+
+
+@pytest.fixture(scope="module")
+def db():
+    with GreynirBin.get_db() as db:
+        yield db
+
+
+@pytest.fixture
+def no_vocabulary(monkeypatch):
+    """Make Corrector instances run without the default vocabulary"""
+    monkeypatch.setattr(Corrector, "_VOCABULARY", None)
+    monkeypatch.setattr(Corrector, "_VOCABULARY_LOADED", True)
+
+
+def test_vocabulary(vocabulary):
+    assert len(vocabulary) == len(KNOWN_WORDS)
+    assert "fangageymslan" in vocabulary
+    # Keys are stored in lower case
+    assert "olíugeymir" in vocabulary
+    assert "Olíugeymir" not in vocabulary
+    assert "fangageymsla" not in vocabulary
+    assert "hæstaréttar" not in vocabulary
+    assert vocabulary.has_prefix("hæstaréttar")
+    assert vocabulary.has_prefix("olí")
+    assert vocabulary.has_prefix("")
+    assert not vocabulary.has_prefix("hæstarr")
+    assert not vocabulary.has_prefix("ö")
+
+
+def test_vocabulary_flags(tmp_path):
+    fname = str(tmp_path / "vocabulary.bin")
+    assert Vocabulary.build(["Ísland", "ísland", "hús", "Jón", "McDonald", "Bandaríkin"], fname) == 5
+    vocab = Vocabulary(fname)
+    try:
+        assert vocab.flags("ísland") == KNOWN_LOWER | KNOWN_TITLE
+        assert vocab.flags("hús") == KNOWN_LOWER
+        assert vocab.flags("jón") == KNOWN_TITLE
+        assert vocab.is_known("bandaríkin")
+        # Neither the lower case nor the title case form is known
+        assert "mcdonald" in vocab
+        assert vocab.flags("mcdonald") == 0
+        assert not vocab.is_known("mcdonald")
+        assert not vocab.is_known("hestur")
+    finally:
+        vocab.close()
+
+
+def test_in_dictionary(db, tmp_path, no_vocabulary):
+    # A vocabulary containing exactly the candidates found by the BÍN
+    # and trigram lookups must yield exactly the same candidates
+    c = Corrector(db)
+
+    def is_known(w):
+        return w in db or c.freq(w) >= Corrector._KNOWN_WORD_MIN_FREQUENCY
+
+    for original in ("hestyr", "Reykjavik", "fangageimslan"):
+        word = original.lower()
+        candidates = c.gen_candidates(original, word, (), False)
+        assert candidates
+        known = [f for w, _ in candidates for f in (w, w.title()) if is_known(f)]
+        fname = str(tmp_path / (word + ".bin"))
+        Vocabulary.build(known, fname)
+        vocab = Vocabulary(fname)
+        try:
+            assert Corrector(db, vocabulary=vocab).gen_candidates(original, word, (), False) == candidates
+        finally:
+            vocab.close()
+
+
+def test_vocabulary_source(db, tmp_path, monkeypatch):
+    # Only a vocabulary built from the installed BÍN and trigram data is used
+    stamp = source_stamp(Corrector._KNOWN_WORD_MIN_FREQUENCY)
+    fname = str(tmp_path / "vocabulary.bin")
+    Vocabulary.build(KNOWN_WORDS, fname, stamp)
+    vocab = Vocabulary.load(fname, stamp)
+    assert vocab is not None and vocab.source == stamp
+    vocab.close()
+    stale = str(tmp_path / "stale.bin")
+    Vocabulary.build(KNOWN_WORDS, stale)
+    with pytest.warns(UserWarning):
+        assert Vocabulary.load(stale, stamp) is None
+    # The default vocabulary is skipped if it is stale
+    monkeypatch.setattr(reynir_correct.vocabulary, "VOCABULARY_PATH", stale)
+    monkeypatch.setattr(Corrector, "_VOCABULARY", None)
+    monkeypatch.setattr(Corrector, "_VOCABULARY_LOADED", False)
+    with pytest.warns(UserWarning):
+        assert Corrector(db).vocabulary is None
+    monkeypatch.setattr(reynir_correct.vocabulary, "VOCABULARY_PATH", fname)
+    monkeypatch.setattr(Corrector, "_VOCABULARY_LOADED", False)
+    vocab = Corrector(db).vocabulary
+    assert vocab is not None and len(vocab) == len(KNOWN_WORDS)
+    vocab.close()
+    # Files in an outdated format are skipped as well
+    with open(stale, "r+b") as f:
+        f.write(b"Greynir vocab02\n")
+    with pytest.raises(ValueError):
+        Vocabulary.load(stale)
+    with pytest.warns(UserWarning):
+        assert Vocabulary.load(stale, stamp) is None
+
+
+def test_subs_pruned(db, vocabulary, no_vocabulary):
+    unpruned = Corrector(db)
+    pruned = Corrector(db, vocabulary=vocabulary)
+    for word in ("hæstarréttarlögmaður", "fangageimslan", "ollíugeimir"):
+        full = list(unpruned.subs(word))
+        assert unpruned.subs_stats.combinations == len(full)
+        assert not unpruned.subs_stats.truncated
+        result = list(pruned.subs(word))
+        stats = pruned.subs_stats
+        # The pruned combinations are exactly the known ones,
+        # returned in the same order as in the full enumeration
+        assert result == [w for w in full if w in vocabulary]
+        assert stats.combinations == len(full)
+        assert stats.generated == len(result)
+        assert stats.expansions < len(full)
+        assert stats.pruned > 0
+        assert not stats.truncated
+
+
+def test_subs_limit(db, vocabulary, no_vocabulary):
+    # Without a vocabulary, there is no default limit
+    c = Corrector(db)
+    result = list(c.subs("hæstarréttarlögmaður"))
+    assert len(result) == c.subs_stats.combinations == 1024
+    assert not c.subs_stats.truncated
+    c = Corrector(db, max_subs_expansions=10)
+    result = list(c.subs("hæstarréttarlögmaður"))
+    assert len(result) == 10
+    assert c.subs_stats.truncated
+    assert c.subs_stats.combinations == 1024
+    c = Corrector(db, vocabulary=vocabulary)
+    result = list(c.subs("hæstarréttarlögmaður", max_expansions=3))
+    assert c.subs_stats.expansions == 3
+    assert c.subs_stats.truncated
+    assert result == []
+
+
+def test_correct_text_parallel(db):
+    c = Corrector(db)
+    text = (
+        "Ég fór í fangageimsluna í gær. Hann er hæstarréttarlögmaður! "
+        "Mikil munur á að nota og missnota. Þetta er allveg rétt.\n\n"
+        "Konan hamrar á mér alla daga. Ég fæ alveg hræðileg drauma."
+    )
+    serial = c.correct_text(text)
+    assert serial != text
+    for sentences_per_chunk in (1, 2, 100):
+        assert c.correct_text_parallel(text, processes=2, sentences_per_chunk=sentences_per_chunk) == serial
+    assert c.correct_text_parallel(text, only_rare=True, processes=2, sentences_per_chunk=1) == c.correct_text(
+        text, only_rare=True
+    )
+
+
+def test_spelling_budget(db, no_vocabulary):
+    c = Corrector(db)
+    word = "hæstarréttarlögmaður"
+    full = c.gen_candidates(word, word, (), False)
+    # A generous budget does not change the result
+    budget = SpellingBudget(word_time=60.0, document_time=600.0)
+    assert c.gen_candidates(word, word, (), False, budget=budget) == full
+    assert budget.spent > 0.0
+    assert budget.degraded == []
+    # A word budget that is already spent cuts candidate generation short
+    budget = SpellingBudget(word_time=0.0)
+    c.gen_candidates(word, word, (), False, budget=budget)
+    assert c.subs_stats.timed_out
+    assert budget.degraded == [DegradedWord(word, SPELLING_EDITS0)]
+    # A spent document budget skips correction altogether
+    budget = SpellingBudget(document_time=0.0)
+    assert c.correct(word, budget=budget) == word
+    assert c.suggest_list(word, budget=budget) == []
+    assert budget.degraded == [DegradedWord(word, SPELLING_SKIPPED)]
+
+
+def test_spelling_budget_pipeline():
+    from reynir_correct.wrappers import GreynirCorrectAPI
+
+    api = GreynirCorrectAPI.from_options(all_errors=False, spelling_document_budget=0.0)
+    result = api.correct("Hann er hæstarréttarlögmaður.")
+    assert result.degraded_words == [DegradedWord("hæstarréttarlögmaður", SPELLING_SKIPPED)]
+    api = GreynirCorrectAPI.from_options(all_errors=False)
+    result = api.correct("Hann er hæstarréttarlögmaður.")
+    assert result.degraded_words is None